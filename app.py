@@ -11,24 +11,101 @@
 6. 新增支援多月份時間範圍查詢的API端點。
 7. 新增獲取可用月份列表的API端點。
 8. 【新功能】新增政黨提案分析頁面及對應的 API。
+9. 法案資料改由常駐記憶體快取 (BillStore) 提供，檔案變動時才重新解析。
+10. 分類統計改為每月預先計算 (含分類 × 進度階段)，範圍統計只需合併各月結果。
+11. 新增 `/api/search` 伺服器端全文檢索 (字元 bigram 倒排索引)。
+12. 法案列表支援 `fields=` 欄位投影與 `limit`/`cursor` 分頁，新增 `/api/bill/<bill_no>` 單筆查詢。
+13. 完整法案列表改以 JSON 片段逐段串流輸出 (共用資料快照中為預先編碼的片段)。
+14. 政黨參與改為每月預先計算的位元遮罩索引，政黨統計與法案列表直接由索引取得。
+15. 支援 billpack 精簡二進位格式 (billpack.py)，重欄位以 mmap 按需讀取。
+16. `/api/*` 支援 ETag / Last-Modified 條件式請求 (304)，並快取 gzip / brotli 壓縮後的回應。
+17. 新增 `/api/compare` 同名法案版本比較 API (每月預先建立標題 -> 各來源版本索引)。
+18. 新增 `/api/diff` 伺服器端逐字條文差異比較，結果以 LRU 快取。
+19. 新增 `/api/progress/summary` 與 `/api/progress/bills`，進度字串於載入時解析為日期與階段。
+20. 維恩圖資料改為由提案/連署人即時計算 (每月快取)，新增任意月份範圍的 `/api/venn-data`。
+21. 立委姓名一律正規化後比對，新增 `/api/legislators/<name>/activity` 與 `/api/legislators/leaderboard`。
+22. 新增共同提案網絡 API (`/api/network/...`)，以每月快取的稀疏矩陣計算。
+23. 每個請求記錄各階段 (glob / load / index / serialize / compress) 耗時並回傳 `Server-Timing` 標頭，
+    新增 Prometheus 格式的 `/metrics` 指標端點。
+24. 背景執行緒監看資料夾 (DataWatcher，設定 DATA_WATCH_INTERVAL 啟用)，在請求路徑之外載入、
+    驗證檔案並建立索引，完成後原子替換為新的唯讀資料快照。
+25. 多個 gunicorn worker 可共用同一份以 mmap 對應的唯讀資料快照 (`python app.py --build-snapshot`，見 gunicorn.conf.py)。
+26. 新增 `/api/batch` 批次查詢，頁面初始化所需的多個 API 以單一請求取得。
+27. 新增 `/api/bill/<bill_no>/related` 相關法案推薦 (各月份快取字元 n-gram 詞頻，合併後以 TF-IDF 內積排序)。
+28. 新增匯入工具 (ingest.py)：驗證並正規化月份檔案，產生附屬索引檔 (`*.billidx`)，載入月份時直接使用預先計算的索引。
+29. 新增 `/api/query` 多面向查詢 (分類、政黨組合、進度階段、立委、月份)，以每月快取的 numpy 位元集合交集計算結果與各面向數量。
+30. 新增條文索引 (每月快取 法律名稱 × 條號 -> 法案與對照表列)，提供 `/api/articles/<law>` 與 `/api/articles/<law>/<article>`。
 """
-from flask import Flask, jsonify, abort, render_template, request
+from flask import Flask, Response, g, has_request_context, jsonify, abort, render_template, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import json
 import os
 import glob
 import re
-from collections import Counter
-from datetime import datetime
+import sys
+import threading
+import bisect
+import difflib
+import gzip
+import hashlib
+import heapq
+import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, timezone
+from types import MappingProxyType
+from urllib.parse import urlsplit
+
+from werkzeug.exceptions import HTTPException
+
+from billpack import LazyBill, PackedPostings, load_bill_pack, open_snapshot, pack_postings, write_snapshot
+
+try:
+    import brotli
+except ImportError:  # 未安裝 brotli 時只提供 gzip
+    brotli = None
+
+try:
+    import numpy as np
+except ImportError:  # 未安裝 numpy 時，多面向查詢 API 回傳 503
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:  # 未安裝 numpy / scipy 時，共同提案網絡 API 回傳 503
+    sparse = None
+
+try:
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+except ImportError:  # 未安裝 scikit-learn 時，相關法案 API 回傳 503
+    HashingVectorizer = TfidfTransformer = None
 
 # --- 1. 路徑與 Flask App 初始化設定 ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # 前端檔案 (HTML/CSS/JS) 所在的資料夾
 WEB_FOLDER_PATH = WEB_FOLDER_PATH = os.path.join(BASE_DIR, "web") 
-# AI 處理後的 JSON 檔案所在的資料夾
-DATA_FOLDER = DATA_FOLDER = os.path.join(BASE_DIR, "storage", "ai_output")
+# AI 處理後的 JSON 檔案所在的資料夾 (可用環境變數 BILL_DATA_FOLDER 改指向其他資料夾，例如 benchmark.py 產生的測試資料)
+DATA_FOLDER = DATA_FOLDER = os.environ.get('BILL_DATA_FOLDER') or os.path.join(BASE_DIR, "storage", "ai_output")
+
+class BillJSONProvider(DefaultJSONProvider):
+    """讓 jsonify 能直接輸出由 billpack 延遲載入的法案物件"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, LazyBill):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        with timed_phase('serialize'):
+            return super().dumps(obj, **kwargs)
+
 
 # 初始化 Flask，並告訴它去哪裡找樣板和靜態檔案
 app = Flask(__name__, template_folder=WEB_FOLDER_PATH, static_folder=WEB_FOLDER_PATH, static_url_path='/')
+app.json = BillJSONProvider(app)
 # 確保回傳的 JSON 能正確顯示中文
 app.config['JSON_AS_ASCII'] = False
 
@@ -56,41 +133,1813 @@ CATEGORY_DEFINITIONS = {
 }
 
 
-# --- 3. 輔助函式 ---
+# --- 3. 常駐記憶體資料層 ---
+
+# 法案資料快取的記憶體預算 (位元組)，可用環境變數 BILL_STORE_MAX_BYTES 調整
+# 記憶體用量以來源 JSON 檔案大小 (或 billpack 標頭大小) 加上各衍生索引的估計大小計算，
+# 超過預算時淘汰最久未使用的月份
+BILL_STORE_MAX_BYTES = int(os.environ.get('BILL_STORE_MAX_BYTES', 512 * 1024 * 1024))
+
+
+def estimate_size(value):
+    """
+    估計衍生索引佔用的記憶體 (位元組)：遞迴加總容器與其內容的 sys.getsizeof，
+    numpy 陣列與稀疏矩陣以資料緩衝區大小計算；以 mmap 對應的共用資料不計入。
+    同一個物件只計算一次。
+    """
+    total = 0
+    seen = set()
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or item is None or isinstance(item, bool):
+            continue
+        seen.add(id(item))
+        if isinstance(item, PackedPostings):
+            pending.append(item.buffer)
+        elif isinstance(item, memoryview):
+            # 以 mmap 對應的共用資料不佔用本程序的記憶體，只計算程序內的 bytes
+            total += item.nbytes if isinstance(item.obj, (bytes, bytearray)) else 0
+        elif np is not None and isinstance(item, np.ndarray):
+            total += item.nbytes
+        elif sparse is not None and sparse.issparse(item):
+            total += sum(getattr(item, name).nbytes for name in ('data', 'indices', 'indptr') if hasattr(item, name))
+        else:
+            total += sys.getsizeof(item)
+            if isinstance(item, dict):
+                pending.extend(item.keys())
+                pending.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                pending.extend(item)
+            elif isinstance(item, MappingProxyType):
+                pending.append(dict(item))
+    return total
+
+
+class CacheCounter:
+    """快取的命中 / 未命中次數 (由 /metrics 匯出)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+# 各衍生索引 (MonthData.derive) 在所有月份合計的命中 / 未命中次數，以索引名稱為 key
+derive_cache_stats = {}
+derive_cache_stats_lock = threading.Lock()
+
+def record_derive_lookup(key, hit):
+    with derive_cache_stats_lock:
+        stats = derive_cache_stats.get(key)
+        if stats is None:
+            stats = derive_cache_stats[key] = CacheCounter()
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+
+class MonthData:
+    """單一月份已解析的法案資料，以及用來判斷檔案是否變動的檔案簽章"""
+
+    def __init__(self, year, month, bills, mtime, size, memory_size=None, shared_indexes=None):
+        self.year = year
+        self.month = month
+        self.bills = bills
+        self.mtime = mtime
+        self.size = size
+        # 法案本身估計的常駐記憶體用量 (由 billpack 載入時只計算輕欄位)
+        self.base_memory_size = size if memory_size is None else memory_size
+        # 由 bills 推導出的各種索引 (統計、搜尋等)，月份重新載入時會隨整個物件一起作廢
+        self.derived = {}
+        # 各衍生索引估計的記憶體用量 {key: 位元組}
+        self.derived_sizes = {}
+        self._derived_lock = threading.RLock()
+        # 由共用資料快照載入時，已預先建立的索引 {key: (版本, 讀取函式)}，版本相同時取代 builder
+        self.shared_indexes = shared_indexes or {}
+
+    @property
+    def signature(self):
+        return (self.mtime, self.size)
+
+    @property
+    def memory_size(self):
+        """估計的常駐記憶體用量：法案本身加上目前已建立的衍生索引"""
+        return self.base_memory_size + sum(self.derived_sizes.values())
+
+    def store_derived(self, key, value, version=None):
+        """保存衍生索引並記錄其估計大小，讓 BillStore 的記憶體預算能涵蓋索引"""
+        with self._derived_lock:
+            self.derived[key] = (version, value)
+            self.derived_sizes[key] = estimate_size(value)
+
+    def derive(self, key, builder, version=None):
+        """
+        取得此月份的衍生索引，第一次取用時才以 builder(self) 建立並保存。
+        若索引還依賴其他檔案 (例如立委資料)，以 version 傳入其版本，版本不同時重建。
+        """
+        cached = self.derived.get(key)
+        if cached is None or cached[0] != version:
+            with self._derived_lock:
+                cached = self.derived.get(key)
+                if cached is None or cached[0] != version:
+                    record_derive_lookup(key, False)
+                    shared = self.shared_indexes.get(key)
+                    loader = shared[1] if shared is not None and shared[0] == version else None
+                    with timed_phase('index'):
+                        value = loader() if loader is not None else builder(self)
+                    self.store_derived(key, value, version)
+                    return value
+        record_derive_lookup(key, True)
+        return cached[1]
+
+
+class BillStore:
+    """
+    程序內共用的法案資料快取。
+
+    - 每個月份只解析一次，以 (year, month) 為 key 常駐於記憶體。
+    - 每次取用時比對檔案的 mtime 與大小，檔案變動時才重新載入。
+    - 總用量超過記憶體預算時，依 LRU 順序淘汰冷門月份。
+    """
+
+    def __init__(self, data_folder, max_bytes=BILL_STORE_MAX_BYTES):
+        self.data_folder = data_folder
+        self.max_bytes = max_bytes
+        self._months = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def month_path(self, year, month):
+        return os.path.join(self.data_folder, f"ai_enriched_data_{year}_{month:02d}.json")
+
+    def get_month(self, year, month):
+        """取得指定月份的 MonthData，檔案不存在或無法解析時回傳 None"""
+        key = (year, month)
+        file_path = self.month_path(year, month)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.discard(year, month)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._months.get(key)
+            if entry is not None and entry.signature == signature:
+                self._months.move_to_end(key)
+                self.hits += 1
+                # 衍生索引是在取用後才建立的，命中時也要重新檢查記憶體預算
+                self._evict()
+                return entry
+
+        # 在鎖外解析檔案，避免大檔案阻塞其他月份的查詢
+        entry = load_month_file(year, month, file_path, signature)
+        if entry is None:
+            return None
+
+        with self._lock:
+            self.misses += 1
+            self._months[key] = entry
+            self._months.move_to_end(key)
+            self._evict()
+        return entry
+
+    def get_bills(self, year, month):
+        entry = self.get_month(year, month)
+        return entry.bills if entry is not None else None
+
+    def discard(self, year, month):
+        with self._lock:
+            self._months.pop((year, month), None)
+
+    def clear(self):
+        with self._lock:
+            self._months.clear()
+
+    @property
+    def resident_bytes(self):
+        return sum(entry.memory_size for entry in self._months.values())
+
+    def _evict(self):
+        # 至少保留最近使用的一個月份，即使它本身就超過預算
+        while len(self._months) > 1 and self.resident_bytes > self.max_bytes:
+            self._months.popitem(last=False)
+
+
+def load_month_file(year, month, file_path, signature):
+    """
+    解析單一月份檔案為 MonthData (有對應且未過期的 billpack 時優先使用，只載入輕欄位)。
+    無法解析、格式不正確，或讀取期間檔案仍在變動 (寫到一半) 時回傳 None。
+    """
+    with timed_phase('load'):
+        pack = load_bill_pack(file_path, signature)
+        if pack is not None:
+            month_data = MonthData(year, month, pack.bills, *signature, memory_size=pack.header_size)
+            apply_month_sidecar(month_data, load_month_sidecar(file_path, signature))
+            return month_data
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                bills = json.load(f)
+            stat = os.stat(file_path)
+        except Exception as e:
+            print(f"讀取檔案 {file_path} 時發生錯誤: {e}")
+            return None
+    if (stat.st_mtime_ns, stat.st_size) != tuple(signature):
+        print(f"檔案 {file_path} 在讀取期間有變動，稍後重新載入")
+        return None
+    if not isinstance(bills, list) or not all(isinstance(bill, dict) for bill in bills):
+        print(f"檔案 {file_path} 的格式不正確 (應為法案物件的陣列)")
+        return None
+    month_data = MonthData(year, month, bills, *signature)
+    apply_month_sidecar(month_data, load_month_sidecar(file_path, signature))
+    return month_data
+
+
+# 匯入工具 (ingest.py) 為每個月份產生的附屬索引檔 (sidecar)，內含預先計算的衍生索引。
+# 檔名帶有格式版本，格式變更時舊檔自然失效；來源檔案變動後 (簽章不符) 也會被忽略。
+INGEST_SIDECAR_VERSION = 2
+INGEST_SIDECAR_SUFFIX = f'.v{INGEST_SIDECAR_VERSION}.billidx'
+
+def sidecar_path_for(json_path):
+    """月份 JSON 檔案對應的附屬索引檔路徑"""
+    return os.path.splitext(json_path)[0] + INGEST_SIDECAR_SUFFIX
+
+def read_month_sidecar(sidecar_path, signature=None, with_indexes=True):
+    """
+    讀取附屬索引檔，回傳 (標頭, 索引)；檔案不存在、無法解析、版本不符，
+    或指定了 signature 而與標頭記錄的來源檔案簽章不符時回傳 None。
+    檔案格式為兩行 JSON：第一行是標頭 (版本、來源簽章與雜湊)，第二行是索引內容，
+    只需要標頭時不必解析整個檔案。
+    """
+    try:
+        with open(sidecar_path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if not isinstance(header, dict) or header.get('version') != INGEST_SIDECAR_VERSION:
+                return None
+            if signature is not None and tuple(header.get('source_signature') or ()) != tuple(signature):
+                return None
+            indexes = json.loads(f.readline()) if with_indexes else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"讀取附屬索引檔 {sidecar_path} 時發生錯誤: {e}")
+        return None
+    return header, indexes
+
+def load_month_sidecar(file_path, signature):
+    """讀取月份檔案的附屬索引，來源檔案在產生附屬索引後有變動時回傳 None"""
+    return read_month_sidecar(sidecar_path_for(file_path), signature)
+
+def restore_aggregates(aggregates):
+    """由 JSON / msgpack 讀回的分類統計還原為 Counter"""
+    return {
+        'total_bills': aggregates['total_bills'],
+        'category_counts': Counter(aggregates['category_counts']),
+        'category_stage_counts': {
+            category: Counter(stage_counts)
+            for category, stage_counts in aggregates['category_stage_counts'].items()
+        },
+    }
+
+def restore_legislator_index(legislator_index):
+    """由 JSON / msgpack 讀回的立委活動索引，category_counts 還原為 Counter"""
+    return {
+        name: dict(activity, category_counts=Counter(activity['category_counts']))
+        for name, activity in legislator_index.items()
+    }
+
+def apply_month_sidecar(month_data, sidecar):
+    """以附屬索引檔的內容預先填入 MonthData 的衍生索引，之後取用時不必再由法案內容建立"""
+    if sidecar is None:
+        return
+    header, indexes = sidecar
+    if header.get('bill_count') != len(month_data.bills):
+        return
+    month_data.store_derived('aggregates', restore_aggregates(indexes['aggregates']))
+    month_data.store_derived('progress_index', indexes['progress_index'])
+    month_data.store_derived('legislator_index', restore_legislator_index(indexes['legislator_index']))
+    month_data.store_derived('article_titles', indexes['article_titles'])
+    # 政黨參與索引依賴立委資料，以產生時的立委資料簽章作為版本
+    if indexes.get('party_index') is not None and header.get('legislators_signature'):
+        month_data.store_derived('party_index', indexes['party_index'], tuple(header['legislators_signature']))
+
+
+bill_store = BillStore(DATA_FOLDER)
+
+
+class LegislatorData:
+    """已解析的 legislators.json，附帶檔案簽章 (作為衍生索引的版本) 與姓名 -> 政黨對照表"""
+
+    def __init__(self, data, signature):
+        self.data = data
+        self.signature = signature
+        self.name_to_party = {
+            legislator['name']: legislator['party']
+            for legislator in data.get('jsonList', [])
+        }
+        # 以正規化姓名 (去除全形空白等) 為 key 的對照表，與前端 normalizeName 一致
+        self.normalized_name_to_party = {
+            normalize_legislator_name(name): party
+            for name, party in self.name_to_party.items()
+        }
+        self.normalized_to_official_name = {
+            normalize_legislator_name(name): name
+            for name in self.name_to_party
+        }
+        # 立委在共同提案矩陣中的列順序
+        self.legislator_order = list(self.normalized_to_official_name)
+        self.legislator_position = {name: row for row, name in enumerate(self.legislator_order)}
+
+
+def normalize_legislator_name(name):
+    """去除姓名中的空白 (含全形空白)、間隔號與連字號，例如 `黃　捷` -> `黃捷`"""
+    return re.sub(r'[\s‧.\-]', '', name or '')
+
+
+_legislators_cache = None
+_legislators_lock = threading.Lock()
+
+def load_legislators_file(file_path, signature):
+    """解析 legislators.json，無法解析、格式不正確或讀取期間檔案有變動時回傳 None"""
+    try:
+        with timed_phase('load'), open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        stat = os.stat(file_path)
+    except Exception as e:
+        print(f"讀取立委資料時發生錯誤: {e}")
+        return None
+    if (stat.st_mtime_ns, stat.st_size) != tuple(signature):
+        print(f"立委資料在讀取期間有變動，稍後重新載入")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('jsonList'), list):
+        print(f"立委資料的格式不正確 (缺少 jsonList)")
+        return None
+    return LegislatorData(data, signature)
+
+def get_legislators():
+    """
+    取得立委資料：背景監看啟用時由目前的資料快照提供，
+    否則在檔案 mtime/大小 改變時才重新解析。檔案不存在或無法解析時回傳 None。
+    """
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot.legislators
+    return batch_pinned(('legislators',), load_current_legislators)
+
+def load_current_legislators():
+    """依檔案 mtime/大小 重用已解析的立委資料，必要時重新讀取"""
+    global _legislators_cache
+    file_path = os.path.join(DATA_FOLDER, "legislators.json")
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _legislators_cache
+    if cached is not None and cached.signature == signature:
+        return cached
+    with _legislators_lock:
+        cached = _legislators_cache
+        if cached is not None and cached.signature == signature:
+            return cached
+        cached = load_legislators_file(file_path, signature)
+        if cached is None:
+            return None
+        _legislators_cache = cached
+        return cached
+
+
+# 法案進度階段 (與前端 classifyProgress 的判斷順序一致)
+PROGRESS_STAGES = ['一讀', '委員會審議', '二讀', '三讀', '其他']
+
+def classify_progress_stage(progress_text):
+    """將 `1140701 三讀` 這類進度字串歸類為 PROGRESS_STAGES 其中之一"""
+    if not progress_text:
+        return '其他'
+    for stage in PROGRESS_STAGES[:-1]:
+        if stage in progress_text:
+            return stage
+    return '其他'
+
+def parse_progress(progress_text):
+    """
+    解析進度字串，例如 `1140701 三讀` -> {'date': '2025-07-01', 'stage': '三讀', 'status': '三讀'}。
+    日期為民國年月日 (YYYMMDD)，無法解析時 date 為 None。
+    """
+    text = (progress_text or '').strip()
+    progress_date = None
+    status = text
+    match = re.match(r'^(\d{3})(\d{2})(\d{2})\s*(.*)$', text)
+    if match:
+        try:
+            progress_date = datetime(int(match.group(1)) + 1911, int(match.group(2)), int(match.group(3))).date().isoformat()
+            status = match.group(4)
+        except ValueError:
+            progress_date = None
+    return {'date': progress_date, 'stage': classify_progress_stage(text), 'status': status}
+
+def build_progress_index(month_data):
+    """建立單一月份的進度索引：每筆法案解析後的進度，以及各階段的法案索引位置"""
+    parsed = [parse_progress(bill.get('progress')) for bill in month_data.bills]
+    stage_positions = {stage: [] for stage in PROGRESS_STAGES}
+    for position, progress in enumerate(parsed):
+        stage_positions[progress['stage']].append(position)
+    return {'parsed': parsed, 'stage_positions': stage_positions}
+
+def build_month_aggregates(month_data):
+    """建立單一月份的分類統計：分類數量，以及分類 × 進度階段的數量"""
+    category_counts = Counter()
+    category_stage_counts = {}
+    for bill in month_data.bills:
+        categories = bill.get('categories', [])
+        category_counts.update(categories)
+        stage = classify_progress_stage(bill.get('progress'))
+        for category in categories:
+            stage_counts = category_stage_counts.setdefault(category, Counter())
+            stage_counts[stage] += 1
+    return {
+        'total_bills': len(month_data.bills),
+        'category_counts': category_counts,
+        'category_stage_counts': category_stage_counts,
+    }
+
+def get_month_aggregates(year, month):
+    """取得指定月份的預先統計結果，月份不存在時回傳 None"""
+    month_data = get_month_data(year, month)
+    if month_data is None:
+        return None
+    return month_data.derive('aggregates', build_month_aggregates)
+
+def merge_month_aggregates(month_list):
+    """合併多個月份的統計結果 (只合併小型字典，不會碰觸法案內容)"""
+    category_counts = Counter()
+    category_stage_counts = {}
+    total_bills = 0
+    for year, month in month_list:
+        aggregates = get_month_aggregates(year, month)
+        if aggregates is None:
+            continue
+        total_bills += aggregates['total_bills']
+        category_counts.update(aggregates['category_counts'])
+        for category, stage_counts in aggregates['category_stage_counts'].items():
+            category_stage_counts.setdefault(category, Counter()).update(stage_counts)
+    return {
+        'total_bills': total_bills,
+        'category_counts': category_counts,
+        'category_stage_counts': category_stage_counts,
+    }
+
+
+# 全文檢索：各欄位的排序權重
+SEARCH_FIELD_WEIGHTS = {
+    'bill_name': 5,
+    'proposers': 3,
+    'cosigners': 2,
+    'reason': 2,
+    'comparison_table': 1,
+}
+SEARCH_MAX_PAGE_SIZE = 100
+
+def normalize_search_text(text):
+    """檢索用的正規化：去除所有空白 (含全形空白) 並轉小寫"""
+    return re.sub(r'\s+', '', text or '').lower()
+
+def get_bill_title(bill):
+    """與前端 getBillTitle 相同：由 source_file 取出法案標題"""
+    source_file = bill.get('source_file') or ''
+    return '_'.join(source_file.split('_')[2:]).replace('.docx', '') or bill.get('bill_name', '')
+
+def get_bill_search_fields(bill):
+    """取出法案中可供檢索的各欄位文字"""
+    article_texts = []
+    for item in bill.get('comparison_table') or []:
+        for key in ('modified_text', 'current_text', 'explanation'):
+            if item.get(key):
+                article_texts.append(item[key])
+    return {
+        'bill_name': f"{bill.get('bill_name', '')} {get_bill_title(bill)}",
+        'proposers': ' '.join(bill.get('proposers') or []),
+        'cosigners': ' '.join(bill.get('cosigners') or []),
+        'reason': bill.get('reason') or '',
+        'comparison_table': '\n'.join(article_texts),
+    }
+
+# 建立索引時附加在每段文字結尾的標記：讓每個字元都至少出現在一個以它開頭的 bigram 中，
+# 單一字元的查詢即可由「以該字元開頭的 bigram」的位置列表聯集取得，索引不必另外保存 unigram
+SEARCH_TEXT_END = '\x00'
+
+def build_search_texts(month_data):
+    """各法案正規化後的檢索欄位文字 [(欄位, 文字), ...]，供建立索引與確認完整字串時共用"""
+    return [
+        tuple((field, normalize_search_text(text)) for field, text in get_bill_search_fields(bill).items())
+        for bill in month_data.bills
+    ]
+
+def text_bigrams(normalized_text):
+    """取出字元 bigram (中文沒有斷詞邊界，以字元 n-gram 建索引)，文字結尾附加 SEARCH_TEXT_END"""
+    padded = normalized_text + SEARCH_TEXT_END
+    return {padded[i:i + 2] for i in range(len(normalized_text))}
+
+def build_search_index(month_data):
+    """
+    建立單一月份的倒排索引：bigram -> 法案在 bills 中的索引位置 (遞增排列)，
+    以 pack_postings 編碼為緊湊的 uint32 陣列 (PackedPostings)，而非 Python list。
+    """
+    postings = {}
+    for position, fields in enumerate(month_data.derive('search_texts', build_search_texts)):
+        grams = set()
+        for _, text in fields:
+            grams |= text_bigrams(text)
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+    return PackedPostings(pack_postings(postings))
+
+def search_month(month_data, normalized_query, scope=None):
+    """
+    在單一月份中檢索，回傳 [(position, score, matched_fields), ...]。
+    先以 bigram 倒排索引求交集縮小候選，再以快取的正規化文字確認完整字串並計分；
+    指定 scope (欄位集合) 時只比對與計分這些欄位。
+    """
+    postings = month_data.derive('search_index', build_search_index)
+    if len(normalized_query) == 1:
+        candidates = postings.get_prefix(normalized_query)
+    else:
+        query_grams = {normalized_query[i:i + 2] for i in range(len(normalized_query) - 1)}
+        posting_lists = sorted((postings.get(gram, ()) for gram in query_grams), key=len)
+        if not posting_lists[0]:
+            return []
+        candidates = set(posting_lists[0])
+        for posting_list in posting_lists[1:]:
+            candidates.intersection_update(posting_list)
+            if not candidates:
+                return []
+
+    search_texts = month_data.derive('search_texts', build_search_texts)
+    results = []
+    for position in sorted(candidates):
+        score = 0
+        matched_fields = []
+        for field, text in search_texts[position]:
+            if scope is not None and field not in scope:
+                continue
+            occurrences = text.count(normalized_query)
+            if occurrences:
+                score += SEARCH_FIELD_WEIGHTS[field] * occurrences
+                matched_fields.append(field)
+        if score:
+            results.append((position, score, matched_fields))
+    return results
+
+
+# 欄位投影：內建的欄位組合 (例如列表卡片只需要的輕量欄位，不含 comparison_table / ai_analysis)
+BILL_FIELD_PROFILES = {
+    'card': ['bill_no', 'proposal_no', 'bill_name', 'source_file', 'proposers', 'progress', 'categories'],
+}
+# `fields=` 可以指定的法案欄位 (與 ingest.py 的 BILL_SCHEMA 一致)
+BILL_FIELDS = (
+    'bill_no', 'proposal_no', 'bill_name', 'source_file', 'proposers', 'cosigners',
+    'progress', 'categories', 'reason', 'ai_analysis', 'comparison_table',
+)
+BILL_LIST_MAX_LIMIT = 500
+
+def build_bill_no_index(month_data):
+    """建立單一月份 bill_no -> 法案在 bills 中索引位置 的對照表"""
+    return {bill.get('bill_no'): position for position, bill in enumerate(month_data.bills)}
+
+def find_bill(bill_no):
+    """在所有可用月份中 (由新到舊) 查找指定 bill_no 的法案，找不到時回傳 None"""
+    for year, month in get_available_months():
+        month_data = get_month_data(year, month)
+        if month_data is None:
+            continue
+        position = month_data.derive('bill_no_index', build_bill_no_index).get(bill_no)
+        if position is not None:
+            return month_data.bills[position]
+    return None
+
+def parse_fields_param(fields_param):
+    """
+    解析 `fields=` 參數 (逗號分隔，可混用內建組合名稱與欄位名稱)，未指定時回傳 None 代表完整欄位。
+    不認得的名稱 (例如拼錯的欄位) 直接回傳 400，而不是靜默地回傳缺少該欄位的法案。
+    """
+    if not fields_param:
+        return None
+    fields = []
+    for name in fields_param.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in BILL_FIELD_PROFILES and name not in BILL_FIELDS:
+            abort(400, description=f"不支援的欄位：{name}")
+        for field in BILL_FIELD_PROFILES.get(name, [name]):
+            if field not in fields:
+                fields.append(field)
+    return fields or None
+
+def project_bill(bill, fields):
+    """只保留指定欄位；fields 為 None 時回傳原始物件"""
+    if fields is None:
+        return bill
+    return {field: bill[field] for field in fields if field in bill}
+
+def build_bill_no_order(month_data):
+    """
+    依 bill_no 排序的分頁索引：positions 為排序後的法案位置，keys 為對應的 bill_no，
+    ranks[position] 為該法案在排序中的名次 (篩選後的子集合只需依名次排序，不必比較字串)
+    """
+    bills = month_data.bills
+    positions = sorted(range(len(bills)), key=lambda position: bills[position].get('bill_no') or '')
+    ranks = [0] * len(positions)
+    for rank, position in enumerate(positions):
+        ranks[position] = rank
+    return {
+        'positions': positions,
+        'keys': [bills[position].get('bill_no') or '' for position in positions],
+        'ranks': ranks,
+    }
+
+def iter_bill_no_page(month_data, positions, cursor):
+    """
+    單一月份依 bill_no 排序、位於 cursor 之後的 (bill_no, MonthData, position)，
+    以及此月份符合條件的總筆數。positions 為 None 代表整個月份。
+    """
+    order = month_data.derive('bill_no_order', build_bill_no_order)
+    start_rank = bisect.bisect_right(order['keys'], cursor) if cursor else 0
+    if positions is None:
+        total = len(order['keys'])
+        ranks = range(start_rank, total)
+    else:
+        ranks = sorted(order['ranks'][position] for position in positions)
+        total = len(ranks)
+        ranks = ranks[bisect.bisect_left(ranks, start_rank):]
+    return total, ((order['keys'][rank], month_data, order['positions'][rank]) for rank in ranks)
+
+def bill_list_response(selections):
+    """
+    依查詢參數回傳法案列表，selections 為 [(MonthData, 法案位置列表)]，位置為 None 代表整個月份：
+    - `fields=`：欄位投影 (例如 `fields=card`)。
+    - `limit=` (+ `cursor=`)：依 bill_no 穩定排序的游標分頁，回傳
+      {bills, next_cursor, total}；cursor 為上一頁最後一筆的 bill_no。
+      各月份的排序在第一次分頁時建立並快取 (bill_no_order)，之後每頁只需合併各月份已排序的結果。
+    兩者皆未指定時維持原本行為，回傳完整法案陣列。
+    """
+    fields = parse_fields_param(request.args.get('fields'))
+    limit_param = request.args.get('limit')
+    if limit_param is None:
+        return jsonify([
+            project_bill(month_data.bills[position], fields)
+            for month_data, positions in selections
+            for position in (range(len(month_data.bills)) if positions is None else positions)
+        ])
+
+    try:
+        limit = min(max(int(limit_param), 1), BILL_LIST_MAX_LIMIT)
+    except ValueError:
+        abort(400, description="無效的 limit 參數。")
+
+    cursor = request.args.get('cursor')
+    total = 0
+    month_pages = []
+    for month_data, positions in selections:
+        month_total, month_page = iter_bill_no_page(month_data, positions, cursor)
+        total += month_total
+        month_pages.append(month_page)
+    # 多取一筆以判斷是否還有下一頁
+    page = list(islice(heapq.merge(*month_pages, key=lambda item: item[0]), limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    return jsonify({
+        'bills': [project_bill(month_data.bills[position], fields) for _, month_data, position in page],
+        'next_cursor': page[-1][0] if page and has_more else None,
+        'total': total,
+    })
+
+def build_category_positions(month_data):
+    """建立單一月份 分類 (短格式) -> 法案索引位置 的對照表"""
+    positions = {}
+    for position, bill in enumerate(month_data.bills):
+        for category in bill.get('categories') or []:
+            category_list = positions.setdefault(category, [])
+            if not category_list or category_list[-1] != position:
+                category_list.append(position)
+    return positions
+
+def category_positions(month_data, category):
+    """此月份包含指定分類 (短格式) 的法案位置"""
+    return month_data.derive('category_positions', build_category_positions).get(category, [])
+
+
+def encode_bill(bill):
+    """將單筆法案編碼成 UTF-8 JSON 位元組"""
+    return json.dumps(bill, ensure_ascii=False, separators=(',', ':'), default=dict).encode('utf-8')
+
+def build_encoded_bills(month_data):
+    """
+    將單一月份每筆法案預先編碼成 UTF-8 JSON 位元組 (寫入共用資料快照用)。
+    整個月份以逗號串接成一個 bytes，並記錄每筆法案的 (起, 訖) 位置，
+    不篩選時整段直接輸出，篩選時再依位置切出單筆片段。
+    """
+    fragments = [encode_bill(bill) for bill in month_data.bills]
+    offsets = []
+    position = 0
+    for fragment in fragments:
+        offsets.append((position, position + len(fragment)))
+        position += len(fragment) + 1
+    return {'joined': b','.join(fragments), 'offsets': offsets}
+
+# 逐筆編碼時，累積到這個大小才輸出一段，避免每筆法案都各自寫出一次
+ENCODED_CHUNK_BYTES = 64 * 1024
+
+def iter_encoded_bills(month_entries, category_filter=None):
+    """
+    依序產生各月份法案的 JSON 片段。
+    由共用資料快照載入的月份直接切出 mmap 中預先編碼的位元組；其他月份在輸出時逐筆編碼，
+    不在記憶體中保留整個月份 (含重欄位) 的編碼結果，billpack 的重欄位也只在輸出當下讀取。
+    """
+    for month_data in month_entries:
+        if 'encoded_bills' in month_data.shared_indexes:
+            encoded = month_data.derive('encoded_bills', build_encoded_bills)
+            if not category_filter:
+                if encoded['joined']:
+                    # mmap 的 memoryview，輸出前轉為 bytes
+                    yield bytes(encoded['joined'])
+                continue
+            # 共用資料快照中的位置表為 [起, 訖, 起, 訖, ...]
+            offsets = encoded['offsets']
+            for position in category_positions(month_data, category_filter):
+                yield bytes(encoded['joined'][offsets[2 * position]:offsets[2 * position + 1]])
+            continue
+
+        chunk = []
+        chunk_size = 0
+        for bill in month_data.bills:
+            if category_filter and category_filter not in bill.get('categories', []):
+                continue
+            fragment = encode_bill(bill)
+            chunk.append(fragment)
+            chunk_size += len(fragment)
+            if chunk_size >= ENCODED_CHUNK_BYTES:
+                yield b','.join(chunk)
+                chunk = []
+                chunk_size = 0
+        if chunk:
+            yield b','.join(chunk)
+
+def stream_json_array(fragments):
+    """將 JSON 片段串接成一個 JSON 陣列逐段輸出"""
+    yield b'['
+    first = True
+    for fragment in fragments:
+        if not first:
+            yield b','
+        yield fragment
+        first = False
+    yield b']'
+
+def bill_stream_response(month_entries, category_filter=None):
+    """以逐段編碼的片段串流回傳完整法案陣列，記憶體用量不隨月份範圍成長"""
+    return Response(stream_json_array(iter_encoded_bills(month_entries, category_filter)),
+                    mimetype='application/json')
+
+def wants_plain_bill_list():
+    """未指定 fields / limit 時，回傳完整法案陣列 (以串流逐段輸出)"""
+    return not request.args.get('fields') and request.args.get('limit') is None
+
+
+# 政黨參與索引：每筆法案以位元遮罩記錄參與 (提案+連署) 的政黨
+PARTY_BITS = {
+    '中國國民黨': 1,
+    '民主進步黨': 2,
+    '台灣民眾黨': 4,
+    '無黨籍': 8,
+}
+MAJOR_PARTIES = ['中國國民黨', '民主進步黨', '台灣民眾黨']
+# 政黨組合標籤 (順序即 /api/party-stats 回傳的順序)
+PARTY_COMBINATIONS = [
+    '中國國民黨',
+    '民主進步黨',
+    '台灣民眾黨',
+    '中國國民黨+台灣民眾黨',
+    '中國國民黨+民主進步黨',
+    '民主進步黨+台灣民眾黨',
+    '無黨籍',
+]
+
+def party_labels_for_mask(mask):
+    """
+    依政黨遮罩回傳法案所屬的組合標籤：有無黨籍參與時歸入「無黨籍」，
+    扣除無黨籍後若為單一政黨或兩黨合作，再歸入對應的組合 (三黨皆參與者不列入組合)。
+    """
+    labels = []
+    if mask & PARTY_BITS['無黨籍']:
+        labels.append('無黨籍')
+    parties = [party for party in MAJOR_PARTIES if mask & PARTY_BITS[party]]
+    if len(parties) == 1:
+        labels.append(parties[0])
+    elif len(parties) == 2:
+        label = '+'.join(parties)
+        if label not in PARTY_COMBINATIONS:
+            label = '+'.join(reversed(parties))
+        labels.append(label)
+    return labels
+
+MASK_TO_PARTY_LABELS = {mask: party_labels_for_mask(mask) for mask in range(16)}
+
+def compute_party_mask(bill, normalized_name_to_party):
+    """計算單筆法案的政黨參與遮罩 (以正規化姓名比對，`黃　捷` 與 `黃捷` 視為同一人)"""
+    mask = 0
+    for participant in bill.get('proposers', []) + bill.get('cosigners', []):
+        mask |= PARTY_BITS.get(normalized_name_to_party.get(normalize_legislator_name(participant)), 0)
+    return mask
+
+def get_party_index(month_data, legislators):
+    """
+    取得單一月份的政黨參與索引 (依立委資料版本快取)：
+    {'masks': {bill_no: mask}, 'positions': {組合: [法案索引位置]}, 'counts': {組合: 數量}}
+    """
+    def build_party_index(month_data):
+        masks = {}
+        positions = {label: [] for label in PARTY_COMBINATIONS}
+        for position, bill in enumerate(month_data.bills):
+            mask = compute_party_mask(bill, legislators.normalized_name_to_party)
+            masks[bill.get('bill_no')] = mask
+            for label in MASK_TO_PARTY_LABELS[mask]:
+                positions[label].append(position)
+        return {
+            'masks': masks,
+            'positions': positions,
+            'counts': {label: len(items) for label, items in positions.items()},
+        }
+    return month_data.derive('party_index', build_party_index, version=legislators.signature)
+
+
+# 維恩圖區域：三個主要政黨所有非空組合 (依參與的主要政黨精確劃分)，另加無黨籍參與的集合
+VENN_REGIONS = [
+    ('中國國民黨',),
+    ('民主進步黨',),
+    ('台灣民眾黨',),
+    ('中國國民黨', '民主進步黨'),
+    ('中國國民黨', '台灣民眾黨'),
+    ('民主進步黨', '台灣民眾黨'),
+    ('中國國民黨', '民主進步黨', '台灣民眾黨'),
+]
+
+def get_venn_index(month_data, legislators):
+    """
+    取得單一月份的維恩圖索引 (依立委資料版本快取，由政黨參與遮罩推導)：
+    {'regions': {區域組合: [法案索引位置]}, 'non_partisan': [法案索引位置]}
+    """
+    def build_venn_index(month_data):
+        masks = get_party_index(month_data, legislators)['masks']
+        regions = {region: [] for region in VENN_REGIONS}
+        non_partisan = []
+        for position, bill in enumerate(month_data.bills):
+            mask = masks[bill.get('bill_no')]
+            region = tuple(party for party in MAJOR_PARTIES if mask & PARTY_BITS[party])
+            if region:
+                regions[region].append(position)
+            if mask & PARTY_BITS['無黨籍']:
+                non_partisan.append(position)
+        return {'regions': regions, 'non_partisan': non_partisan}
+    return month_data.derive('venn_index', build_venn_index, version=legislators.signature)
+
+def build_legislator_index(month_data):
+    """
+    建立單一月份的立委活動索引 (以正規化姓名為 key)：
+    {姓名: {'proposed': [法案索引位置], 'cosigned': [法案索引位置], 'category_counts': Counter}}
+    """
+    index = {}
+    for position, bill in enumerate(month_data.bills):
+        participants = set()
+        for role, names in (('proposed', bill.get('proposers') or []), ('cosigned', bill.get('cosigners') or [])):
+            for name in names:
+                normalized = normalize_legislator_name(name)
+                if not normalized:
+                    continue
+                activity = index.setdefault(normalized, {'proposed': [], 'cosigned': [], 'category_counts': Counter()})
+                # 同一法案中重複出現時只計一次
+                if activity[role] and activity[role][-1] == position:
+                    continue
+                activity[role].append(position)
+                participants.add(normalized)
+        for normalized in participants:
+            index[normalized]['category_counts'].update(bill.get('categories', []))
+    return index
+
+def build_cosponsor_matrix(month_data, legislators):
+    """
+    建立單一月份的共同提案矩陣 C = A·Aᵀ (立委 × 立委)。
+    A 為立委 × 法案的 0/1 關聯矩陣 (提案人或連署人)；C[i, j] 為 i 與 j 共同參與的法案數，
+    對角線為該立委參與的法案數。
+    """
+    rows = []
+    columns = []
+    for position, bill in enumerate(month_data.bills):
+        for name in (bill.get('proposers') or []) + (bill.get('cosigners') or []):
+            row = legislators.legislator_position.get(normalize_legislator_name(name))
+            if row is not None:
+                rows.append(row)
+                columns.append(position)
+    size = len(legislators.legislator_order)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+        shape=(size, len(month_data.bills)),
+    )
+    # 同一法案重複列名時只算一次
+    incidence.data[:] = 1
+    return (incidence @ incidence.T).tocsr()
+
+def get_cosponsor_matrix(month_entries, legislators):
+    """合併月份範圍內各月份 (已快取) 的共同提案矩陣"""
+    size = len(legislators.legislator_order)
+    total = sparse.csr_matrix((size, size), dtype=np.int32)
+    for month_data in month_entries:
+        total = total + get_month_cosponsor_matrix(month_data, legislators)
+    return total
+
+def get_month_cosponsor_matrix(month_data, legislators):
+    """取得單一月份的共同提案矩陣 (依立委資料版本快取)"""
+    return month_data.derive(
+        'cosponsor_matrix',
+        lambda month_data: build_cosponsor_matrix(month_data, legislators),
+        version=legislators.signature,
+    )
+
+def get_party_membership(legislators):
+    """立委 × 政黨 的 one-hot 矩陣，以及政黨順序"""
+    parties = list(PARTY_BITS)
+    for legislator_name in legislators.legislator_order:
+        party = legislators.normalized_name_to_party[legislator_name]
+        if party not in parties:
+            parties.append(party)
+    columns = [parties.index(legislators.normalized_name_to_party[name]) for name in legislators.legislator_order]
+    membership = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.int32), (np.arange(len(columns)), columns)),
+        shape=(len(columns), len(parties)),
+    )
+    return membership, parties
+
+def without_diagonal(cosponsor_matrix):
+    """去除對角線 (立委本身參與的法案數)，只保留與他人的共同提案次數"""
+    off_diagonal = cosponsor_matrix.copy()
+    off_diagonal.setdiag(0)
+    off_diagonal.eliminate_zeros()
+    return off_diagonal
+
+def compute_cross_party_scores(cosponsor_matrix, membership):
+    """
+    以矩陣運算計算每位立委的跨黨合作分數：與其他政黨立委的共同提案次數 / 全部共同提案次數。
+    回傳 (分數陣列, 共同提案總次數陣列)。
+    """
+    off_diagonal = without_diagonal(cosponsor_matrix)
+    party_weights = np.asarray((off_diagonal @ membership).todense())
+    totals = party_weights.sum(axis=1)
+    own_party = np.asarray(membership.argmax(axis=1)).ravel()
+    same_party = party_weights[np.arange(len(own_party)), own_party]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(totals > 0, (totals - same_party) / totals, 0.0)
+    return scores, totals
+
+# 同名法案比較：提案來源分組，以及比較頁面上的顯示順序
+COMPARE_PROPOSER_GROUPS = ['行政院', '司法院', '中國國民黨', '民主進步黨', '台灣民眾黨']
+COMPARE_DISPLAY_ORDER = ['行政院', '司法院', '民主進步黨', '中國國民黨', '台灣民眾黨']
+
+def normalize_bill_title(bill):
+    """與前端 normalizeBillTitle 相同：去除修正、增訂等字樣後的法案名稱"""
+    return re.sub(r'修正|增訂|廢止|制定|部分條文|草案', '', get_bill_title(bill)).strip()
+
+def get_proposer_group(bill, normalized_name_to_party):
+    """
+    判斷法案的提案來源分組：第一提案人為行政院/司法院時直接歸入，
+    否則取第一位有黨籍 (非無黨籍) 提案人的政黨；無法判斷時回傳 None。
+    """
+    proposers = bill.get('proposers') or []
+    if not proposers:
+        return None
+    first_proposer = proposers[0].strip()
+    if first_proposer in COMPARE_PROPOSER_GROUPS:
+        return first_proposer
+    for proposer in proposers:
+        party = normalized_name_to_party.get(normalize_legislator_name(proposer))
+        if party and party != '無黨籍':
+            return party if party in COMPARE_PROPOSER_GROUPS else None
+    return None
+
+def bill_version_key(bill):
+    """同一來源的多個版本中，以 source_file 日期、再以 bill_no 判斷較新的版本"""
+    source_date = (bill.get('source_file') or '').split('_')[0]
+    try:
+        bill_no = int(bill.get('bill_no') or 0)
+    except ValueError:
+        bill_no = 0
+    return (source_date, bill_no)
+
+def get_compare_index(month_data, legislators):
+    """
+    取得單一月份的同名法案索引 (依立委資料版本快取)：
+    {正規化標題: {提案來源分組: 該月份最新版本的法案索引位置}}
+    """
+    def build_compare_index(month_data):
+        index = {}
+        for position, bill in enumerate(month_data.bills):
+            group = get_proposer_group(bill, legislators.normalized_name_to_party)
+            if group is None:
+                continue
+            versions = index.setdefault(normalize_bill_title(bill), {})
+            current = versions.get(group)
+            if current is None or bill_version_key(bill) > bill_version_key(month_data.bills[current]):
+                versions[group] = position
+        return index
+    return month_data.derive('compare_index', build_compare_index, version=legislators.signature)
+
+
+# 多面向查詢 (/api/query) 的面向，以及立委面向最多回傳的人數
+QUERY_FACETS = ('category', 'party', 'stage', 'legislator')
+QUERY_LEGISLATOR_FACET_LIMIT = 50
+
+def positions_to_bitset(positions_by_value, size):
+    """將 {值: [法案索引位置]} 轉為 {'values': [值], 'rows': {值: 列}, 'matrix': 值 × 法案 的 bool 矩陣}"""
+    values = list(positions_by_value)
+    matrix = np.zeros((len(values), size), dtype=bool)
+    for row, positions in enumerate(positions_by_value.values()):
+        matrix[row, positions] = True
+    return {'values': values, 'rows': {value: row for row, value in enumerate(values)}, 'matrix': matrix}
+
+def get_facet_bitsets(month_data, legislators):
+    """
+    取得單一月份各面向的位元集合 (依立委資料版本快取，沒有立委資料時不含政黨面向)：
+    {面向: {'values', 'rows', 'matrix'}}，以及各法案的 bill_no。
+    """
+    def build_facet_bitsets(month_data):
+        size = len(month_data.bills)
+        category_positions = {category: [] for category in CATEGORY_DEFINITIONS}
+        for position, bill in enumerate(month_data.bills):
+            for category in bill.get('categories') or []:
+                category_positions.setdefault(category, []).append(position)
+        legislator_positions = {
+            name: sorted(set(activity['proposed']) | set(activity['cosigned']))
+            for name, activity in month_data.derive('legislator_index', build_legislator_index).items()
+        }
+        facets = {
+            'category': positions_to_bitset(category_positions, size),
+            'stage': positions_to_bitset(month_data.derive('progress_index', build_progress_index)['stage_positions'], size),
+            'legislator': positions_to_bitset(legislator_positions, size),
+        }
+        if legislators is not None:
+            facets['party'] = positions_to_bitset(get_party_index(month_data, legislators)['positions'], size)
+        return {
+            'facets': facets,
+            'bill_nos': [bill.get('bill_no') for bill in month_data.bills],
+        }
+    version = legislators.signature if legislators is not None else None
+    return month_data.derive('facet_bitsets', build_facet_bitsets, version=version)
+
+def query_month_facets(bitsets, selected):
+    """
+    在單一月份的位元集合上套用篩選 (同一面向內為 OR，不同面向間為 AND)。
+    回傳 (符合的法案索引位置, {面向: 各值的數量})；每個面向的數量套用的是「其他」面向的篩選，
+    因此已選取的面向仍可看到切換成其他值時的數量。
+    """
+    size = len(bitsets['bill_nos'])
+    masks = {}
+    for facet, values in selected.items():
+        bitset = bitsets['facets'][facet]
+        rows = [bitset['rows'][value] for value in values if value in bitset['rows']]
+        masks[facet] = bitset['matrix'][rows].any(axis=0) if rows else np.zeros(size, dtype=bool)
+
+    matched = np.ones(size, dtype=bool)
+    for mask in masks.values():
+        matched &= mask
+
+    counts = {}
+    for facet, bitset in bitsets['facets'].items():
+        others = matched
+        if facet in masks:
+            others = np.ones(size, dtype=bool)
+            for other_facet, mask in masks.items():
+                if other_facet != facet:
+                    others &= mask
+        counts[facet] = dict(zip(bitset['values'], np.count_nonzero(bitset['matrix'] & others, axis=1).tolist()))
+    return np.flatnonzero(matched), counts
+
+
+class LRUCache:
+    """以項目數量為上限的執行緒安全 LRU 快取"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 條號解析：與前端 extractArticleTitle / chineseToArabic / sortArticleTitles 相同的規則
+ARTICLE_TITLE_PATTERN = re.compile(r'^(第[一二三四五六七八九十百千零]+(章|條(之[一二三四五六七八九十百千零]+)?))')
+CHINESE_DIGITS = {'零': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+CHINESE_UNITS = {'十': 10, '百': 100, '千': 1000, '萬': 10000}
+
+def extract_article_title(text):
+    """取出條文開頭的條號，例如 `第二十二條之十六`，沒有條號時回傳 None"""
+    if not text:
+        return None
+    match = ARTICLE_TITLE_PATTERN.match(text)
+    return match.group(0) if match else None
+
+def chinese_numeral_to_int(numeral):
+    """將中文數字轉為整數，例如 `二十二` -> 22、`一百零五` -> 105"""
+    result = section = number = 0
+    for char in numeral:
+        if char in CHINESE_DIGITS:
+            number = CHINESE_DIGITS[char]
+            continue
+        unit = CHINESE_UNITS.get(char)
+        if unit is None:
+            continue
+        if unit == 10 and number == 0:
+            number = 1
+        section += number * unit
+        number = 0
+        if unit >= 10000:
+            result += section
+            section = 0
+    return result + section + number
+
+def article_sort_key(title):
+    """條號排序：章在條之前，再依主號、之N 的數字排序"""
+    main_match = re.search(r'第([一二三四五六七八九十百千零]+)(章|條)', title)
+    sub_match = re.search(r'之([一二三四五六七八九十百千零]+)', title)
+    return (
+        0 if '章' in title else 1,
+        chinese_numeral_to_int(main_match.group(1)) if main_match else 0,
+        chinese_numeral_to_int(sub_match.group(1)) if sub_match else 0,
+    )
+
+def get_article_map(bill):
+    """將法案的 comparison_table 依條號整理成 {條號: 條文項目}"""
+    article_map = {}
+    for item in bill.get('comparison_table') or []:
+        title = extract_article_title(item.get('modified_text')) or extract_article_title(item.get('current_text'))
+        if title:
+            article_map[title] = item
+    return article_map
+
+def build_article_titles(month_data):
+    """建立單一月份各法案 comparison_table 中的條號列表 (依列的順序，沒有條號的列為 None)"""
+    return [
+        [
+            extract_article_title(item.get('modified_text')) or extract_article_title(item.get('current_text'))
+            for item in bill.get('comparison_table') or []
+        ]
+        for bill in month_data.bills
+    ]
+
+# 由法案標題取出法律名稱：標題中「增訂」、「第…條」、「部分條文」、「修正草案」等字樣之前的部分
+LAW_NAME_SPLIT_PATTERN = re.compile(r'增訂|增修|刪除|部分|第[一二三四五六七八九十百千零]+[條章]|條文|修正|草案')
+ARTICLE_NUMBER_PATTERN = re.compile(r'^(\d+)(?:(?:-|之)(\d+))?$')
+
+def extract_law_name(bill):
+    """法案修正的法律名稱，例如 `國際金融業務條例第二十二條之十六條文修正草案` -> `國際金融業務條例`"""
+    return LAW_NAME_SPLIT_PATTERN.split(get_bill_title(bill), 1)[0].strip() or None
+
+def parse_article_number(text):
+    """
+    將條號轉為 (條, 之N) 數字組，例如 `第二十二條之十六` -> (22, 16)；
+    也接受阿拉伯數字寫法 `22-16`、`22之16`、`22`。無法解析時回傳 None。
+    """
+    text = (text or '').strip()
+    title = extract_article_title(text)
+    if title is not None and '條' in title:
+        return article_sort_key(title)[1:]
+    match = ARTICLE_NUMBER_PATTERN.match(text)
+    if match:
+        return (int(match.group(1)), int(match.group(2) or 0))
+    return None
+
+def build_article_index(month_data):
+    """
+    建立單一月份的條文索引 (由 article_titles 推導，章名不列入)：
+    {法律名稱: {(條, 之N): {'title': 條號, 'refs': [(法案索引位置, comparison_table 列)]}}}
+    """
+    index = {}
+    article_titles = month_data.derive('article_titles', build_article_titles)
+    for position, bill in enumerate(month_data.bills):
+        titles = article_titles[position]
+        if not any(titles):
+            continue
+        law = extract_law_name(bill)
+        if not law:
+            continue
+        articles = index.setdefault(law, {})
+        for row, title in enumerate(titles):
+            if not title or '條' not in title:
+                continue
+            entry = articles.setdefault(article_sort_key(title)[1:], {'title': title, 'refs': []})
+            entry['refs'].append((position, row))
+    return index
+
+
+# 條文差異比較：逐字 diff 的結果快取數量上限，可用環境變數 DIFF_CACHE_MAX_ENTRIES 調整
+DIFF_CACHE_MAX_ENTRIES = int(os.environ.get('DIFF_CACHE_MAX_ENTRIES', 4096))
+DIFF_MAX_VERSIONS = 5
+article_diff_cache = LRUCache(DIFF_CACHE_MAX_ENTRIES)
+
+def diff_hunks(base_text, new_text):
+    """
+    逐字比較兩段文字，回傳 [[op, text], ...]，op 為 '=' (相同)、'+' (新增)、'-' (刪除)。
+    基準文字為空、為「無」或兩者相同時，整段視為相同 (與前端 generateDiffHTML 一致)。
+    """
+    if base_text == new_text or not new_text:
+        return [['=', new_text or '']]
+    if not base_text or base_text == '無':
+        return [['=', new_text]]
+    hunks = []
+    matcher = difflib.SequenceMatcher(None, base_text, new_text, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            hunks.append(['=', new_text[j1:j2]])
+            continue
+        if tag in ('delete', 'replace'):
+            hunks.append(['-', base_text[i1:i2]])
+        if tag in ('insert', 'replace'):
+            hunks.append(['+', new_text[j1:j2]])
+    return hunks
+
+def compute_article_diff(title, articles):
+    """
+    比較同一條文在各版本中的內容：
+    - 條文內容與現行條文比較 (沒有現行條文時與第一個版本比較)。
+    - 說明欄位與前一個版本鏈式比較。
+    articles 為各版本該條的條文項目 (該版本沒有此條時為 None)。
+    """
+    current_text = next((article['current_text'] for article in articles if article and article.get('current_text')), None)
+    # 資料中以「無」表示沒有現行條文 (新增條文)，與沒有現行條文相同處理
+    if current_text == '無':
+        current_text = None
+    first_text = (articles[0].get('modified_text') or '') if articles[0] else ''
+    text_base = current_text or first_text
+
+    versions = []
+    for index, article in enumerate(articles):
+        proposed_text = (article.get('modified_text') or '') if article else '此版本無相關條文'
+        explanation = (article.get('explanation') or '無') if article else '--'
+        if index == 0:
+            explanation_diff = [['=', explanation]]
+        else:
+            previous = articles[index - 1]
+            explanation_diff = diff_hunks((previous.get('explanation') or '') if previous else '', explanation)
+        text_diff = diff_hunks(text_base, proposed_text)
+        versions.append({
+            'has_article': article is not None,
+            'text_diff': text_diff,
+            'explanation_diff': explanation_diff,
+        })
+    return {
+        'title': title,
+        'current_text': current_text,
+        'has_difference': any(op == '+' for version in versions
+                              for diff in (version['text_diff'], version['explanation_diff'])
+                              for op, _ in diff),
+        'versions': versions,
+    }
+
+def get_article_diff(bill_nos, title, articles):
+    """以 (bill_no 組合, 條號) 快取的條文差異；內容指紋不同 (資料更新) 時重新計算"""
+    fingerprint = hashlib.sha1()
+    for article in articles:
+        for key in ('modified_text', 'current_text', 'explanation'):
+            fingerprint.update(((article or {}).get(key) or '').encode('utf-8'))
+            fingerprint.update(b'\x00')
+    cache_key = (tuple(bill_nos), title, fingerprint.hexdigest())
+    result = article_diff_cache.get(cache_key)
+    if result is None:
+        result = compute_article_diff(title, articles)
+        article_diff_cache.put(cache_key, result)
+    return result
+
+
+# 相關法案推薦：以這些欄位的字元 n-gram 計算 TF-IDF 向量
+RELATED_TEXT_FIELDS = ('bill_name', 'reason', 'ai_analysis')
+RELATED_MAX_K = 50
+# 以雜湊將 n-gram 對應到固定維度，各月份的詞頻矩陣不需共用詞彙表即可直接合併
+related_vectorizer = HashingVectorizer(
+    analyzer='char', ngram_range=(2, 3), n_features=2 ** 20,
+    alternate_sign=False, norm=None, dtype=np.float32,
+) if HashingVectorizer is not None else None
+
+def build_term_counts(month_data):
+    """建立單一月份的詞頻矩陣 (法案 × 字元 n-gram，稀疏)，每列對應 bills 中同一位置的法案"""
+    texts = [
+        '\n'.join(str(bill.get(field) or '') for field in RELATED_TEXT_FIELDS).lower()
+        for bill in month_data.bills
+    ]
+    return related_vectorizer.transform(texts).tocsr()
+
+# 合併後的 TF-IDF 矩陣，以月份組合 (含檔案簽章) 為 key
+related_matrix_cache = LRUCache(4)
+
+def get_related_matrix(month_entries):
+    """
+    合併各月份 (已快取) 的詞頻矩陣，以這些月份計算 IDF 並將每列 L2 正規化，
+    兩列的內積即為餘弦相似度。回傳 {'matrix', 'rows': [(MonthData, 位置)], 'row_of': {bill_no: 列}}
+    """
+    cache_key = tuple((month_data.year, month_data.month, month_data.signature) for month_data in month_entries)
+    related = related_matrix_cache.get(cache_key)
+    if related is None:
+        counts = sparse.vstack([month_data.derive('term_counts', build_term_counts) for month_data in month_entries])
+        rows = [(month_data, position) for month_data in month_entries for position in range(len(month_data.bills))]
+        row_of = {}
+        for row, (month_data, position) in enumerate(rows):
+            row_of.setdefault(month_data.bills[position].get('bill_no'), row)
+        related = {
+            'matrix': TfidfTransformer(sublinear_tf=True).fit_transform(counts).tocsr(),
+            'rows': rows,
+            'row_of': row_of,
+        }
+        related_matrix_cache.put(cache_key, related)
+    return related
+
+# 共用資料快照檔 (billsnap)：設定後改為監看並 mmap 這個檔案，不再自行讀取資料夾 (見 gunicorn.conf.py)
+SHARED_SNAPSHOT_PATH = os.environ.get('SHARED_SNAPSHOT_PATH')
+# 背景資料監看：定期掃描資料夾的間隔 (秒)。預設停用 (0)，由 BillStore 按需載入月份並受
+# BILL_STORE_MAX_BYTES 的記憶體預算限制；啟用後所有月份與索引都常駐記憶體 (不受預算限制)，
+# 適合資料量可完整放進記憶體的部署。共用資料快照模式的資料在 mmap 中，預設每 5 秒檢查一次。
+DATA_WATCH_INTERVAL = float(os.environ.get('DATA_WATCH_INTERVAL', 5 if SHARED_SNAPSHOT_PATH else 0))
+MONTH_FILE_PATTERN = re.compile(r'ai_enriched_data_(\d{4})_(\d{2})\.json$')
+
+def compute_data_version(file_signatures):
+    """
+    由 [(檔名, mtime_ns, 大小)] 計算資料版本字串與最後修改時間 (datetime)，
+    作為 ETag / Last-Modified 的依據。
+    """
+    digest = hashlib.sha1()
+    latest_mtime_ns = 0
+    for name, mtime_ns, size in sorted(file_signatures):
+        digest.update(f"{name}:{mtime_ns}:{size};".encode('utf-8'))
+        latest_mtime_ns = max(latest_mtime_ns, mtime_ns)
+    return digest.hexdigest(), datetime.fromtimestamp(latest_mtime_ns // 10**9, tz=timezone.utc)
+
+
+class DataSnapshot:
+    """資料夾在某一時間點的唯讀視圖：各月份的 MonthData、立委資料與對應的資料版本"""
+
+    def __init__(self, entries, legislators):
+        self.entries = MappingProxyType(dict(entries))
+        # 最新的月份在前，與 get_available_months 相同
+        self.months = tuple(sorted(self.entries, reverse=True))
+        self.legislators = legislators
+        self.files = tuple(
+            (f"ai_enriched_data_{year}_{month:02d}.json", entry.mtime, entry.size)
+            for (year, month), entry in sorted(self.entries.items())
+        )
+        if legislators is not None:
+            self.files += (('legislators.json', *legislators.signature),)
+        self.version, self.last_modified = compute_data_version(self.files)
+
+    @classmethod
+    def from_shared(cls, reader):
+        """
+        由共用資料快照檔 (SnapshotReader) 建立快照。法案與預先建立的索引都留在 mmap 中，
+        索引在第一次取用時才解碼 (見 SHARED_SNAPSHOT_INDEXES)，worker 不必各自重建。
+        """
+        legislators = reader.read_legislators()
+        legislators = LegislatorData(*legislators) if legislators is not None else None
+        entries = {}
+        for month in reader.months:
+            arrays = {name: reader.read_raw(*location) for name, location in month['arrays'].items()}
+            shared_indexes = {}
+            for key, (_, _, _, decode, versioned) in SHARED_SNAPSHOT_INDEXES.items():
+                version = legislators.signature if versioned and legislators is not None else None
+                if key in month['indexes']:
+                    loader = (lambda location=month['indexes'][key], decode=decode, arrays=arrays:
+                              decode(reader.read_heavy(*location), arrays))
+                elif key in month['tables']:
+                    loader = lambda location=month['tables'][key]: reader.read_rows(location)
+                elif key in month['postings']:
+                    loader = lambda location=month['postings'][key]: PackedPostings(reader.read_raw(*location))
+                else:
+                    continue
+                shared_indexes[key] = (version, loader)
+            shared_indexes['encoded_bills'] = (None, lambda month=month: {
+                'joined': reader.read_raw(*month['encoded']),
+                'offsets': reader.read_raw(*month['encoded_offsets']).cast('Q'),
+            })
+            entries[(month['year'], month['month'])] = MonthData(
+                month['year'], month['month'], month['bills'], *month['signature'],
+                memory_size=0, shared_indexes=shared_indexes,
+            )
+        return cls(entries, legislators)
+
+
+def warm_month_indexes(month_data, legislators):
+    """預先建立常用的衍生索引，讓請求不必負擔第一次建立的成本"""
+    month_data.derive('aggregates', build_month_aggregates)
+    month_data.derive('progress_index', build_progress_index)
+    month_data.derive('bill_no_index', build_bill_no_index)
+    month_data.derive('legislator_index', build_legislator_index)
+    month_data.derive('search_index', build_search_index)
+    if legislators is not None:
+        get_party_index(month_data, legislators)
+        get_venn_index(month_data, legislators)
+        get_compare_index(month_data, legislators)
+    if related_vectorizer is not None:
+        month_data.derive('term_counts', build_term_counts)
+    month_data.derive('article_index', build_article_index)
+    if np is not None:
+        get_facet_bitsets(month_data, legislators)
+
+
+class DataWatcher:
+    """
+    背景執行緒定期掃描資料夾，偵測月份檔案與 legislators.json 的新增、修改與刪除。
+
+    - 變動的檔案在背景解析與驗證 (寫到一半或格式錯誤的檔案會沿用前一版)，並預先建立衍生索引。
+    - 完成後以單一指派替換成新的 DataSnapshot，請求只會看到完整一致的資料，
+      也不必再掃描資料夾或解析檔案。
+    - 第一份快照完成前，請求仍經由 BillStore 與 get_legislators 按需載入。
+    - 快照中的月份全部常駐記憶體，不受 BillStore 的記憶體預算限制，因此預設不啟用。
+    - 指定 snapshot_path 時改為監看共用資料快照檔，檔案被重新建立時重新 mmap 並換上。
+    """
+
+    def __init__(self, data_folder, interval=DATA_WATCH_INTERVAL, snapshot_path=None):
+        self.data_folder = data_folder
+        self.interval = interval
+        self.snapshot_path = snapshot_path
+        self.snapshot = None
+        self.refreshes = 0
+        self._last_scan = None
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def wait_ready(self, timeout=None):
+        """等待第一份快照建立完成；監看未啟動時直接回傳目前是否已有快照"""
+        if self._thread is None:
+            return self.snapshot is not None
+        return self._ready.wait(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"更新資料快照時發生錯誤: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def scan(self):
+        """回傳 ({(year, month): (路徑, 簽章)}, legislators.json 的 (路徑, 簽章) 或 None)"""
+        month_files = {}
+        legislators_file = None
+        try:
+            with os.scandir(self.data_folder) as entries:
+                for entry in entries:
+                    match = MONTH_FILE_PATTERN.match(entry.name)
+                    if match is None and entry.name != 'legislators.json':
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    if match is None:
+                        legislators_file = (entry.path, signature)
+                    else:
+                        month_files[(int(match.group(1)), int(match.group(2)))] = (entry.path, signature)
+        except OSError as e:
+            print(f"掃描資料夾 {self.data_folder} 時發生錯誤: {e}")
+        return month_files, legislators_file
+
+    def refresh(self):
+        """掃描一次資料夾，有變動時建立並換上新的快照；回傳是否換上了新快照"""
+        if self.snapshot_path:
+            return self.refresh_from_shared_snapshot()
+        with self._refresh_lock:
+            scan = self.scan()
+            if scan == self._last_scan:
+                return False
+            month_files, legislators_file = scan
+            previous = self.snapshot
+
+            legislators = previous.legislators if previous is not None else None
+            if legislators_file is None:
+                legislators = None
+            elif legislators is None or legislators.signature != legislators_file[1]:
+                legislators = load_legislators_file(*legislators_file) or legislators
+            legislators_changed = previous is None or legislators is not previous.legislators
+
+            entries = {}
+            for (year, month), (file_path, signature) in month_files.items():
+                old_entry = previous.entries.get((year, month)) if previous is not None else None
+                if old_entry is not None and old_entry.signature == signature:
+                    entry = old_entry
+                else:
+                    entry = load_month_file(year, month, file_path, signature) or old_entry
+                if entry is None:
+                    continue
+                if entry is not old_entry or legislators_changed:
+                    try:
+                        warm_month_indexes(entry, legislators)
+                    except Exception as e:
+                        print(f"建立 {year}-{month:02d} 的索引時發生錯誤: {e}")
+                entries[(year, month)] = entry
+
+            self._last_scan = scan
+            if (previous is not None and not legislators_changed and previous.entries.keys() == entries.keys()
+                    and all(previous.entries[key] is entry for key, entry in entries.items())):
+                # 變動的檔案都無法載入 (例如仍在寫入中)，沿用目前的快照
+                return False
+            self.snapshot = DataSnapshot(entries, legislators)
+            self.refreshes += 1
+            # 快照啟用後不再需要按需載入的快取
+            bill_store.clear()
+            self._ready.set()
+            return True
+
+    def refresh_from_shared_snapshot(self):
+        """共用快照模式：快照檔被替換 (重新建立) 時重新 mmap 並換上；回傳是否換上了新快照"""
+        with self._refresh_lock:
+            try:
+                stat = os.stat(self.snapshot_path)
+            except OSError:
+                return False
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if signature == self._last_scan:
+                return False
+            self._last_scan = signature
+            reader = open_snapshot(self.snapshot_path)
+            if reader is None:
+                return False
+            self.snapshot = DataSnapshot.from_shared(reader)
+            self.refreshes += 1
+            bill_store.clear()
+            self._ready.set()
+            return True
+
+
+data_watcher = DataWatcher(DATA_FOLDER, snapshot_path=SHARED_SNAPSHOT_PATH)
+
+def current_snapshot():
+    """
+    目前使用中的資料快照 (同一個請求內固定使用請求開始時的快照)；
+    背景監看未啟用或第一份快照尚未完成時回傳 None。
+    """
+    if not has_request_context():
+        return data_watcher.snapshot
+    if 'data_snapshot' not in g:
+        g.data_snapshot = data_watcher.snapshot
+    return g.data_snapshot
+
+def batch_pinned(key, load):
+    """
+    批次查詢在未使用資料快照 (背景監看停用) 時，固定各子查詢看到的資料：
+    同一個 key 在整個批次中只以 load() 載入一次，之後的子查詢沿用同一份結果，
+    批次進行中檔案被替換也不會混用新舊資料。不在批次查詢中時直接回傳 load()。
+    """
+    pinned = g.get('batch_pinned') if has_request_context() else None
+    if pinned is None:
+        return load()
+    if key not in pinned:
+        pinned[key] = load()
+    return pinned[key]
+
+def get_month_data(year, month):
+    """取得指定月份的 MonthData (來自目前的資料快照，或經由 BillStore 載入)，月份不存在時回傳 None"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot.entries.get((year, month))
+    return batch_pinned(('month', year, month), lambda: bill_store.get_month(year, month))
+
+def start_background_services():
+    """
+    啟動背景資料監看。必須在模組完整載入後才呼叫 (背景執行緒會用到之後才定義的函式)：
+    `python app.py` 啟動伺服器前，或 gunicorn worker 載入 app 之後 (見 gunicorn.conf.py)。
+    """
+    if DATA_WATCH_INTERVAL > 0:
+        data_watcher.start()
+
+def array_to_snapshot(arrays, name, array):
+    """將 numpy 陣列放進快照的陣列區 (讀取時直接對應 mmap，不複製)，回傳記錄 dtype 與形狀的描述"""
+    arrays[name] = np.ascontiguousarray(array).tobytes()
+    return {'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+def array_from_snapshot(arrays, spec):
+    return np.frombuffer(arrays[spec['name']], dtype=spec['dtype']).reshape(spec['shape'])
+
+def sparse_to_snapshot(arrays, name, matrix):
+    return {
+        'shape': list(matrix.shape),
+        **{part: array_to_snapshot(arrays, f"{name}.{part}", getattr(matrix, part))
+           for part in ('data', 'indices', 'indptr')},
+    }
+
+def sparse_from_snapshot(arrays, spec):
+    parts = [array_from_snapshot(arrays, spec[part]) for part in ('data', 'indices', 'indptr')]
+    return sparse.csr_matrix(tuple(parts), shape=tuple(spec['shape']), copy=False)
+
+def encode_article_index(index, arrays):
+    """條文索引的 key 是 (條, 之N) tuple，msgpack 無法還原為 tuple key，改存成列表"""
+    return {
+        law: [[number[0], number[1], entry['title'], entry['refs']] for number, entry in articles.items()]
+        for law, articles in index.items()
+    }
+
+def decode_article_index(encoded, arrays):
+    return {
+        law: {
+            (main, sub): {'title': title, 'refs': [tuple(ref) for ref in refs]}
+            for main, sub, title, refs in articles
+        }
+        for law, articles in encoded.items()
+    }
+
+def encode_venn_index(index, arrays):
+    return {'regions': [[list(region), positions] for region, positions in index['regions'].items()],
+            'non_partisan': index['non_partisan']}
+
+def decode_venn_index(encoded, arrays):
+    return {'regions': {tuple(region): positions for region, positions in encoded['regions']},
+            'non_partisan': encoded['non_partisan']}
+
+def encode_facet_bitsets(bitsets, arrays):
+    return {
+        'facets': {
+            facet: {'values': bitset['values'], 'matrix': array_to_snapshot(arrays, f"facet.{facet}", bitset['matrix'])}
+            for facet, bitset in bitsets['facets'].items()
+        },
+        'bill_nos': bitsets['bill_nos'],
+    }
+
+def decode_facet_bitsets(encoded, arrays):
+    return {
+        'facets': {
+            facet: {
+                'values': bitset['values'],
+                'rows': {value: row for row, value in enumerate(bitset['values'])},
+                'matrix': array_from_snapshot(arrays, bitset['matrix']),
+            }
+            for facet, bitset in encoded['facets'].items()
+        },
+        'bill_nos': encoded['bill_nos'],
+    }
+
+def keep_as_is(value, arrays):
+    return value
+
+def get_shared_term_counts(month_data, legislators):
+    if related_vectorizer is None:
+        return None
+    return month_data.derive('term_counts', build_term_counts)
+
+def get_shared_cosponsor_matrix(month_data, legislators):
+    if legislators is None or sparse is None:
+        return None
+    return get_month_cosponsor_matrix(month_data, legislators)
+
+def get_shared_facet_bitsets(month_data, legislators):
+    if np is None:
+        return None
+    return get_facet_bitsets(month_data, legislators)
+
+def with_legislators(getter):
+    """依賴立委資料的索引：沒有立委資料時不寫入快照"""
+    return lambda month_data, legislators: getter(month_data, legislators) if legislators is not None else None
+
+# 寫入共用資料快照的衍生索引，worker 直接由 mmap 解碼而不必各自重建：
+# key -> (取得索引 (MonthData, LegislatorData)，無法建立時回傳 None, 存放方式, 編碼, 解碼, 是否依賴立委資料)
+# 存放方式：'value' 整個以 msgpack 保存；'rows' 每列各自保存，取用時才解碼單一列；
+# 'postings' 以 PackedPostings 格式保存，直接在 mmap 上查詢。
+# 依賴立委資料的索引以快照中立委資料的簽章作為版本。
+SHARED_SNAPSHOT_INDEXES = {
+    'aggregates': (lambda month_data, legislators: month_data.derive('aggregates', build_month_aggregates),
+                   'value', keep_as_is, lambda encoded, arrays: restore_aggregates(encoded), False),
+    'progress_index': (lambda month_data, legislators: month_data.derive('progress_index', build_progress_index),
+                       'value', keep_as_is, keep_as_is, False),
+    'bill_no_index': (lambda month_data, legislators: month_data.derive('bill_no_index', build_bill_no_index),
+                      'value', keep_as_is, keep_as_is, False),
+    'bill_no_order': (lambda month_data, legislators: month_data.derive('bill_no_order', build_bill_no_order),
+                      'value', keep_as_is, keep_as_is, False),
+    'category_positions': (lambda month_data, legislators: month_data.derive('category_positions', build_category_positions),
+                           'value', keep_as_is, keep_as_is, False),
+    'legislator_index': (lambda month_data, legislators: month_data.derive('legislator_index', build_legislator_index),
+                         'value', keep_as_is, lambda encoded, arrays: restore_legislator_index(encoded), False),
+    'article_titles': (lambda month_data, legislators: month_data.derive('article_titles', build_article_titles),
+                       'value', keep_as_is, keep_as_is, False),
+    'article_index': (lambda month_data, legislators: month_data.derive('article_index', build_article_index),
+                      'value', encode_article_index, decode_article_index, False),
+    'search_index': (lambda month_data, legislators: month_data.derive('search_index', build_search_index),
+                     'postings', keep_as_is, keep_as_is, False),
+    'search_texts': (lambda month_data, legislators: month_data.derive('search_texts', build_search_texts),
+                     'rows', keep_as_is, keep_as_is, False),
+    'term_counts': (get_shared_term_counts, 'value',
+                    lambda matrix, arrays: sparse_to_snapshot(arrays, 'term_counts', matrix),
+                    lambda encoded, arrays: sparse_from_snapshot(arrays, encoded), False),
+    'party_index': (with_legislators(get_party_index), 'value', keep_as_is, keep_as_is, True),
+    'venn_index': (with_legislators(get_venn_index), 'value', encode_venn_index, decode_venn_index, True),
+    'compare_index': (with_legislators(get_compare_index), 'value', keep_as_is, keep_as_is, True),
+    'cosponsor_matrix': (get_shared_cosponsor_matrix, 'value',
+                         lambda matrix, arrays: sparse_to_snapshot(arrays, 'cosponsor_matrix', matrix),
+                         lambda encoded, arrays: sparse_from_snapshot(arrays, encoded), True),
+    # 沒有立委資料時也會建立 (不含政黨面向)，版本為 None
+    'facet_bitsets': (get_shared_facet_bitsets, 'value', encode_facet_bitsets, decode_facet_bitsets, True),
+}
+
+def build_shared_snapshot(snapshot_path):
+    """
+    讀取資料夾並建立共用資料快照檔 (含預先建立的索引與預先編碼的 JSON)，回傳快照涵蓋的月份數。
+    資料更新時重新執行一次即可，各 worker 偵測到檔案被替換後會重新 mmap。
+    """
+    watcher = DataWatcher(DATA_FOLDER, interval=0)
+    watcher.refresh()
+    snapshot = watcher.snapshot
+    legislators = snapshot.legislators
+    months = []
+    for (year, month), entry in sorted(snapshot.entries.items()):
+        encoded = build_encoded_bills(entry)
+        stored = {'indexes': {}, 'tables': {}, 'postings': {}, 'arrays': {}}
+        for key, (getter, storage, encode, _, _) in SHARED_SNAPSHOT_INDEXES.items():
+            value = getter(entry, legislators)
+            if value is None:
+                continue
+            value = encode(value, stored['arrays'])
+            if storage == 'rows':
+                stored['tables'][key] = value
+            elif storage == 'postings':
+                stored['postings'][key] = value
+            else:
+                stored['indexes'][key] = value
+        months.append({
+            'year': year,
+            'month': month,
+            'signature': entry.signature,
+            'bills': entry.bills,
+            'encoded': (encoded['joined'], encoded['offsets']),
+            **stored,
+        })
+    write_snapshot(
+        snapshot_path, months,
+        (legislators.data, legislators.signature) if legislators is not None else None,
+        snapshot.files,
+    )
+    return len(months)
+
+
+# --- 4. 輔助函式 ---
 
 def load_bill_data(year, month):
-    """一個共用的函式，用來讀取指定月份的法案資料"""
-    file_name = f"ai_enriched_data_{year}_{month:02d}.json"
-    file_path = os.path.join(DATA_FOLDER, file_name)
-    
-    if not os.path.exists(file_path):
-        return None # 如果檔案不存在，回傳 None
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"讀取檔案 {file_path} 時發生錯誤: {e}")
-        return None
+    """一個共用的函式，用來讀取指定月份的法案資料 (經由常駐快取，檔案不存在時回傳 None)"""
+    month_data = get_month_data(year, month)
+    return month_data.bills if month_data is not None else None
 
 def load_legislators_data():
-    """載入立委資料"""
-    file_path = os.path.join(DATA_FOLDER, "legislators.json")
-    
-    if not os.path.exists(file_path):
-        return None
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"讀取立委資料時發生錯誤: {e}")
-        return None
+    """載入立委資料 (經由快取)"""
+    legislators = get_legislators()
+    return legislators.data if legislators is not None else None
 
 def get_available_months():
     """獲取資料庫中所有可用的年月份"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return list(snapshot.months)
+    return list(batch_pinned(('available_months',), scan_available_months))
+
+def scan_available_months():
+    """掃描資料夾中的月份檔案，回傳由新到舊排序的 (年, 月) 列表"""
     pattern = os.path.join(DATA_FOLDER, "ai_enriched_data_*.json")
-    files = glob.glob(pattern)
+    with timed_phase('glob'):
+        files = glob.glob(pattern)
     available_months = []
     
     for file_path in files:
@@ -105,20 +1954,69 @@ def get_available_months():
     available_months.sort(reverse=True)
     return available_months
 
+def get_data_version():
+    """
+    以資料夾中所有月份檔案與 legislators.json 的 mtime/大小 計算資料版本，
+    回傳 (版本字串, 最後修改時間 datetime)；資料只在新檔案落地時才會改變。
+    背景監看啟用時直接使用目前快照的版本 (與快照中實際載入的檔案一致)。
+    """
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot.version, snapshot.last_modified
+    pattern = os.path.join(DATA_FOLDER, "ai_enriched_data_*.json")
+    file_signatures = []
+    with timed_phase('glob'):
+        paths = sorted(glob.glob(pattern)) + [os.path.join(DATA_FOLDER, "legislators.json")]
+        for file_path in paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            file_signatures.append((os.path.basename(file_path), stat.st_mtime_ns, stat.st_size))
+    return compute_data_version(file_signatures)
+
 def get_latest_months(count=3):
     """獲取最新的N個月份"""
     available_months = get_available_months()
     return available_months[:count]
 
+def load_month_entries(month_list):
+    """取得多個月份的 MonthData (略過不存在的月份)"""
+    month_entries = []
+    for year, month in month_list:
+        month_data = get_month_data(year, month)
+        if month_data is not None:
+            month_entries.append(month_data)
+    return month_entries
+
 def load_multiple_months_data(month_list):
     """載入多個月份的資料並合併"""
     all_bills = []
-    for year, month in month_list:
-        bills = load_bill_data(year, month)
-        if bills:
-            all_bills.extend(bills)
+    for month_data in load_month_entries(month_list):
+        all_bills.extend(month_data.bills)
     return all_bills
 
+def resolve_requested_months(start_month, end_month):
+    """
+    依查詢參數決定要使用的月份列表：未指定範圍時使用最新3個月，
+    否則回傳範圍內實際存在的月份。格式錯誤或沒有資料時直接 abort。
+    """
+    if not start_month or not end_month:
+        latest_months = get_latest_months(3)
+        if not latest_months:
+            abort(404, description="找不到任何法案資料。")
+        return latest_months
+
+    month_list = parse_month_range(start_month, end_month)
+    if not month_list:
+        abort(400, description="無效的月份範圍格式。")
+
+    available_set = set(get_available_months())
+    valid_months = [month for month in month_list if month in available_set]
+    if not valid_months:
+        abort(404, description="指定範圍內沒有找到任何法案資料。")
+    return valid_months
+
 def parse_month_range(start_month, end_month):
     """解析月份範圍字串，返回月份列表"""
     try:
@@ -146,59 +2044,361 @@ def analyze_party_participation(bills, legislators_data):
     if not legislators_data:
         return {}
     
-    # 建立立委姓名到政黨的對應表
+    # 建立立委姓名 (正規化後) 到政黨的對應表
     name_to_party = {}
     for legislator in legislators_data.get('jsonList', []):
-        name_to_party[legislator['name']] = legislator['party']
-    
-    # 統計各種政黨組合的法案數量
-    party_stats = {
-        '中國國民黨': [],
-        '民主進步黨': [],
-        '台灣民眾黨': [],
-        '中國國民黨+台灣民眾黨': [],
-        '中國國民黨+民主進步黨': [],
-        '民主進步黨+台灣民眾黨': [],
-        '無黨籍': []
-    }
+        name_to_party[normalize_legislator_name(legislator['name'])] = legislator['party']
     
+    # 依政黨遮罩將法案歸入各種政黨組合
+    party_stats = {label: [] for label in PARTY_COMBINATIONS}
     for bill in bills:
-        # 收集所有參與者（提案人+連署人）
-        all_participants = bill.get('proposers', []) + bill.get('cosigners', [])
-        
-        # 找出參與的政黨
-        participating_parties = set()
-        has_independent = False
-        
-        for participant in all_participants:
-            party = name_to_party.get(participant)
-            if party:
-                if party == '無黨籍':
-                    has_independent = True
-                elif party in ['中國國民黨', '民主進步黨', '台灣民眾黨']:
-                    participating_parties.add(party)
-        
-        # 根據政黨組合分類
-        if has_independent:
-            party_stats['無黨籍'].append(bill)
-        
-        # 扣除無黨籍後的政黨組合
-        if len(participating_parties) == 1:
-            party = list(participating_parties)[0]
-            party_stats[party].append(bill)
-        elif len(participating_parties) == 2:
-            parties = sorted(list(participating_parties))
-            if parties == ['中國國民黨', '台灣民眾黨']:
-                party_stats['中國國民黨+台灣民眾黨'].append(bill)
-            elif parties == ['中國國民黨', '民主進步黨']:
-                party_stats['中國國民黨+民主進步黨'].append(bill)
-            elif parties == ['民主進步黨', '台灣民眾黨']:
-                party_stats['民主進步黨+台灣民眾黨'].append(bill)
+        for label in MASK_TO_PARTY_LABELS[compute_party_mask(bill, name_to_party)]:
+            party_stats[label].append(bill)
     
     return party_stats
 
 
-# --- 4. 路由 (Routes) / API 端點 (Endpoints) ---
+# --- 5. 請求計時與指標 ---
+
+# 設定環境變數 REQUEST_METRICS=0 可關閉計時與指標收集
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS', '1') != '0'
+# 請求處理時間直方圖的上界 (秒)
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+@contextmanager
+def timed_phase(name):
+    """
+    將區塊的執行時間累計到目前請求的階段 `name` (glob / load / index / serialize / compress)。
+    巢狀的計時區塊只算在最外層的階段，各階段時間因此不會重複計算；不在請求中時不做任何事。
+    """
+    timings = g.get('phase_timings') if has_request_context() else None
+    if timings is None or g.active_phase is not None:
+        yield
+        return
+    g.active_phase = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+        g.active_phase = None
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """各路由的請求數、處理時間直方圖、各階段累計時間與輸出位元組數，以 Prometheus 文字格式輸出"""
+
+    def __init__(self, buckets=REQUEST_DURATION_BUCKETS):
+        self.buckets = buckets
+        self._durations = {}
+        self._requests = Counter()
+        self._phases = Counter()
+        self._bytes = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, route, status, duration, body_bytes, timings):
+        with self._lock:
+            histogram = self._durations.get(route)
+            if histogram is None:
+                # 各區間的計數 (最後一格為 +Inf)、總和
+                histogram = self._durations[route] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][bisect.bisect_left(self.buckets, duration)] += 1
+            histogram[1] += duration
+            self._requests[(route, status)] += 1
+            self._bytes[route] += body_bytes
+            for phase, seconds in timings.items():
+                self._phases[(route, phase)] += seconds
+
+    def render(self, caches):
+        with self._lock:
+            durations = {route: (list(counts), total) for route, (counts, total) in self._durations.items()}
+            requests_total = dict(self._requests)
+            phases = dict(self._phases)
+            bytes_total = dict(self._bytes)
+
+        lines = [
+            '# HELP bill_api_requests_total 請求數 (依路由與狀態碼)',
+            '# TYPE bill_api_requests_total counter',
+        ]
+        for (route, status), count in sorted(requests_total.items()):
+            lines.append(f'bill_api_requests_total{{route="{escape_label(route)}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP bill_api_request_duration_seconds 請求處理時間 (含串流輸出)',
+            '# TYPE bill_api_request_duration_seconds histogram',
+        ]
+        for route, (counts, total) in sorted(durations.items()):
+            label = escape_label(route)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'bill_api_request_duration_seconds_bucket{{route="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'bill_api_request_duration_seconds_sum{{route="{label}"}} {total:.6f}')
+            lines.append(f'bill_api_request_duration_seconds_count{{route="{label}"}} {cumulative}')
+
+        lines += [
+            '# HELP bill_api_phase_seconds_total 各處理階段累計時間',
+            '# TYPE bill_api_phase_seconds_total counter',
+        ]
+        for (route, phase), seconds in sorted(phases.items()):
+            lines.append(f'bill_api_phase_seconds_total{{route="{escape_label(route)}",phase="{phase}"}} {seconds:.6f}')
+
+        lines += [
+            '# HELP bill_api_response_bytes_total 回應位元組數 (壓縮後)',
+            '# TYPE bill_api_response_bytes_total counter',
+        ]
+        for route, count in sorted(bytes_total.items()):
+            lines.append(f'bill_api_response_bytes_total{{route="{escape_label(route)}"}} {count}')
+
+        lines += [
+            '# HELP bill_api_cache_hits_total 快取命中次數',
+            '# TYPE bill_api_cache_hits_total counter',
+        ]
+        lines += [f'bill_api_cache_hits_total{{cache="{name}"}} {cache.hits}' for name, cache in caches.items()]
+        lines += [
+            '# HELP bill_api_cache_misses_total 快取未命中次數',
+            '# TYPE bill_api_cache_misses_total counter',
+        ]
+        lines += [f'bill_api_cache_misses_total{{cache="{name}"}} {cache.misses}' for name, cache in caches.items()]
+        lines += [
+            '# HELP bill_api_cache_hit_ratio 快取命中率',
+            '# TYPE bill_api_cache_hit_ratio gauge',
+        ]
+        for name, cache in caches.items():
+            lookups = cache.hits + cache.misses
+            lines.append(f'bill_api_cache_hit_ratio{{cache="{name}"}} {cache.hits / lookups if lookups else 0:.6f}')
+
+        lines += [
+            '# HELP bill_store_resident_bytes 法案資料快取估計的常駐記憶體用量',
+            '# TYPE bill_store_resident_bytes gauge',
+            f'bill_store_resident_bytes {bill_store.resident_bytes}',
+            '# HELP bill_data_snapshot_refreshes_total 背景監看換上新資料快照的次數',
+            '# TYPE bill_data_snapshot_refreshes_total counter',
+            f'bill_data_snapshot_refreshes_total {data_watcher.refreshes}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+@app.before_request
+def start_request_timer():
+    """開始計時 (需在其他 before_request 之前註冊，條件式請求的檢查也會被計入)"""
+    if REQUEST_METRICS_ENABLED:
+        g.request_started = time.perf_counter()
+        g.phase_timings = {}
+        g.active_phase = None
+    return None
+
+@app.after_request
+def add_server_timing(response):
+    """
+    加上 Server-Timing 標頭 (各階段與其餘處理時間)，並在回應送出完畢後記錄指標。
+    此函式最先註冊，因此在壓縮等其他 after_request 之後才執行。
+    """
+    started = g.get('request_started')
+    if started is None:
+        return response
+    timings = dict(g.phase_timings)
+    elapsed = time.perf_counter() - started
+    entries = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+    entries.append(f"app;dur={max(elapsed - sum(timings.values()), 0) * 1000:.2f}")
+    entries.append(f"total;dur={elapsed * 1000:.2f}")
+    response.headers['Server-Timing'] = ', '.join(entries)
+
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    status = response.status_code
+    if response.is_streamed:
+        # 串流回應在送出時才知道大小
+        sent = [0]
+        chunks = response.response
+
+        def count_chunks():
+            try:
+                for chunk in chunks:
+                    sent[0] += len(chunk)
+                    yield chunk
+            finally:
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+        response.response = count_chunks()
+    else:
+        sent = [response.calculate_content_length() or 0]
+
+    response.call_on_close(lambda: request_metrics.observe(
+        route, status, time.perf_counter() - started, sent[0], timings,
+    ))
+    return response
+
+
+# --- 6. HTTP 條件式請求與壓縮快取 ---
+
+# 壓縮後回應的快取預算 (位元組)，可用環境變數 RESPONSE_CACHE_MAX_BYTES 調整
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# 小於此大小的回應不壓縮
+COMPRESS_MIN_BYTES = 1024
+
+
+class CompressedResponseCache:
+    """以 (ETag, 編碼) 為 key 的壓縮回應快取，依 LRU 順序淘汰超過預算的項目"""
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+compressed_response_cache = CompressedResponseCache()
+
+def choose_content_encoding():
+    """依 Accept-Encoding 選擇壓縮方式 (優先 br，其次 gzip)，不接受壓縮時回傳 None"""
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+def iter_compressed(chunks, encoding, cache_key):
+    """
+    逐段壓縮串流回應 (不必先把整個內容讀進記憶體)；完整輸出後，
+    若壓縮結果不超過快取預算，放進壓縮回應快取。
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor()
+        compress, finish = compressor.process, compressor.finish
+    else:
+        # wbits=31 產生 gzip 格式 (含標頭與檢查碼)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        compress, finish = compressor.compress, compressor.flush
+    cached = []
+    cached_size = 0
+    try:
+        for chunk in chunks:
+            compressed = compress(chunk)
+            if not compressed:
+                continue
+            if cached is not None:
+                cached.append(compressed)
+                cached_size += len(compressed)
+                if cached_size > compressed_response_cache.max_bytes:
+                    cached = None
+            yield compressed
+        compressed = finish()
+        yield compressed
+        if cached is not None:
+            cached.append(compressed)
+            compressed_response_cache.put(cache_key, b''.join(cached))
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def set_validator_headers(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    # 允許瀏覽器快取，但每次使用前都要以 ETag 重新驗證
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.before_request
+def handle_conditional_api_request():
+    """
+    /api/* 的 GET 請求：以資料檔案版本 + 請求路徑產生 ETag，
+    符合 If-None-Match / If-Modified-Since 時直接回傳 304，
+    已有相同內容的壓縮結果時直接回傳快取，不再執行檢視函式。
+    """
+    if request.method != 'GET' or not request.path.startswith('/api/'):
+        return None
+
+    data_version, last_modified = get_data_version()
+    etag = hashlib.sha1(f"{data_version}|{request.full_path}".encode('utf-8')).hexdigest()
+    g.api_validators = (etag, last_modified)
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+    if not_modified:
+        return set_validator_headers(Response(status=304), etag, last_modified)
+
+    encoding = choose_content_encoding()
+    if encoding is not None:
+        body = compressed_response_cache.get((etag, encoding))
+        if body is not None:
+            response = Response(body, mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+            return set_validator_headers(response, etag, last_modified)
+    return None
+
+@app.after_request
+def add_validators_and_compress(response):
+    """為成功的 /api/* 回應加上 ETag / Last-Modified，並壓縮 (每份內容只壓縮一次)"""
+    validators = g.pop('api_validators', None)
+    if validators is None or response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+    etag, last_modified = validators
+    set_validator_headers(response, etag, last_modified)
+
+    encoding = choose_content_encoding()
+    if encoding is None or response.mimetype != 'application/json':
+        return response
+    if response.is_streamed:
+        # 串流回應 (例如完整法案列表) 邊輸出邊壓縮，不先讀完整個內容
+        response.response = iter_compressed(response.iter_encoded(), encoding, (etag, encoding))
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    with timed_phase('compress'):
+        compressed = compress_body(body, encoding)
+    compressed_response_cache.put((etag, encoding), compressed)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+# --- 7. 路由 (Routes) / API 端點 (Endpoints) ---
 
 @app.route('/')
 def home():
@@ -235,49 +2435,30 @@ def about_page():
 
 @app.route('/api/party-stats', methods=['GET'])
 def get_party_stats():
-    """【新 API】: 獲取政黨分析統計資料"""
+    """【新 API】: 獲取政黨分析統計資料 (合併各月份預先計算的政黨參與索引)"""
     start_month = request.args.get('start')
     end_month = request.args.get('end')
     
+    # 載入立委資料與月份範圍
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    valid_months = resolve_requested_months(start_month, end_month)
+    
     try:
-        # 載入立委資料
-        legislators_data = load_legislators_data()
-        if not legislators_data:
-            abort(404, description="找不到立委資料。")
-        
-        # 載入法案資料
-        if not start_month or not end_month:
-            # 使用最新3個月的資料
-            latest_months = get_latest_months(3)
-            if not latest_months:
-                abort(404, description="找不到任何法案資料。")
-            all_bills = load_multiple_months_data(latest_months)
-        else:
-            # 使用指定範圍的資料
-            month_list = parse_month_range(start_month, end_month)
-            if not month_list:
-                abort(400, description="無效的月份範圍格式。")
-            
-            available_months = get_available_months()
-            available_set = set(available_months)
-            valid_months = [month for month in month_list if month in available_set]
-            
-            if not valid_months:
-                abort(404, description="指定範圍內沒有找到任何法案資料。")
-            
-            all_bills = load_multiple_months_data(valid_months)
-        
-        # 分析政黨參與情況
-        party_stats = analyze_party_participation(all_bills, legislators_data)
+        total_bills = 0
+        party_counts = Counter()
+        for month_data in load_month_entries(valid_months):
+            total_bills += len(month_data.bills)
+            party_counts.update(get_party_index(month_data, legislators)['counts'])
         
         # 計算統計數據
-        total_bills = len(all_bills)
         result = {
             'total_bills': total_bills,
             'party_counts': {
-                party: len(bills) for party, bills in party_stats.items()
+                party: party_counts.get(party, 0) for party in PARTY_COMBINATIONS
             },
-            'independent_participation_rate': len(party_stats['無黨籍']) / total_bills if total_bills > 0 else 0
+            'independent_participation_rate': party_counts.get('無黨籍', 0) / total_bills if total_bills > 0 else 0
         }
         
         return jsonify(result)
@@ -288,50 +2469,28 @@ def get_party_stats():
 
 @app.route('/api/party-bills', methods=['GET'])
 def get_party_bills():
-    """【新 API】: 獲取特定政黨組合的法案列表"""
+    """【新 API】: 獲取特定政黨組合的法案列表 (由各月份的政黨參與索引直接取出)"""
     party_type = request.args.get('party')
     start_month = request.args.get('start')
     end_month = request.args.get('end')
     
     if not party_type:
         abort(400, description="請指定政黨類型。")
+    if party_type not in PARTY_COMBINATIONS:
+        abort(404, description="找不到指定的政黨類型。")
+    
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    valid_months = resolve_requested_months(start_month, end_month)
     
     try:
-        # 載入立委資料
-        legislators_data = load_legislators_data()
-        if not legislators_data:
-            abort(404, description="找不到立委資料。")
-        
-        # 載入法案資料
-        if not start_month or not end_month:
-            # 使用最新3個月的資料
-            latest_months = get_latest_months(3)
-            if not latest_months:
-                abort(404, description="找不到任何法案資料。")
-            all_bills = load_multiple_months_data(latest_months)
-        else:
-            # 使用指定範圍的資料
-            month_list = parse_month_range(start_month, end_month)
-            if not month_list:
-                abort(400, description="無效的月份範圍格式。")
-            
-            available_months = get_available_months()
-            available_set = set(available_months)
-            valid_months = [month for month in month_list if month in available_set]
-            
-            if not valid_months:
-                abort(404, description="指定範圍內沒有找到任何法案資料。")
-            
-            all_bills = load_multiple_months_data(valid_months)
-        
-        # 分析政黨參與情況
-        party_stats = analyze_party_participation(all_bills, legislators_data)
+        party_selections = [
+            (month_data, get_party_index(month_data, legislators)['positions'][party_type])
+            for month_data in load_month_entries(valid_months)
+        ]
         
-        # 回傳指定政黨的法案
-        if party_type in party_stats:
-            return jsonify(party_stats[party_type])
-        else:
-            abort(404, description="找不到指定的政黨類型。")
+        return bill_list_response(party_selections)
         
     except Exception as e:
         print(f"獲取政黨法案列表時發生錯誤: {e}")
@@ -340,238 +2499,807 @@ def get_party_bills():
 @app.route('/api/bills/summary/<int:year>/<int:month>', methods=['GET'])
 def get_summary(year, month):
     """【原有 API】: 提供首頁儀表板需要的分類統計"""
-    bills = load_bill_data(year, month)
-    if bills is None:
+    aggregates = get_month_aggregates(year, month)
+    if aggregates is None:
         abort(404, description=f"找不到 {year} 年 {month} 月的法案資料。")
     
-    # 使用 Counter 來快速統計所有分類的數量
-    # 由於 ai_analysis.py 已經將分類標準化為短格式，這裡的計數會非常準確
-    category_counts = Counter()
-    for bill in bills:
-        category_counts.update(bill.get('categories', []))
-        
-    return jsonify(dict(category_counts))
+    # 分類數量在月份載入時已預先統計 (ai_analysis.py 已將分類標準化為短格式)
+    if request.args.get('by') == 'progress':
+        return jsonify({category: dict(counts) for category, counts in aggregates['category_stage_counts'].items()})
+    return jsonify(dict(aggregates['category_counts']))
 
 @app.route('/api/bills/summary-range', methods=['GET'])
 def get_summary_range():
-    """【新 API】: 提供多月份範圍的分類統計"""
+    """【新 API】: 提供多月份範圍的分類統計 (合併各月份預先統計的結果)"""
     start_month = request.args.get('start')  # 格式：2025-06
     end_month = request.args.get('end')      # 格式：2025-07
     
-    if not start_month or not end_month:
-        # 如果沒有指定範圍，使用最新的3個月
-        latest_months = get_latest_months(3)
-        if not latest_months:
-            abort(404, description="找不到任何法案資料。")
-        all_bills = load_multiple_months_data(latest_months)
-    else:
-        # 解析月份範圍
-        month_list = parse_month_range(start_month, end_month)
-        if not month_list:
-            abort(400, description="無效的月份範圍格式。")
-        
-        # 過濾出實際存在的月份
-        available_months = get_available_months()
-        available_set = set(available_months)
-        valid_months = [month for month in month_list if month in available_set]
-        
-        if not valid_months:
-            abort(404, description="指定範圍內沒有找到任何法案資料。")
-        
-        all_bills = load_multiple_months_data(valid_months)
-    
-    # 統計分類
-    category_counts = Counter()
-    for bill in all_bills:
-        category_counts.update(bill.get('categories', []))
+    valid_months = resolve_requested_months(start_month, end_month)
+    aggregates = merge_month_aggregates(valid_months)
     
-    return jsonify(dict(category_counts))
+    # ?by=progress 時回傳「分類 × 進度階段」的數量
+    if request.args.get('by') == 'progress':
+        return jsonify({category: dict(counts) for category, counts in aggregates['category_stage_counts'].items()})
+    return jsonify(dict(aggregates['category_counts']))
 
 @app.route('/api/bills/<int:year>/<int:month>', methods=['GET'])
 def get_bills(year, month):
-    """【升級版 API】: 現在可以根據分類進行篩選"""
-    bills = load_bill_data(year, month)
-    if bills is None:
+    """【升級版 API】: 現在可以根據分類進行篩選，並支援 fields 投影與 limit/cursor 分頁"""
+    month_data = get_month_data(year, month)
+    if month_data is None:
         abort(404, description=f"找不到 {year} 年 {month} 月的法案資料。")
     
     # 從 URL 查詢參數中獲取 'category' (例如: ...?category=工)
     category_filter = request.args.get('category')
     
+    if wants_plain_bill_list():
+        return bill_stream_response([month_data], category_filter)
+    
     if category_filter:
         # 如果有分類篩選，只回傳包含該分類 (短格式) 的法案
-        filtered_bills = [
-            bill for bill in bills 
-            if category_filter in bill.get('categories', [])
-        ]
-        return jsonify(filtered_bills)
+        return bill_list_response([(month_data, category_positions(month_data, category_filter))])
     else:
         # 如果沒有，回傳所有法案 (維持舊有功能)
-        return jsonify(bills)
+        return bill_list_response([(month_data, None)])
 
 @app.route('/api/bills-range', methods=['GET'])
 def get_bills_range():
-    """【新 API】: 獲取多月份範圍的法案資料，支援分類篩選"""
+    """【新 API】: 獲取多月份範圍的法案資料，支援分類篩選、fields 投影與 limit/cursor 分頁"""
     start_month = request.args.get('start')  # 格式：2025-06
     end_month = request.args.get('end')      # 格式：2025-07
     category_filter = request.args.get('category')
     
-    if not start_month or not end_month:
-        # 如果沒有指定範圍，使用最新的3個月
-        latest_months = get_latest_months(3)
-        if not latest_months:
-            abort(404, description="找不到任何法案資料。")
-        all_bills = load_multiple_months_data(latest_months)
-    else:
-        # 解析月份範圍
-        month_list = parse_month_range(start_month, end_month)
-        if not month_list:
-            abort(400, description="無效的月份範圍格式。")
-        
-        # 過濾出實際存在的月份
-        available_months = get_available_months()
-        available_set = set(available_months)
-        valid_months = [month for month in month_list if month in available_set]
-        
-        if not valid_months:
-            abort(404, description="指定範圍內沒有找到任何法案資料。")
-        
-        all_bills = load_multiple_months_data(valid_months)
+    valid_months = resolve_requested_months(start_month, end_month)
+    month_entries = load_month_entries(valid_months)
+    if wants_plain_bill_list():
+        return bill_stream_response(month_entries, category_filter)
     
     # 如果有分類篩選
     if category_filter:
-        filtered_bills = [
-            bill for bill in all_bills 
-            if category_filter in bill.get('categories', [])
-        ]
-        return jsonify(filtered_bills)
+        return bill_list_response([
+            (month_data, category_positions(month_data, category_filter)) for month_data in month_entries
+        ])
     else:
-        return jsonify(all_bills)
+        return bill_list_response([(month_data, None) for month_data in month_entries])
 
 @app.route('/api/bills/all/<int:year>/<int:month>', methods=['GET'])
 def get_all_bills(year, month):
     """【原有 API】: 提供所有法案資料供搜尋功能使用"""
-    bills = load_bill_data(year, month)
-    if bills is None:
+    month_data = get_month_data(year, month)
+    if month_data is None:
         abort(404, description=f"找不到 {year} 年 {month} 月的法案資料。")
     
-    return jsonify(bills)
+    return bill_stream_response([month_data])
 
 @app.route('/api/bills/all-range', methods=['GET'])
 def get_all_bills_range():
-    """【新 API】: 提供多月份範圍的所有法案資料供搜尋功能使用"""
+    """【新 API】: 提供多月份範圍的所有法案資料供搜尋功能使用，支援 fields 投影與 limit/cursor 分頁"""
     start_month = request.args.get('start')  # 格式：2025-06
     end_month = request.args.get('end')      # 格式：2025-07
     
-    if not start_month or not end_month:
-        # 如果沒有指定範圍，使用最新的3個月
-        latest_months = get_latest_months(3)
-        if not latest_months:
-            abort(404, description="找不到任何法案資料。")
-        all_bills = load_multiple_months_data(latest_months)
-    else:
-        # 解析月份範圍
-        month_list = parse_month_range(start_month, end_month)
-        if not month_list:
-            abort(400, description="無效的月份範圍格式。")
-        
-        # 過濾出實際存在的月份
-        available_months = get_available_months()
-        available_set = set(available_months)
-        valid_months = [month for month in month_list if month in available_set]
-        
-        if not valid_months:
-            abort(404, description="指定範圍內沒有找到任何法案資料。")
-        
-        all_bills = load_multiple_months_data(valid_months)
+    valid_months = resolve_requested_months(start_month, end_month)
+    month_entries = load_month_entries(valid_months)
+    if wants_plain_bill_list():
+        return bill_stream_response(month_entries)
     
-    return jsonify(all_bills)
+    return bill_list_response([(month_data, None) for month_data in month_entries])
+
+@app.route('/api/bill/<bill_no>', methods=['GET'])
+def get_bill_detail(bill_no):
+    """【新 API】: 依 bill_no 取得單一法案的完整資料 (供 modal 按需載入)，支援 fields 投影"""
+    bill = find_bill(bill_no)
+    if bill is None:
+        abort(404, description=f"找不到議案編號 {bill_no} 的法案資料。")
+    return jsonify(project_bill(bill, parse_fields_param(request.args.get('fields'))))
+
+@app.route('/api/bill/<bill_no>/related', methods=['GET'])
+def get_related_bills(bill_no):
+    """
+    【新 API】: 與指定法案內容最相似的前 k 筆法案 (`k`，預設 10)，依 TF-IDF 餘弦相似度排序。
+    預設比對所有可用月份，可用 start / end 限定範圍；法案內容預設為 card 欄位 (可用 fields= 指定)。
+    """
+    if related_vectorizer is None or sparse is None:
+        abort(503, description="伺服器未安裝 scikit-learn / scipy，無法計算相關法案。")
+    try:
+        top_k = min(max(int(request.args.get('k', 10)), 1), RELATED_MAX_K)
+    except ValueError:
+        abort(400, description="無效的 k 參數。")
+    start_month, end_month = request.args.get('start'), request.args.get('end')
+    if start_month or end_month:
+        valid_months = resolve_requested_months(start_month, end_month)
+    else:
+        valid_months = get_available_months()
+    fields = parse_fields_param(request.args.get('fields') or 'card')
+
+    related = get_related_matrix(load_month_entries(valid_months))
+    row = related['row_of'].get(bill_no)
+    if row is None:
+        abort(404, description=f"找不到議案編號 {bill_no} 的法案資料。")
+
+    matrix = related['matrix']
+    scores = (matrix @ matrix[row].T).toarray().ravel()
+    scores[row] = 0
+    top_k = min(top_k, len(scores) - 1)
+    candidates = np.argpartition(-scores, top_k)[:top_k] if top_k > 0 else []
+    results = []
+    for candidate in sorted(candidates, key=lambda candidate: -scores[candidate]):
+        if scores[candidate] <= 0:
+            continue
+        month_data, position = related['rows'][candidate]
+        results.append({
+            'score': round(float(scores[candidate]), 4),
+            'year': month_data.year,
+            'month': month_data.month,
+            'bill': project_bill(month_data.bills[position], fields),
+        })
+    return jsonify({'bill_no': bill_no, 'related': results})
+
+@app.route('/api/search', methods=['GET'])
+def search_bills():
+    """
+    【新 API】: 以伺服器端倒排索引進行全文檢索，支援月份範圍、分類篩選、排序與分頁。
+    `scope=` (逗號分隔的欄位，例如 `scope=bill_name,reason`) 可限制只比對部分欄位。
+    """
+    query = normalize_search_text(request.args.get('q'))
+    if not query:
+        abort(400, description="請輸入搜尋關鍵字。")
+    category_filter = request.args.get('category')
+    scope = None
+    if request.args.get('scope'):
+        scope = {field.strip() for field in request.args['scope'].split(',') if field.strip()}
+        unknown_fields = scope - SEARCH_FIELD_WEIGHTS.keys()
+        if unknown_fields:
+            abort(400, description=f"scope 只能是 {'、'.join(SEARCH_FIELD_WEIGHTS)}。")
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        page_size = min(max(int(request.args.get('page_size', 20)), 1), SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        abort(400, description="無效的分頁參數。")
+
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    matches = []
+    for year, month in valid_months:
+        month_data = get_month_data(year, month)
+        if month_data is None:
+            continue
+        for position, score, matched_fields in search_month(month_data, query, scope):
+            bill = month_data.bills[position]
+            if category_filter and category_filter not in bill.get('categories', []):
+                continue
+            matches.append((score, bill, year, month, matched_fields))
+
+    # 分數高者優先，同分時較新的法案 (bill_no 較大) 在前
+    matches.sort(key=lambda match: (match[0], match[1].get('bill_no', '')), reverse=True)
+
+    start_index = (page - 1) * page_size
+    results = [
+        {
+            'bill_no': bill.get('bill_no'),
+            'bill_name': bill.get('bill_name'),
+            'source_file': bill.get('source_file'),
+            'proposers': bill.get('proposers', []),
+            'progress': bill.get('progress'),
+            'categories': bill.get('categories', []),
+            'year': year,
+            'month': month,
+            'score': score,
+            'matched_fields': matched_fields,
+        }
+        for score, bill, year, month, matched_fields in matches[start_index:start_index + page_size]
+    ]
+    return jsonify({
+        'query': request.args.get('q'),
+        'total': len(matches),
+        'page': page,
+        'page_size': page_size,
+        'results': results,
+    })
+
+@app.route('/api/compare', methods=['GET'])
+def get_compare_versions():
+    """
+    【新 API】: 同名法案版本比較。以 `bill_no` (基準法案) 或 `title` (正規化標題) 指定，
+    回傳月份範圍內各提案來源 (行政院、司法院、各政黨) 的最新版本。
+    """
+    bill_no = request.args.get('bill_no')
+    title = request.args.get('title')
+    if bill_no:
+        base_bill = find_bill(bill_no)
+        if base_bill is None:
+            abort(404, description=f"找不到議案編號 {bill_no} 的法案資料。")
+        title = normalize_bill_title(base_bill)
+    if not title:
+        abort(400, description="請指定 bill_no 或 title。")
+
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    # 合併各月份索引中該標題的候選版本，每個來源保留最新的一筆
+    latest_versions = {}
+    for month_data in load_month_entries(valid_months):
+        versions = get_compare_index(month_data, legislators).get(title, {})
+        for group, position in versions.items():
+            bill = month_data.bills[position]
+            current = latest_versions.get(group)
+            if current is None or bill_version_key(bill) > bill_version_key(current):
+                latest_versions[group] = bill
+
+    fields = parse_fields_param(request.args.get('fields'))
+    return jsonify({
+        'title': title,
+        'order': [group for group in COMPARE_DISPLAY_ORDER if group in latest_versions],
+        'versions': {group: project_bill(bill, fields) for group, bill in latest_versions.items()},
+    })
+
+@app.route('/api/diff', methods=['GET'])
+def get_bill_diff():
+    """
+    【新 API】: 伺服器端條文差異比較。`bills` 為 2~5 個以逗號分隔的 bill_no，
+    可用 `article` 指定單一條號；依條號對齊各版本並回傳逐字差異 (結果會被快取)。
+    """
+    bill_nos = [bill_no.strip() for bill_no in (request.args.get('bills') or '').split(',') if bill_no.strip()]
+    if not 2 <= len(bill_nos) <= DIFF_MAX_VERSIONS:
+        abort(400, description=f"請指定 2 到 {DIFF_MAX_VERSIONS} 個法案編號。")
+
+    bills = []
+    for bill_no in bill_nos:
+        bill = find_bill(bill_no)
+        if bill is None:
+            abort(404, description=f"找不到議案編號 {bill_no} 的法案資料。")
+        bills.append(bill)
+
+    article_maps = [get_article_map(bill) for bill in bills]
+    titles = set()
+    for article_map in article_maps:
+        titles.update(article_map)
+    requested_article = request.args.get('article')
+    if requested_article:
+        titles &= {requested_article}
+
+    articles = [
+        get_article_diff(bill_nos, title, [article_map.get(title) for article_map in article_maps])
+        for title in sorted(titles, key=article_sort_key)
+    ]
+    return jsonify({'bills': bill_nos, 'articles': articles})
+
+@app.route('/api/articles/<law>', methods=['GET'])
+def get_law_articles(law):
+    """
+    【新 API】: 指定法律在月份範圍內被提案修正的條文列表 (依條號排序，`之N` 排在本條之後)，
+    含各條文的提案數與對照表列數。
+    """
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+    articles = {}
+    for month_data in load_month_entries(valid_months):
+        for number, entry in month_data.derive('article_index', build_article_index).get(law, {}).items():
+            merged = articles.setdefault(number, {'title': entry['title'], 'bill_nos': set(), 'rows': 0})
+            merged['bill_nos'].update(month_data.bills[position].get('bill_no') for position, _ in entry['refs'])
+            merged['rows'] += len(entry['refs'])
+    if not articles:
+        abort(404, description=f"找不到 {law} 的條文修正資料。")
+    return jsonify({
+        'law': law,
+        'articles': [
+            {'article': merged['title'], 'number': list(number), 'bill_count': len(merged['bill_nos']), 'row_count': merged['rows']}
+            for number, merged in sorted(articles.items())
+        ],
+    })
+
+@app.route('/api/articles/<law>/<article>', methods=['GET'])
+def get_law_article(law, article):
+    """
+    【新 API】: 修正指定法律某一條文的所有法案 (由新到舊)，附上對照表中該條文的列。
+    條號可寫成 `第二十二條之十六` 或 `22-16`；法案預設只回傳 card 欄位，可用 fields= 指定。
+    """
+    number = parse_article_number(article)
+    if number is None:
+        abort(400, description="無效的條號格式。")
+    fields = parse_fields_param(request.args.get('fields') or 'card')
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    title = None
+    matches = []
+    for month_data in load_month_entries(valid_months):
+        entry = month_data.derive('article_index', build_article_index).get(law, {}).get(number)
+        if entry is None:
+            continue
+        title = title or entry['title']
+        rows_by_position = {}
+        for position, row in entry['refs']:
+            rows_by_position.setdefault(position, []).append(row)
+        for position, rows in rows_by_position.items():
+            bill = month_data.bills[position]
+            table = bill.get('comparison_table') or []
+            matches.append((bill, {
+                'year': month_data.year,
+                'month': month_data.month,
+                'bill': project_bill(bill, fields),
+                'rows': [dict(table[row], row=row) for row in rows],
+            }))
+    if not matches:
+        abort(404, description=f"找不到修正 {law} {article} 的法案。")
+    matches.sort(key=lambda match: bill_version_key(match[0]), reverse=True)
+    return jsonify({
+        'law': law,
+        'article': title,
+        'number': list(number),
+        'total': len(matches),
+        'bills': [result for _, result in matches],
+    })
+
+@app.route('/api/progress/summary', methods=['GET'])
+def get_progress_summary():
+    """【新 API】: 各進度階段的法案數量 (可用 category 篩選)，由每月預先統計的結果合併"""
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+    category_filter = request.args.get('category')
+    aggregates = merge_month_aggregates(valid_months)
+
+    if category_filter:
+        stage_counts = aggregates['category_stage_counts'].get(category_filter, Counter())
+    else:
+        stage_counts = Counter()
+        for month_data in load_month_entries(valid_months):
+            index = month_data.derive('progress_index', build_progress_index)
+            stage_counts.update({stage: len(positions) for stage, positions in index['stage_positions'].items()})
+
+    return jsonify({
+        'total_bills': sum(stage_counts.values()),
+        'counts': {stage: stage_counts.get(stage, 0) for stage in PROGRESS_STAGES},
+        'categories': sorted(aggregates['category_counts']),
+    })
+
+@app.route('/api/progress/bills', methods=['GET'])
+def get_progress_bills():
+    """
+    【新 API】: 指定進度階段 (`stage`) 的法案列表，可再依 category 與進度日期
+    (`since` / `until`，ISO 格式) 篩選，並支援 fields 投影與 limit/cursor 分頁。
+    """
+    stage = request.args.get('stage')
+    if stage not in PROGRESS_STAGES:
+        abort(400, description=f"stage 必須是 {'、'.join(PROGRESS_STAGES)} 其中之一。")
+    category_filter = request.args.get('category')
+    since = request.args.get('since')
+    until = request.args.get('until')
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    stage_selections = []
+    for month_data in load_month_entries(valid_months):
+        index = month_data.derive('progress_index', build_progress_index)
+        positions = []
+        for position in index['stage_positions'][stage]:
+            bill = month_data.bills[position]
+            if category_filter and category_filter not in bill.get('categories', []):
+                continue
+            progress_date = index['parsed'][position]['date']
+            if (since or until) and progress_date is None:
+                continue
+            if (since and progress_date < since) or (until and progress_date > until):
+                continue
+            positions.append(position)
+        stage_selections.append((month_data, positions))
+    return bill_list_response(stage_selections)
+
+def parse_multi_value_param(name):
+    """讀取可重複或以逗號分隔的查詢參數，例如 `category=政,商` 或 `category=政&category=商`"""
+    values = []
+    for raw in request.args.getlist(name):
+        for value in raw.split(','):
+            value = value.strip()
+            if value and value not in values:
+                values.append(value)
+    return values
+
+@app.route('/api/query', methods=['GET'])
+def query_bills():
+    """
+    【新 API】: 多面向查詢。可任意組合 category、party (政黨組合)、stage (進度階段)、
+    legislator (立委姓名) 與 start/end 月份範圍；同一參數可指定多個值 (逗號分隔，視為 OR)，
+    不同參數之間為 AND。以每月預先建立的位元集合計算，一次回傳符合的 bill_no、
+    實際查詢的月份 (months) 以及各面向 (含月份) 的數量，供儀表板逐層篩選。
+    未指定範圍時使用最新3個月；start 與 end 只給其中一個時回傳 400。
+    """
+    if np is None:
+        abort(503, description="伺服器未安裝 numpy，無法執行多面向查詢。")
+    legislators = get_legislators()
+    selected = {facet: parse_multi_value_param(facet) for facet in QUERY_FACETS}
+    invalid_stages = [stage for stage in selected['stage'] if stage not in PROGRESS_STAGES]
+    if invalid_stages:
+        abort(400, description=f"stage 必須是 {'、'.join(PROGRESS_STAGES)} 其中之一。")
+    invalid_parties = [party for party in selected['party'] if party not in PARTY_COMBINATIONS]
+    if invalid_parties:
+        abort(400, description=f"party 必須是 {'、'.join(PARTY_COMBINATIONS)} 其中之一。")
+    if selected['party'] and legislators is None:
+        abort(404, description="找不到立委資料。")
+    selected['legislator'] = [normalize_legislator_name(name) for name in selected['legislator']]
+    selected = {facet: values for facet, values in selected.items() if values}
+    start_month, end_month = request.args.get('start'), request.args.get('end')
+    if bool(start_month) != bool(end_month):
+        abort(400, description="start 與 end 必須同時指定。")
+    valid_months = resolve_requested_months(start_month, end_month)
+
+    bill_nos = []
+    facet_counts = {facet: Counter() for facet in QUERY_FACETS}
+    month_counts = {}
+    for month_data in load_month_entries(valid_months):
+        bitsets = get_facet_bitsets(month_data, legislators)
+        positions, counts = query_month_facets(bitsets, selected)
+        bill_nos.extend(bitsets['bill_nos'][position] for position in positions)
+        for facet, value_counts in counts.items():
+            facet_counts[facet].update(value_counts)
+        month_counts[f"{month_data.year}-{month_data.month:02d}"] = len(positions)
+
+    # 立委面向依數量排序 (物件的 key 順序在 JSON 中不保證)，只回傳前 QUERY_LEGISLATOR_FACET_LIMIT 名
+    legislator_counts = sorted(
+        ((name, count) for name, count in facet_counts['legislator'].items() if count > 0),
+        key=lambda item: (-item[1], item[0]),
+    )
+    official_names = legislators.normalized_to_official_name if legislators is not None else {}
+    name_to_party = legislators.normalized_name_to_party if legislators is not None else {}
+    return jsonify({
+        'total': len(bill_nos),
+        'bill_nos': bill_nos,
+        'filters': selected,
+        'months': [f"{year}-{month:02d}" for year, month in valid_months],
+        'facets': {
+            'category': {
+                category: count for category, count in facet_counts['category'].items()
+                if count > 0 or category in CATEGORY_DEFINITIONS
+            },
+            'party': {label: facet_counts['party'][label] for label in PARTY_COMBINATIONS} if legislators is not None else {},
+            'stage': {stage: facet_counts['stage'][stage] for stage in PROGRESS_STAGES},
+            'legislator': [
+                {'name': official_names.get(name, name), 'party': name_to_party.get(name), 'count': count}
+                for name, count in legislator_counts[:QUERY_LEGISLATOR_FACET_LIMIT]
+            ],
+            'month': month_counts,
+        },
+    })
+
+@app.route('/api/legislators/<name>/activity', methods=['GET'])
+def get_legislator_activity(name):
+    """
+    【新 API】: 單一立委在月份範圍內提案與連署的法案 (姓名會先正規化，`黃　捷` 與 `黃捷` 相同)，
+    含各分類與各月份的數量。`detail=1` 時附上法案內容 (預設 card 欄位，可用 fields= 指定)。
+    """
+    normalized = normalize_legislator_name(name)
+    if not normalized:
+        abort(400, description="請指定立委姓名。")
+    legislators = get_legislators()
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+    include_detail = request.args.get('detail') in ('1', 'true')
+    fields = parse_fields_param(request.args.get('fields') or 'card')
+
+    result = {
+        'name': legislators.normalized_to_official_name.get(normalized, normalized) if legislators else normalized,
+        'party': legislators.normalized_name_to_party.get(normalized) if legislators else None,
+        'proposed': [],
+        'cosigned': [],
+        'category_counts': Counter(),
+        'months': [],
+    }
+    for month_data in load_month_entries(valid_months):
+        activity = month_data.derive('legislator_index', build_legislator_index).get(normalized)
+        if activity is None:
+            continue
+        for role in ('proposed', 'cosigned'):
+            for position in activity[role]:
+                bill = month_data.bills[position]
+                result[role].append(project_bill(bill, fields) if include_detail else bill.get('bill_no'))
+        result['category_counts'].update(activity['category_counts'])
+        result['months'].append({
+            'year': month_data.year,
+            'month': month_data.month,
+            'proposed': len(activity['proposed']),
+            'cosigned': len(activity['cosigned']),
+        })
+
+    if not result['proposed'] and not result['cosigned'] and not (legislators and normalized in legislators.normalized_name_to_party):
+        abort(404, description=f"找不到立委 {name} 的資料。")
+    result['category_counts'] = dict(result['category_counts'])
+    result['total'] = {
+        'proposed': len(result['proposed']),
+        'cosigned': len(result['cosigned']),
+    }
+    return jsonify(result)
+
+@app.route('/api/legislators/leaderboard', methods=['GET'])
+def get_legislator_leaderboard():
+    """
+    【新 API】: 立委提案/連署排行榜。`by` 為 total (預設)、proposed 或 cosigned，
+    可用 category、party 篩選，`limit` 指定名次數量 (預設 20)。只列出 legislators.json 中的立委。
+    """
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    sort_by = request.args.get('by', 'total')
+    if sort_by not in ('total', 'proposed', 'cosigned'):
+        abort(400, description="by 必須是 total、proposed 或 cosigned。")
+    category_filter = request.args.get('category')
+    party_filter = request.args.get('party')
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), BILL_LIST_MAX_LIMIT)
+    except ValueError:
+        abort(400, description="無效的 limit 參數。")
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    totals = {}
+    for month_data in load_month_entries(valid_months):
+        for normalized, activity in month_data.derive('legislator_index', build_legislator_index).items():
+            party = legislators.normalized_name_to_party.get(normalized)
+            if party is None or (party_filter and party != party_filter):
+                continue
+            counts = totals.setdefault(normalized, {'proposed': 0, 'cosigned': 0})
+            if category_filter:
+                # 依分類篩選時需要逐筆確認，只針對該立委參與的法案
+                for role in ('proposed', 'cosigned'):
+                    counts[role] += sum(
+                        1 for position in activity[role]
+                        if category_filter in month_data.bills[position].get('categories', [])
+                    )
+            else:
+                counts['proposed'] += len(activity['proposed'])
+                counts['cosigned'] += len(activity['cosigned'])
+
+    ranking = []
+    for normalized, counts in totals.items():
+        counts['total'] = counts['proposed'] + counts['cosigned']
+        if counts['total'] == 0:
+            continue
+        ranking.append({
+            'name': legislators.normalized_to_official_name[normalized],
+            'party': legislators.normalized_name_to_party[normalized],
+            **counts,
+        })
+    ranking.sort(key=lambda item: (-item[sort_by], -item['total'], item['name']))
+    return jsonify(ranking[:limit])
+
+def require_network_support():
+    """共同提案網絡需要 numpy / scipy 與立委資料，缺少時直接 abort"""
+    if sparse is None:
+        abort(503, description="伺服器未安裝 numpy / scipy，無法計算共同提案網絡。")
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    return legislators
+
+@app.route('/api/network/legislators/<name>', methods=['GET'])
+def get_legislator_network(name):
+    """
+    【新 API】: 單一立委的共同提案網絡：前 k 名 (`k`，預設 10) 合作對象與跨黨合作分數。
+    由各月份快取的稀疏共同提案矩陣加總後計算。
+    """
+    legislators = require_network_support()
+    row = legislators.legislator_position.get(normalize_legislator_name(name))
+    if row is None:
+        abort(404, description=f"找不到立委 {name} 的資料。")
+    try:
+        top_k = min(max(int(request.args.get('k', 10)), 1), len(legislators.legislator_order))
+    except ValueError:
+        abort(400, description="無效的 k 參數。")
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    cosponsor_matrix = get_cosponsor_matrix(load_month_entries(valid_months), legislators)
+    membership, _ = get_party_membership(legislators)
+    scores, totals = compute_cross_party_scores(cosponsor_matrix, membership)
+
+    counts = np.asarray(cosponsor_matrix.getrow(row).todense()).ravel()
+    counts[row] = 0
+    partner_rows = np.argsort(-counts, kind='stable')[:top_k]
+    partners = [
+        {
+            'name': legislators.normalized_to_official_name[legislators.legislator_order[partner]],
+            'party': legislators.normalized_name_to_party[legislators.legislator_order[partner]],
+            'count': int(counts[partner]),
+        }
+        for partner in partner_rows if counts[partner] > 0
+    ]
+    normalized = legislators.legislator_order[row]
+    return jsonify({
+        'name': legislators.normalized_to_official_name[normalized],
+        'party': legislators.normalized_name_to_party[normalized],
+        'bills': int(cosponsor_matrix[row, row]),
+        'total_cosponsorships': int(totals[row]),
+        'cross_party_score': float(scores[row]),
+        'partners': partners,
+    })
+
+@app.route('/api/network/parties', methods=['GET'])
+def get_party_network():
+    """
+    【新 API】: 政黨層級的共同提案統計：政黨 × 政黨 共同提案次數矩陣 (Pᵀ·C·P)、
+    各政黨立委的平均跨黨合作分數，以及跨黨合作分數最高的立委 (`k`，預設 10)。
+    """
+    legislators = require_network_support()
+    try:
+        top_k = min(max(int(request.args.get('k', 10)), 1), len(legislators.legislator_order))
+    except ValueError:
+        abort(400, description="無效的 k 參數。")
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+
+    cosponsor_matrix = get_cosponsor_matrix(load_month_entries(valid_months), legislators)
+    membership, parties = get_party_membership(legislators)
+    off_diagonal = without_diagonal(cosponsor_matrix)
+    party_matrix = np.asarray((membership.T @ off_diagonal @ membership).todense())
+    scores, totals = compute_cross_party_scores(cosponsor_matrix, membership)
+
+    party_columns = np.asarray(membership.argmax(axis=1)).ravel()
+    active = totals > 0
+    average_scores = {}
+    for column, party in enumerate(parties):
+        members = active & (party_columns == column)
+        average_scores[party] = float(scores[members].mean()) if members.any() else 0.0
+
+    ranked_rows = [row for row in np.argsort(-scores, kind='stable') if active[row]][:top_k]
+    return jsonify({
+        'parties': parties,
+        'cosponsorship_matrix': party_matrix.astype(int).tolist(),
+        'average_cross_party_scores': average_scores,
+        'top_cross_party_legislators': [
+            {
+                'name': legislators.normalized_to_official_name[legislators.legislator_order[row]],
+                'party': legislators.normalized_name_to_party[legislators.legislator_order[row]],
+                'cross_party_score': float(scores[row]),
+                'total_cosponsorships': int(totals[row]),
+            }
+            for row in ranked_rows
+        ],
+    })
 
 @app.route('/api/legislators.json', methods=['GET'])
-def get_legislators():
+def get_legislators_api():
     """【原有 API】: 提供前端立委的完整 JSON 資料"""
-    # 這裡我們直接指定 legislators.json 的完整檔案路徑
-    file_name = "legislators.json"
-    file_path = os.path.join(DATA_FOLDER, file_name)
-    
-    if not os.path.exists(file_path):
-        # 如果檔案不存在，回傳 404 錯誤
+    legislators = get_legislators()
+    if legislators is None:
+        # 如果檔案不存在或無法解析，回傳 404 錯誤
         abort(404, description="找不到 legislators.json 檔案。")
-    
-    try:
-        # 讀取檔案內容並直接回傳
-        with open(file_path, 'r', encoding='utf-8') as f:
-            legislator_data = json.load(f)
-        return jsonify(legislator_data)
-    except Exception as e:
-        # 如果讀取或解析時發生錯誤，回傳 500 伺服器內部錯誤
-        print(f"讀取或解析 legislators.json 時發生錯誤: {e}")
-        abort(500, description="處理立委資料時發生內部錯誤。")
+    return jsonify(legislators.data)
+
+def venn_data_response(month_entries, legislators):
+    """
+    合併各月份的維恩圖索引。每個區域回傳 bill_ids；`detail=1` 時另附法案內容
+    (預設為 card 欄位，可用 fields= 指定)。
+    """
+    include_detail = request.args.get('detail') in ('1', 'true')
+    fields = parse_fields_param(request.args.get('fields') or 'card')
+
+    def build_area(positions_by_month):
+        area = {'bill_ids': [], 'size': 0}
+        if include_detail:
+            area['bills'] = []
+        for month_data, positions in positions_by_month:
+            for position in positions:
+                bill = month_data.bills[position]
+                area['bill_ids'].append(bill.get('bill_no'))
+                if include_detail:
+                    area['bills'].append(project_bill(bill, fields))
+        area['size'] = len(area['bill_ids'])
+        return area
+
+    indexes = [(month_data, get_venn_index(month_data, legislators)) for month_data in month_entries]
+    venn_sets = []
+    for region in VENN_REGIONS:
+        area = build_area((month_data, index['regions'][region]) for month_data, index in indexes)
+        area['sets'] = list(region)
+        venn_sets.append(area)
+    non_partisan_data = build_area((month_data, index['non_partisan']) for month_data, index in indexes)
+
+    return jsonify({
+        'total_bills': sum(len(month_data.bills) for month_data in month_entries),
+        'venn_sets': venn_sets,
+        'non_partisan_data': non_partisan_data,
+    })
 
 @app.route('/api/venn-data/<int:year>/<int:month>')
 def get_venn_data(year, month):
     """
-    【原有 API】: 動態組合維恩圖資料與完整的法案詳細資訊。
+    【原有 API】: 單一月份的維恩圖資料，由法案的提案/連署人與立委資料即時計算 (每月快取)。
     """
-    # --- 步驟 1: 讀取兩個必要的 JSON 檔案 ---
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    month_data = get_month_data(year, month)
+    if month_data is None:
+        abort(404, description=f"找不到 {year} 年 {month} 月的法案資料。")
+    return venn_data_response([month_data], legislators)
 
-    # 讀取維恩圖結構檔 (只含法案編號和標題)
-    venn_file_name = f"venn_data_{year}_{month:02d}.json"
-    venn_file_path = os.path.join(DATA_FOLDER, venn_file_name)
-    
-    # 讀取法案詳細資料檔
-    enriched_file_name = f"ai_enriched_data_{year}_{month:02d}.json"
-    enriched_file_path = os.path.join(DATA_FOLDER, enriched_file_name)
+@app.route('/api/venn-data', methods=['GET'])
+def get_venn_data_range():
+    """【新 API】: 任意月份範圍 (start/end) 的維恩圖資料，由各月份的快取結果合併"""
+    legislators = get_legislators()
+    if legislators is None:
+        abort(404, description="找不到立委資料。")
+    valid_months = resolve_requested_months(request.args.get('start'), request.args.get('end'))
+    return venn_data_response(load_month_entries(valid_months), legislators)
 
-    # 檢查檔案是否存在，若缺少任一檔案則回傳錯誤
-    if not os.path.exists(venn_file_path) or not os.path.exists(enriched_file_path):
-        abort(404, description=f"找不到 {year} 年 {month} 月的維恩圖或法案詳細資料檔案。")
+# 單次批次查詢最多可包含的子查詢數
+BATCH_MAX_REQUESTS = 20
 
-    try:
-        # --- 步驟 2: 載入資料並建立法案速查字典 ---
+def encode_json_fragment(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
-        # 載入維恩圖結構資料
-        with open(venn_file_path, 'r', encoding='utf-8') as f:
-            venn_data = json.load(f)
-        
-        # 載入所有法案的詳細資料
-        with open(enriched_file_path, 'r', encoding='utf-8') as f:
-            all_bills_details = json.load(f)
-
-        # 建立一個以 bill_no 為 key，完整 bill 物件為 value 的字典，方便快速查找
-        bill_detail_map = {bill['bill_no']: bill for bill in all_bills_details}
-
-        # --- 步驟 3: 遍歷維恩圖資料，用完整法案物件替換簡略資訊 ---
-
-        # 處理 venn_sets 中的每一個區域
-        for area in venn_data.get('venn_sets', []):
-            # 使用列表推導式快速替換
-            # area['bills'] 原本是 [["編號1", "標題1"], ["編號2", "標題2"]]
-            # 我們遍歷這個列表，用 bill[0] (也就是法案編號) 去速查字典
-            # 如果在字典裡找得到，就將完整的法案物件放入新列表
-            enriched_bills = [
-                bill_detail_map.get(bill[0]) 
-                for bill in area.get('bills', []) 
-                if bill[0] in bill_detail_map
-            ]
-            # 將area中的bills更新為包含完整資訊的新列表
-            area['bills'] = enriched_bills
-
-        # 處理 non_partisan_data (無黨籍部分)
-        non_partisan_data = venn_data.get('non_partisan_data')
-        if non_partisan_data and 'bills' in non_partisan_data:
-            enriched_bills_non_partisan = [
-                bill_detail_map.get(bill[0]) 
-                for bill in non_partisan_data.get('bills', [])
-                if bill[0] in bill_detail_map
-            ]
-            non_partisan_data['bills'] = enriched_bills_non_partisan
-
-        # --- 步驟 4: 回傳組合好的全新資料 ---
-        return jsonify(venn_data)
+def run_batch_subrequest(path):
+    """
+    在目前請求的應用程式環境中執行一個 `/api/*` 子查詢 (共用 g 中固定的資料快照)，
+    回傳 (狀態碼, 已編碼的 JSON body)；錯誤時 body 為 {"error": 說明}。
+    串流回應 (例如完整法案列表) 的 body 為尚未輸出的片段迭代器，由批次回應接著串流輸出。
+    """
+    url = urlsplit(path)
+    if not url.path.startswith('/api/') or url.path == '/api/batch':
+        return 400, encode_json_fragment({'error': '只能批次查詢 /api/* 端點。'})
+    with app.test_request_context(url.path, query_string=url.query):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            response = app.make_response(app.view_functions[request.url_rule.endpoint](**request.view_args))
+            if response.is_streamed:
+                return response.status_code, iter(response.response)
+            body = response.get_data()
+        except HTTPException as e:
+            return e.code, encode_json_fragment({'error': e.description})
+        except Exception as e:
+            print(f"批次查詢 {path} 時發生錯誤: {e}")
+            return 500, encode_json_fragment({'error': '處理查詢時發生內部錯誤。'})
+    if response.mimetype != 'application/json':
+        body = encode_json_fragment(body.decode('utf-8'))
+    return response.status_code, body
 
-    except Exception as e:
-        print(f"處理維恩圖資料時發生錯誤: {e}")
-        abort(500, description="處理維恩圖資料時發生內部錯誤。")
+@app.route('/api/batch', methods=['GET', 'POST'])
+def batch_api():
+    """
+    【新 API】: 批次查詢，一次取得多個 `/api/*` 端點的結果 (所有子查詢共用同一份資料快照)。
+    GET `/api/batch?r=/api/categories&r=/api/available-months` (可使用 ETag 快取)，
+    或 POST `{"requests": ["/api/categories", ...]}`。
+    回傳 {"responses": [{"path", "status", "body"}, ...]}，順序與請求相同。
+    """
+    if request.method == 'POST':
+        payload = request.get_json(silent=True)
+        paths = payload.get('requests') if isinstance(payload, dict) else None
+    else:
+        paths = request.args.getlist('r')
+    if not isinstance(paths, list) or not paths or not all(isinstance(path, str) for path in paths):
+        abort(400, description="請以 r 參數或 requests 陣列指定要查詢的 /api/* 路徑。")
+    if len(paths) > BATCH_MAX_REQUESTS:
+        abort(400, description=f"一次最多只能查詢 {BATCH_MAX_REQUESTS} 個路徑。")
+
+    # 固定本次批次使用的資料快照，所有子查詢看到同一份資料；
+    # 未使用資料快照 (背景監看停用) 時，改為固定各子查詢載入的月份與立委資料 (見 batch_pinned)
+    if current_snapshot() is None:
+        g.batch_pinned = {}
+    results = [(path, *run_batch_subrequest(path)) for path in paths]
+    if all(isinstance(body, bytes) for _, _, body in results):
+        return Response(b''.join(iter_batch_envelope(results)), mimetype='application/json')
+    # 含串流回應的子查詢 (例如完整法案列表) 時，整個批次回應也以串流輸出
+    return Response(stream_with_context(iter_batch_envelope(results)), mimetype='application/json')
+
+def iter_batch_envelope(results):
+    """輸出 {"responses": [{"path", "status", "body"}, ...]}，串流的 body 逐段輸出"""
+    yield b'{"responses":['
+    for index, (path, status, body) in enumerate(results):
+        yield (b',' if index else b'') + b'{"path":' + encode_json_fragment(path) + b',"status":' + str(status).encode('ascii') + b',"body":'
+        if isinstance(body, bytes):
+            yield body
+        else:
+            yield from body
+        yield b'}'
+    yield b']}'
+
+@app.route('/metrics')
+def get_metrics():
+    """【新 API】: Prometheus 文字格式的指標 (各路由請求數、處理時間直方圖、階段時間、快取命中率、輸出位元組數)"""
+    if not REQUEST_METRICS_ENABLED:
+        abort(404)
+    caches = {
+        'bill_store': bill_store,
+        'compressed_response': compressed_response_cache,
+        'article_diff': article_diff_cache,
+        'related_matrix': related_matrix_cache,
+    }
+    with derive_cache_stats_lock:
+        caches.update({f'derive:{key}': stats for key, stats in sorted(derive_cache_stats.items())})
+    return Response(request_metrics.render(caches), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 # 【新增的路由】
 @app.route('/compare')
@@ -580,8 +3308,15 @@ def compare_page():
     return render_template('compare.html')
 
 
-# --- 5. 啟動伺服器 ---
+# --- 8. 啟動伺服器 ---
 
 if __name__ == '__main__':
-    app.run(port=5000, host='0.0.0.0')
+    if sys.argv[1:2] == ['--build-snapshot']:
+        # 建立共用資料快照：python app.py --build-snapshot [輸出路徑]
+        snapshot_path = sys.argv[2] if len(sys.argv) > 2 else (SHARED_SNAPSHOT_PATH or os.path.join(DATA_FOLDER, 'shared.billsnap'))
+        month_count = build_shared_snapshot(snapshot_path)
+        print(f"已建立共用資料快照 {snapshot_path} ({month_count} 個月份，{os.path.getsize(snapshot_path):,} bytes)")
+    else:
+        start_background_services()
+        app.run(port=5000, host='0.0.0.0')
 
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+"""
+API 效能基準測試 (benchmark)
+
+產生擬真的合成資料 (`ai_enriched_data_YYYY_MM.json` 與 `legislators.json`)，
+再透過 Flask test client 逐一呼叫所有 `/api/*` 路由，記錄每個路由的
+p50 / p95 延遲、回應大小與行程的峰值記憶體 (RSS)，結果輸出為 JSON，
+方便比較不同版本之間的差異。
+
+資料規模以「月份數 x 每月法案數 x 條文對照表列數」表示，例如 `12x300x8`。
+每個規模在獨立的子行程中執行 (以環境變數 BILL_DATA_FOLDER 指向合成資料)，
+峰值記憶體因此不會互相影響。
+
+用法：
+
+    python benchmark.py
+    python benchmark.py --scale 3x250x6 --scale 36x250x6 --repeat 20 --output bench.json
+    python benchmark.py --billpack                  # 同時產生 billpack 檔案
+    python benchmark.py --compare old.json new.json # 比較兩次結果
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows 沒有 resource 模組，峰值記憶體改記為 None
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCALES = ['3x250x6', '12x250x6', '36x250x6']
+DEFAULT_REPEAT = 10
+
+
+# --- 1. 合成資料產生器 ---
+
+SURNAMES = '陳林黃張李王吳劉蔡楊許鄭謝郭洪邱曾廖賴徐周葉蘇莊呂江何蕭羅高潘簡朱鍾游彭詹胡施沈余盧梁趙顏柯翁魏孫戴范方宋'
+GIVEN_NAME_CHARS = '志明俊傑淑芬美惠雅婷宗翰家豪怡君建宏文雄秀英國華冠宇佳玲正德昱晴培瑜易餘瑞隆月琴巧慧素梅超立'
+# 依第 11 屆立法院席次比例分配政黨
+PARTY_SEATS = [('中國國民黨', 52), ('民主進步黨', 51), ('台灣民眾黨', 8), ('無黨籍', 2)]
+
+LAW_NAMES = [
+    '所得稅法', '勞動基準法', '民法', '刑法', '道路交通管理處罰條例', '公司法', '證券交易法',
+    '全民健康保險法', '教育基本法', '國民體育法', '食品安全衛生管理法', '住宅法', '都市計畫法',
+    '國防法', '外國人投資條例', '科學技術基本法', '兒童及少年福利與權益保障法', '公職人員選舉罷免法',
+    '地方制度法', '銀行法', '保險法', '藥事法', '醫療法', '就業服務法', '消費者保護法',
+    '環境基本法', '文化資產保存法', '農業發展條例', '電信管理法', '政府採購法',
+]
+PROGRESS_STATUSES = [
+    ('三讀', 90), ('委員會審議中', 54), ('一讀(委員會待審)', 48), ('二讀(廣泛討論)', 29),
+    ('逕付二讀', 8), ('二讀(已議決)', 5), ('委員會審竣', 4), ('撤回', 3),
+]
+PHRASES = [
+    '為保障人民權益', '配合社會發展需要', '參酌國際立法例', '主管機關應定期檢討', '明定相關罰則',
+    '以符比例原則', '爰擬具本條文修正草案', '強化監督機制', '提高行政效率', '增訂過渡條款',
+    '前項辦法由中央主管機關定之', '違反者處新臺幣十萬元以上一百萬元以下罰鍰', '並應公告周知',
+    '於本法施行後一年內完成', '得不受前項規定之限制', '依其他法律規定辦理', '應經立法院同意',
+]
+DIGITS = '零一二三四五六七八九'
+
+
+def int_to_chinese_numeral(number):
+    """將 1 ~ 999 的整數轉為中文數字 (例如 22 -> 二十二)，與 chinese_numeral_to_int 互為反向"""
+    hundreds, rest = divmod(number, 100)
+    tens, ones = divmod(rest, 10)
+    text = ''
+    if hundreds:
+        text += DIGITS[hundreds] + '百'
+    if tens:
+        text += ('' if tens == 1 and not hundreds else DIGITS[tens]) + '十'
+    elif hundreds and ones:
+        text += '零'
+    if ones:
+        text += DIGITS[ones]
+    return text
+
+
+def random_sentence(rng, minimum, maximum):
+    return '，'.join(rng.choice(PHRASES) for _ in range(rng.randint(minimum, maximum))) + '。'
+
+
+def generate_legislators(rng):
+    """產生立委名冊；部分兩字姓名以全形空白隔開 (如 `黃　捷`)，與實際資料相同"""
+    names = set()
+    legislators = []
+    for party, seats in PARTY_SEATS:
+        for _ in range(seats):
+            while True:
+                given = ''.join(rng.choice(GIVEN_NAME_CHARS) for _ in range(rng.choice((1, 2, 2, 2))))
+                name = rng.choice(SURNAMES) + ('　' if len(given) == 1 else '') + given
+                if name not in names:
+                    break
+            names.add(name)
+            legislators.append({'name': name, 'party': party, 'term': '11', 'leaveFlag': '否'})
+    return {'jsonList': legislators}
+
+
+def generate_comparison_table(rng, articles):
+    rows = []
+    for article in articles:
+        current = f"{article}　{random_sentence(rng, 3, 8)}"
+        modified = f"{article}　{random_sentence(rng, 3, 8)}"
+        rows.append({
+            'modified_text': modified,
+            'current_text': current if rng.random() < 0.8 else '',
+            'explanation': random_sentence(rng, 2, 5),
+        })
+    return rows
+
+
+def generate_month(rng, year, month, bill_count, table_rows, legislators):
+    """產生單一月份的法案列表，欄位與 ai_enriched_data JSON 相同"""
+    from app import CATEGORY_DEFINITIONS
+
+    by_party = {}
+    for legislator in legislators['jsonList']:
+        by_party.setdefault(legislator['party'], []).append(legislator['name'])
+    all_names = [legislator['name'] for legislator in legislators['jsonList']]
+    statuses = [status for status, _ in PROGRESS_STATUSES]
+    status_weights = [weight for _, weight in PROGRESS_STATUSES]
+    categories = list(CATEGORY_DEFINITIONS)
+
+    bills = []
+    for sequence in range(bill_count):
+        law = rng.choice(LAW_NAMES)
+        row_count = rng.randint(1, max(2 * table_rows - 1, 1))
+        article_numbers = sorted(rng.sample(range(1, 120), min(row_count, 119)))
+        articles = [
+            f"第{int_to_chinese_numeral(number)}條" + (f"之{int_to_chinese_numeral(rng.randint(1, 5))}" if rng.random() < 0.1 else '')
+            for number in article_numbers
+        ]
+        if len(articles) == 1:
+            bill_name = f"{law}{articles[0]}條文修正草案"
+        else:
+            bill_name = f"{law}部分條文修正草案"
+
+        roll = rng.random()
+        if roll < 0.08:
+            proposers = ['行政院']
+            cosigners = []
+        elif roll < 0.1:
+            proposers = ['司法院']
+            cosigners = []
+        else:
+            party = rng.choices([party for party, _ in PARTY_SEATS], [seats for _, seats in PARTY_SEATS])[0]
+            proposers = [rng.choice(by_party[party])]
+            cosigners = set()
+            for _ in range(rng.randint(10, 25)):
+                pool = by_party[party] if rng.random() < 0.85 else all_names
+                cosigners.add(rng.choice(pool))
+            cosigners = sorted(cosigners - set(proposers))
+
+        day = rng.randint(1, 28)
+        roc_date = f"{year - 1911:03d}{month:02d}{day:02d}"
+        bills.append({
+            'source_file': f"{roc_date}_{proposers[0]}_{bill_name}.docx",
+            'proposal_no': f"20委{year - 1911:03d}{month:02d}{sequence:05d}",
+            'bill_no': f"{year}{month:02d}{sequence:09d}",
+            'bill_name': bill_name,
+            'reason': f"本院委員{proposers[0]}等{len(cosigners) + 1}人，{random_sentence(rng, 4, 10)}是否有當？敬請公決。",
+            'proposers': proposers,
+            'cosigners': cosigners,
+            'progress': f"{roc_date} {rng.choices(statuses, status_weights)[0]}",
+            'comparison_table': generate_comparison_table(rng, articles),
+            'categories': rng.sample(categories, rng.randint(1, 3)),
+            'ai_analysis': (
+                f"Categories: [{', '.join(categories[:2])}]\n\n&&條文差異比較&&：\n\n{random_sentence(rng, 6, 12)}\n\n"
+                f"&&修法理由總結&&：\n\n{random_sentence(rng, 4, 8)}\n\n&&白話文解說&&：\n\n{random_sentence(rng, 4, 8)}"
+            ),
+        })
+    return bills
+
+
+def generate_dataset(folder, months, bills_per_month, table_rows, seed=0, write_billpack=False):
+    """在 folder 下產生 months 個月份 (結束於 2025 年 7 月) 的合成資料，回傳資料總大小"""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    legislators = generate_legislators(rng)
+    with open(os.path.join(folder, 'legislators.json'), 'w', encoding='utf-8') as f:
+        json.dump(legislators, f, ensure_ascii=False)
+
+    year, month = 2025, 7
+    for _ in range(months):
+        json_path = os.path.join(folder, f"ai_enriched_data_{year}_{month:02d}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(generate_month(rng, year, month, bills_per_month, table_rows, legislators), f, ensure_ascii=False, indent=2)
+        if write_billpack:
+            from billpack import convert_json_file
+            convert_json_file(json_path)
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+
+def parse_scale(text):
+    """`12x300x8` -> (12, 300, 8)"""
+    try:
+        months, bills, rows = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"無效的規模 {text}，格式應為 月份數x每月法案數x對照表列數")
+    return months, bills, rows
+
+
+# --- 2. 路由量測 (在子行程中執行) ---
+
+# 各路由要量測的查詢字串；範圍參數 {start} / {end} 為全部的合成月份
+ROUTE_QUERIES = {
+    '/api/party-stats': ['start={start}&end={end}'],
+    '/api/party-bills': ['party=中國國民黨%2B民主進步黨&start={start}&end={end}&fields=card'],
+    '/api/bills/summary-range': ['start={start}&end={end}', 'start={start}&end={end}&by=progress'],
+    '/api/bills/<int:year>/<int:month>': ['', 'fields=card&limit=50'],
+    '/api/bills-range': ['start={start}&end={end}', 'start={start}&end={end}&fields=card&limit=50'],
+    '/api/bills/all-range': ['start={start}&end={end}'],
+    '/api/search': ['q=修正&start={start}&end={end}', 'q={law}&start={start}&end={end}'],
+    '/api/compare': ['bill_no={bill_no}&start={start}&end={end}'],
+    '/api/diff': ['bills={diff_bills}'],
+    '/api/progress/summary': ['start={start}&end={end}'],
+    '/api/progress/bills': ['stage=三讀&start={start}&end={end}&fields=card'],
+    '/api/articles/<law>': ['start={start}&end={end}'],
+    '/api/articles/<law>/<article>': ['start={start}&end={end}'],
+    '/api/query': ['start={start}&end={end}', 'category=政,商&stage=三讀&party=民主進步黨&start={start}&end={end}'],
+    '/api/legislators/<name>/activity': ['start={start}&end={end}'],
+    '/api/legislators/leaderboard': ['start={start}&end={end}'],
+    '/api/network/legislators/<name>': ['start={start}&end={end}'],
+    '/api/network/parties': ['start={start}&end={end}'],
+    '/api/venn-data': ['start={start}&end={end}'],
+    # 首頁初始化時的批次請求
+    '/api/batch': ['r=%2Fapi%2Fcategories&r=%2Fapi%2Flegislators.json&r=%2Fapi%2Favailable-months'
+                   '&r=%2Fapi%2Fbills%2Fsummary-range&r=%2Fapi%2Fbills%2Fall-range'],
+}
+
+# 回應較大的列表路由另外以 `Accept-Encoding: gzip` 量測一次 (瀏覽器實際取得的是壓縮後的回應)
+COMPRESSED_ROUTES = {
+    '/api/bills/<int:year>/<int:month>',
+    '/api/bills-range',
+    '/api/bills/all-range',
+    '/api/party-bills',
+}
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以位元組為單位，Linux 以 KB 為單位
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def sample_values(app_module):
+    """從合成資料取出路由參數 (年月、立委、法案編號...) 的代表值"""
+    months = app_module.get_available_months()
+    (year, month), (first_year, first_month) = months[0], months[-1]
+    month_data = app_module.bill_store.get_month(year, month)
+    bills = month_data.bills
+    compare_index = app_module.get_compare_index(month_data, app_module.get_legislators())
+    # 找一組有最多來源版本的同名法案，供 /api/compare 與 /api/diff 使用
+    versions = max(compare_index.values(), key=len) if compare_index else {}
+    version_bills = [bills[position]['bill_no'] for position in versions.values()]
+    proposer = next(bill['proposers'][0] for bill in bills if bill['cosigners'])
+    # 法律名稱與條號取自實際有條文修正的法案，供 /api/articles 使用
+    article_index = month_data.derive('article_index', app_module.build_article_index)
+    law = next((name for name in LAW_NAMES if name in article_index), LAW_NAMES[0])
+    article = next(iter(article_index[law].values()))['title'] if law in article_index else '第一條'
+    return {
+        'year': year,
+        'month': month,
+        'start': f"{first_year}-{first_month:02d}",
+        'end': f"{year}-{month:02d}",
+        'name': proposer,
+        'bill_no': version_bills[0] if version_bills else bills[0]['bill_no'],
+        'diff_bills': ','.join(version_bills[:3]) or bills[0]['bill_no'],
+        'law': law,
+        'article': article,
+    }
+
+
+def build_requests(app_module, values):
+    """
+    列出所有 `/api/*` 路由要量測的 (路由, URL, 壓縮方式)；無法填入參數的路由記錄為 skipped。
+    COMPRESSED_ROUTES 中的路由每個查詢另外加一筆 gzip 的量測。
+    """
+    from urllib.parse import quote
+
+    requests_to_run = []
+    skipped = []
+    for rule in sorted(app_module.app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if not rule.rule.startswith('/api/') or 'GET' not in rule.methods:
+            continue
+        missing = [argument for argument in rule.arguments if argument not in values]
+        if missing:
+            skipped.append({'route': rule.rule, 'reason': f"缺少參數 {', '.join(missing)}"})
+            continue
+        path = rule.rule
+        for argument in rule.arguments:
+            path = path.replace(f"<{argument}>", quote(str(values[argument]))).replace(f"<int:{argument}>", str(values[argument]))
+        for query in ROUTE_QUERIES.get(rule.rule, ['']):
+            query = query.format(**values)
+            url = path + (f"?{query}" if query else '')
+            requests_to_run.append((rule.rule, url, None))
+            if rule.rule in COMPRESSED_ROUTES:
+                requests_to_run.append((rule.rule, url, 'gzip'))
+    return requests_to_run, skipped
+
+
+def run_scale(repeat):
+    """量測目前 BILL_DATA_FOLDER 指向的資料，回傳結果 dict"""
+    import_started = time.perf_counter()
+    import app as app_module
+    app_module.start_background_services()
+    # 背景資料監看啟用時，等第一份資料快照 (含預先建立的索引) 完成後才開始量測
+    app_module.data_watcher.wait_ready(timeout=3600)
+    import_seconds = time.perf_counter() - import_started
+
+    client = app_module.app.test_client()
+    values = sample_values(app_module)
+    requests_to_run, skipped = build_requests(app_module, values)
+
+    routes = []
+    for route, url, encoding in requests_to_run:
+        headers = {'Accept-Encoding': encoding} if encoding else {}
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        body_size = len(response.get_data())
+        cold_ms = (time.perf_counter() - started) * 1000
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            client.get(url, headers=headers).get_data()
+            samples.append((time.perf_counter() - started) * 1000)
+        routes.append({
+            'route': route,
+            'url': url,
+            'encoding': encoding,
+            'status': response.status_code,
+            'bytes': body_size,
+            'cold_ms': round(cold_ms, 3),
+            'p50_ms': round(percentile(samples, 0.5), 3),
+            'p95_ms': round(percentile(samples, 0.95), 3),
+            'mean_ms': round(sum(samples) / len(samples), 3),
+            'peak_rss_kb': peak_rss_kb(),
+        })
+
+    return {
+        'import_seconds': round(import_seconds, 4),
+        'routes': routes,
+        'skipped': skipped,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+# --- 3. 主程式 ---
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_scale(scale, repeat, seed, write_billpack, keep_data):
+    months, bills_per_month, table_rows = scale
+    folder = tempfile.mkdtemp(prefix='bill_benchmark_')
+    try:
+        started = time.perf_counter()
+        data_bytes = generate_dataset(folder, months, bills_per_month, table_rows, seed, write_billpack)
+        generate_seconds = time.perf_counter() - started
+
+        result_path = os.path.join(folder, 'result.json')
+        env = dict(os.environ, BILL_DATA_FOLDER=folder)
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-scale', result_path, '--repeat', str(repeat)],
+            cwd=BASE_DIR, env=env, check=True,
+        )
+        with open(result_path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+    finally:
+        if keep_data:
+            print(f"合成資料保留於 {folder}")
+        else:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    result['scale'] = {
+        'months': months,
+        'bills_per_month': bills_per_month,
+        'comparison_table_rows': table_rows,
+        'billpack': write_billpack,
+    }
+    result['data_bytes'] = data_bytes
+    result['generate_seconds'] = round(generate_seconds, 3)
+    return result
+
+
+def print_summary(result):
+    scale = result['scale']
+    print(f"\n== {scale['months']} 個月 x {scale['bills_per_month']} 筆 x {scale['comparison_table_rows']} 列 "
+          f"(資料 {result['data_bytes'] / 1024 / 1024:.1f} MB，峰值 RSS {result['peak_rss_kb']} KB) ==")
+    print(f"{'URL':<90} {'狀態':>4} {'cold':>9} {'p50':>9} {'p95':>9} {'bytes':>11}")
+    for route in result['routes']:
+        label = f"{route['url']} [{route['encoding']}]" if route.get('encoding') else route['url']
+        print(f"{label[:90]:<90} {route['status']:>4} {route['cold_ms']:>9.2f} "
+              f"{route['p50_ms']:>9.2f} {route['p95_ms']:>9.2f} {route['bytes']:>11,}")
+    for route in result['skipped']:
+        print(f"(略過 {route['route']}：{route['reason']})")
+
+
+def compare_results(old_path, new_path):
+    """比較兩次 benchmark 結果：依 (規模, URL, 壓縮方式) 對應，列出 p50 / p95 與回應大小的變化"""
+    def index(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        return {
+            (f"{r['scale']['months']}x{r['scale']['bills_per_month']}x{r['scale']['comparison_table_rows']}",
+             f"{route['url']} [{route['encoding']}]" if route.get('encoding') else route['url']): route
+            for r in report['results'] for route in r['routes']
+        }
+
+    old, new = index(old_path), index(new_path)
+    print(f"{'規模':<10} {'URL':<80} {'p50 舊→新 (ms)':>24} {'p95 比例':>9} {'bytes 比例':>10}")
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        p95_ratio = after['p95_ms'] / before['p95_ms'] if before['p95_ms'] else float('inf')
+        bytes_ratio = after['bytes'] / before['bytes'] if before['bytes'] else float('inf')
+        print(f"{key[0]:<10} {key[1][:80]:<80} {before['p50_ms']:>10.2f} → {after['p50_ms']:<10.2f} "
+              f"{p95_ratio:>9.2f} {bytes_ratio:>10.2f}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:<10} {key[1][:80]:<80} 只出現在{'舊' if key in old else '新'}結果中")
+    return 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='法案 API 效能基準測試')
+    parser.add_argument('--scale', action='append', type=parse_scale,
+                        help='資料規模 月份數x每月法案數x對照表列數，可重複指定 (預設 ' + ', '.join(DEFAULT_SCALES) + ')')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='每個 URL 的重複量測次數')
+    parser.add_argument('--seed', type=int, default=0, help='合成資料的亂數種子')
+    parser.add_argument('--billpack', action='store_true', help='同時產生 billpack 檔案')
+    parser.add_argument('--keep-data', action='store_true', help='保留產生的合成資料資料夾')
+    parser.add_argument('--output', default='benchmark_results.json', help='結果輸出的 JSON 檔案')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='比較兩個結果檔案')
+    parser.add_argument('--run-scale', metavar='RESULT_PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare_results(*args.compare)
+
+    if args.run_scale:
+        result = run_scale(max(args.repeat, 1))
+        with open(args.run_scale, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        return 0
+
+    scales = args.scale or [parse_scale(scale) for scale in DEFAULT_SCALES]
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': [],
+    }
+    for scale in scales:
+        result = benchmark_scale(scale, args.repeat, args.seed, args.billpack, args.keep_data)
+        print_summary(result)
+        report['results'].append(result)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果已寫入 {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""
+法案資料精簡二進位格式 (billpack)
+
+`ai_enriched_data_YYYY_MM.json` 中同時有體積小、常被查詢的欄位 (bill_no、
+bill_name、proposers、categories、progress...)，以及體積龐大、只有顯示詳細
+內容時才需要的欄位 (comparison_table、ai_analysis、reason)。
+
+billpack 以 msgpack 儲存，檔案結構如下：
+
+    [MAGIC 8 bytes][標頭長度 uint64 LE][標頭 (msgpack)][重欄位區]
+
+- 標頭包含來源 JSON 的檔案簽章、欄位順序、每筆法案的輕欄位，
+  以及每筆法案各個重欄位在重欄位區中的 (offset, length)。
+- 讀取時只解析標頭，重欄位區以 mmap 對應，真正需要時才依 offset 解碼。
+
+用法 (轉換 storage/ai_output 下所有月份，或指定檔案)：
+
+    python billpack.py
+    python billpack.py storage/ai_output/ai_enriched_data_2025_07.json
+
+同一模組也提供共用資料快照 (billsnap)：把所有月份、立委資料與預先建立的索引
+寫進單一檔案，多個 gunicorn worker 以 mmap 對應同一份檔案 (由 `python app.py
+--build-snapshot` 產生)。法案 (含輕欄位)、預先編碼的 JSON 與索引都只在作業系統的
+page cache 中保存一份，標頭只記錄各段資料的位置：
+
+    [SNAPSHOT_MAGIC 8 bytes][標頭長度 uint64 LE][標頭 (msgpack)][對齊 8 bytes][資料區]
+"""
+import functools
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+try:
+    import msgpack
+except ImportError:  # msgpack 未安裝時，伺服器會直接讀取 JSON
+    msgpack = None
+
+MAGIC = b'BILLPK01'
+SNAPSHOT_MAGIC = b'BILLSN02'
+HEADER_LENGTH = struct.Struct('<Q')
+POSTINGS_HEADER = struct.Struct('<I')
+PACK_SUFFIX = '.billpack'
+
+# 只有顯示詳細內容時才需要的欄位，存放在重欄位區並延遲載入
+HEAVY_FIELDS = ('comparison_table', 'ai_analysis', 'reason')
+# 共用資料快照中，每個 worker 最多快取的已解碼法案列數 (輕欄位留在 mmap 中，常用的列才解碼保存)
+SNAPSHOT_ROW_CACHE_SIZE = 8192
+
+
+def pack_path_for(json_path):
+    """JSON 檔案對應的 billpack 檔案路徑"""
+    return os.path.splitext(json_path)[0] + PACK_SUFFIX
+
+
+class DataRegion:
+    """寫入時累積資料區的內容，回傳每段資料的 [offset, length]"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add_raw(self, data, align=1):
+        padding = -self.size % align
+        if padding:
+            self.chunks.append(b'\0' * padding)
+            self.size += padding
+        location = [self.size, len(data)]
+        self.chunks.append(data)
+        self.size += len(data)
+        return location
+
+    def add(self, value):
+        return self.add_raw(msgpack.packb(value, use_bin_type=True))
+
+
+def split_bills(bills, field_order, region):
+    """將法案拆成輕欄位 (放在標頭) 與重欄位 (寫入資料區，只記錄位置)"""
+    hot_rows = []
+    heavy_rows = []
+    for bill in bills:
+        hot = {}
+        heavy = {}
+        for field, value in bill.items():
+            if field not in field_order:
+                field_order.append(field)
+            if field in HEAVY_FIELDS:
+                heavy[field] = region.add(value)
+            else:
+                hot[field] = value
+        hot_rows.append(hot)
+        heavy_rows.append(heavy)
+    return hot_rows, heavy_rows
+
+
+def write_rows(region, rows):
+    """
+    將每一列各自以 msgpack 編碼、連續寫入資料區，再寫入列的起點表 (列數 + 1 個 uint64)，
+    回傳起點表的位置；讀取時以 PackedRows 依索引解碼單一列。
+    """
+    starts = array('Q')
+    for row in rows:
+        starts.append(region.add(row)[0])
+    starts.append(region.size)
+    return region.add_raw(starts.tobytes(), align=8)
+
+
+def write_packed_file(path, magic, header, region, alignment=1):
+    """
+    寫入 [magic][標頭長度][標頭][資料區] (先寫入暫存檔再取代，避免讀到寫到一半的檔案)。
+    alignment 大於 1 時在資料區前補零，讓資料區內對齊的陣列在檔案中同樣對齊。
+    """
+    encoded_header = msgpack.packb(header, use_bin_type=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(magic)
+        f.write(HEADER_LENGTH.pack(len(encoded_header)))
+        f.write(encoded_header)
+        f.write(b'\0' * (-f.tell() % alignment))
+        for chunk in region.chunks:
+            f.write(chunk)
+    os.replace(temp_path, path)
+
+
+def write_bill_pack(bills, pack_path, source_signature):
+    """將法案列表寫成 billpack 檔案"""
+    field_order = []
+    region = DataRegion()
+    hot_rows, heavy_rows = split_bills(bills, field_order, region)
+    write_packed_file(pack_path, MAGIC, {
+        'source_mtime_ns': source_signature[0],
+        'source_size': source_signature[1],
+        'field_order': field_order,
+        'hot': hot_rows,
+        'heavy': heavy_rows,
+    }, region)
+
+
+class LazyBill(Mapping):
+    """
+    唯讀的法案物件：輕欄位常駐記憶體，重欄位在取用時才從 mmap 解碼 (不快取)。
+    行為與一般 dict 相同，可直接用於 bill.get(...)、`in`、dict(bill) 等操作。
+    """
+
+    __slots__ = ('_hot', '_heavy', '_reader')
+
+    def __init__(self, hot, heavy, reader):
+        self._hot = hot
+        self._heavy = heavy
+        self._reader = reader
+
+    def __getitem__(self, field):
+        if field in self._hot:
+            return self._hot[field]
+        location = self._heavy.get(field)
+        if location is None:
+            raise KeyError(field)
+        return self._reader.read_heavy(*location)
+
+    def __contains__(self, field):
+        return field in self._hot or field in self._heavy
+
+    def __iter__(self):
+        for field in self._reader.field_order:
+            if field in self._hot or field in self._heavy:
+                yield field
+
+    def __len__(self):
+        return len(self._hot) + len(self._heavy)
+
+    def to_dict(self):
+        return {field: self[field] for field in self}
+
+
+class PackedFileReader:
+    """以 mmap 開啟 [magic][標頭長度][標頭][資料區] 格式的檔案：標頭立即解析，資料區按需讀取"""
+
+    magic = None
+    alignment = 1
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(self.magic)] != self.magic:
+            self._mmap.close()
+            raise ValueError(f"{path} 不是有效的 {type(self).__name__} 檔案")
+        header_start = len(self.magic) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack(self._mmap[len(self.magic):header_start])
+        self.header = msgpack.unpackb(
+            self._mmap[header_start:header_start + header_length], raw=False, strict_map_key=False,
+        )
+        self.heavy_start = header_start + header_length
+        self.heavy_start += -self.heavy_start % self.alignment
+        self.header_size = header_length
+
+    def read_heavy(self, offset, length):
+        start = self.heavy_start + offset
+        return msgpack.unpackb(self._mmap[start:start + length], raw=False, strict_map_key=False)
+
+    def read_raw(self, offset, length):
+        """回傳資料區的唯讀 memoryview (不複製，直接對應 mmap)"""
+        start = self.heavy_start + offset
+        return memoryview(self._mmap)[start:start + length]
+
+
+class BillPackReader(PackedFileReader):
+    """開啟 billpack 檔案：標頭立即解析，重欄位區以 mmap 對應"""
+
+    magic = MAGIC
+
+    def __init__(self, pack_path):
+        super().__init__(pack_path)
+        header = self.header
+        self.source_signature = (header['source_mtime_ns'], header['source_size'])
+        self.field_order = header['field_order']
+        self.bills = [
+            LazyBill(hot, heavy, self)
+            for hot, heavy in zip(header['hot'], header['heavy'])
+        ]
+        del self.header
+
+
+def load_bill_pack(json_path, source_signature):
+    """
+    讀取 JSON 檔案對應的 billpack；msgpack 未安裝、檔案不存在、
+    或 billpack 是由舊版 JSON 轉換而來時回傳 None (由呼叫端改讀 JSON)。
+    """
+    if msgpack is None:
+        return None
+    pack_path = pack_path_for(json_path)
+    if not os.path.exists(pack_path):
+        return None
+    try:
+        reader = BillPackReader(pack_path)
+    except Exception as e:
+        print(f"讀取 {pack_path} 時發生錯誤: {e}")
+        return None
+    if reader.source_signature != tuple(source_signature):
+        return None
+    return reader
+
+
+def pack_postings(postings):
+    """
+    將 {n-gram: [法案位置]} 倒排索引編碼成可直接在 mmap 上查詢的位元組 (見 PackedPostings)：
+    [鍵數][鍵的位置表][位置列表的起點表][所有法案位置 uint32][依 UTF-8 排序的鍵]
+    """
+    keys = sorted(gram.encode('utf-8') for gram in postings)
+    key_offsets = array('I', [0])
+    posting_offsets = array('I', [0])
+    positions = array('I')
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        positions.extend(postings[key.decode('utf-8')])
+        posting_offsets.append(len(positions))
+    return b''.join([
+        POSTINGS_HEADER.pack(len(keys)), key_offsets.tobytes(), posting_offsets.tobytes(),
+        positions.tobytes(), b''.join(keys),
+    ])
+
+
+class PackedPostings:
+    """
+    唯讀的倒排索引，以二分搜尋查詢 (介面同 dict.get)。
+    buffer 可以是 mmap 的片段 (不佔用 worker 自己的記憶體)，也可以是 pack_postings 產生的 bytes。
+    """
+
+    def __init__(self, buffer):
+        buffer = memoryview(buffer)
+        self.buffer = buffer
+        (self._count,) = POSTINGS_HEADER.unpack(buffer[:POSTINGS_HEADER.size])
+        start = POSTINGS_HEADER.size
+        table_size = 4 * (self._count + 1)
+        self._key_offsets = buffer[start:start + table_size].cast('I')
+        start += table_size
+        self._posting_offsets = buffer[start:start + table_size].cast('I')
+        start += table_size
+        positions_size = 4 * self._posting_offsets[self._count]
+        self._positions = buffer[start:start + positions_size].cast('I')
+        self._keys = buffer[start + positions_size:]
+
+    def _key(self, index):
+        return self._keys[self._key_offsets[index]:self._key_offsets[index + 1]].tobytes()
+
+    def __len__(self):
+        return self._count
+
+    def _lower_bound(self, target):
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, gram, default=None):
+        target = gram.encode('utf-8')
+        low = self._lower_bound(target)
+        if low < self._count and self._key(low) == target:
+            return self._positions[self._posting_offsets[low]:self._posting_offsets[low + 1]].tolist()
+        return default
+
+    def get_prefix(self, prefix):
+        """所有以 prefix 開頭的鍵，其位置列表的聯集 (鍵依 UTF-8 排序，相同前綴的鍵與位置列表都是連續的)"""
+        target = prefix.encode('utf-8')
+        low = self._lower_bound(target)
+        high = low
+        while high < self._count and self._key(high).startswith(target):
+            high += 1
+        return set(self._positions[self._posting_offsets[low]:self._posting_offsets[high]])
+
+
+class PackedRows(Sequence):
+    """
+    以 write_rows 寫入的列，依索引取用時才從 mmap 解碼。
+    cache_size 大於 0 時以 LRU 快取最近解碼的列 (記憶體用量固定，不隨資料量成長)。
+    """
+
+    def __init__(self, reader, location, cache_size=0):
+        self._reader = reader
+        self._starts = reader.read_raw(*location).cast('Q')
+        if cache_size:
+            self._decode = functools.lru_cache(maxsize=cache_size)(self._decode)
+
+    def _decode(self, index):
+        start = self._starts[index]
+        return self._reader.read_heavy(start, self._starts[index + 1] - start)
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._decode(index)
+
+
+class SnapshotBill(LazyBill):
+    """共用資料快照中的法案：輕欄位與重欄位的位置都留在 mmap 中 (一列 [輕欄位, 重欄位位置])，取用時才解碼"""
+
+    __slots__ = ('_rows', '_index')
+
+    def __init__(self, rows, index, reader):
+        self._rows = rows
+        self._index = index
+        self._reader = reader
+
+    @property
+    def _hot(self):
+        return self._rows[self._index][0]
+
+    @property
+    def _heavy(self):
+        return self._rows[self._index][1]
+
+
+class SnapshotBills(Sequence):
+    """共用資料快照中單一月份的法案列表 (唯讀)，取用時才建立 SnapshotBill"""
+
+    def __init__(self, rows, reader):
+        self._rows = rows
+        self._reader = reader
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return SnapshotBill(self._rows, index, self._reader)
+
+
+def write_snapshot(snapshot_path, months, legislators, files):
+    """
+    寫入共用資料快照。
+    months: [{'year', 'month', 'signature', 'bills',
+              'indexes': {key: 值 (msgpack)}, 'tables': {key: [列]}, 'postings': {key: PackedPostings},
+              'arrays': {名稱: 陣列的 bytes}, 'encoded': (bytes, [(起, 訖)])}]
+    legislators: (立委資料 dict, 簽章) 或 None；files: 快照涵蓋的 [(檔名, mtime_ns, 大小)]
+    """
+    field_order = []
+    region = DataRegion()
+    month_headers = []
+    for month in months:
+        hot_rows, heavy_rows = split_bills(month['bills'], field_order, region)
+        joined, offsets = month['encoded']
+        month_headers.append({
+            'year': month['year'],
+            'month': month['month'],
+            'signature': list(month['signature']),
+            'bills': write_rows(region, zip(hot_rows, heavy_rows)),
+            'indexes': {key: region.add(value) for key, value in month['indexes'].items()},
+            'tables': {key: write_rows(region, rows) for key, rows in month['tables'].items()},
+            'postings': {key: region.add_raw(value.buffer.tobytes(), align=4) for key, value in month['postings'].items()},
+            'arrays': {name: region.add_raw(data, align=8) for name, data in month['arrays'].items()},
+            'encoded': region.add_raw(joined),
+            'encoded_offsets': region.add_raw(array('Q', [value for pair in offsets for value in pair]).tobytes(), align=8),
+        })
+    write_packed_file(snapshot_path, SNAPSHOT_MAGIC, {
+        'files': [list(item) for item in files],
+        'field_order': field_order,
+        'legislators': [region.add(legislators[0]), list(legislators[1])] if legislators is not None else None,
+        'months': month_headers,
+    }, region, alignment=8)
+
+
+class SnapshotReader(PackedFileReader):
+    """
+    開啟共用資料快照。標頭只有各段資料的位置；法案、索引與預先編碼的 JSON 都留在 mmap 中，
+    取用時才解碼 (陣列、倒排索引與預先編碼的 JSON 以 memoryview 直接對應，不複製)。
+    """
+
+    magic = SNAPSHOT_MAGIC
+    alignment = 8
+
+    def __init__(self, snapshot_path):
+        super().__init__(snapshot_path)
+        header = self.header
+        self.files = [tuple(item) for item in header['files']]
+        self.field_order = header['field_order']
+        self.legislators = header['legislators']
+        self.months = header['months']
+        for month in self.months:
+            month['bills'] = SnapshotBills(PackedRows(self, month['bills'], SNAPSHOT_ROW_CACHE_SIZE), self)
+        del self.header
+
+    def read_rows(self, location):
+        """以 write_rows 寫入的列 (不快取)"""
+        return PackedRows(self, location)
+
+    def read_legislators(self):
+        """回傳 (立委資料 dict, 簽章)，快照不含立委資料時回傳 None"""
+        if self.legislators is None:
+            return None
+        location, signature = self.legislators
+        return self.read_heavy(*location), tuple(signature)
+
+
+def open_snapshot(snapshot_path):
+    """開啟共用資料快照；msgpack 未安裝、檔案不存在或無法解析時回傳 None"""
+    if msgpack is None or not os.path.exists(snapshot_path):
+        return None
+    try:
+        return SnapshotReader(snapshot_path)
+    except Exception as e:
+        print(f"讀取 {snapshot_path} 時發生錯誤: {e}")
+        return None
+
+
+def convert_json_file(json_path):
+    """將單一 ai_enriched_data JSON 檔案轉換為 billpack，回傳輸出路徑"""
+    import json
+
+    stat = os.stat(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        bills = json.load(f)
+    pack_path = pack_path_for(json_path)
+    write_bill_pack(bills, pack_path, (stat.st_mtime_ns, stat.st_size))
+    return pack_path
+
+
+def main(argv):
+    if msgpack is None:
+        print("需要先安裝 msgpack (pip install msgpack)。")
+        return 1
+    if argv:
+        json_paths = argv
+    else:
+        import glob
+        data_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "ai_output")
+        json_paths = sorted(glob.glob(os.path.join(data_folder, "ai_enriched_data_*.json")))
+
+    for json_path in json_paths:
+        pack_path = convert_json_file(json_path)
+        print(f"{json_path} ({os.path.getsize(json_path):,} bytes) -> "
+              f"{pack_path} ({os.path.getsize(pack_path):,} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn 設定：所有 worker 共用同一份唯讀資料快照
+
+    gunicorn -c gunicorn.conf.py app:app
+
+- master 啟動時先執行 `python app.py --build-snapshot` 建立共用資料快照檔 (billsnap)，
+  每個 worker 以 mmap 對應同一個檔案，不再各自解析 JSON 與建立索引。
+- master 定期檢查資料夾，檔案有變動時重新建立快照 (寫入暫存檔後取代)，
+  worker 偵測到快照檔被替換後重新 mmap。
+"""
+import os
+import subprocess
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.environ.get('BILL_DATA_FOLDER') or os.path.join(BASE_DIR, "storage", "ai_output")
+# worker 會繼承 master 的環境變數，因此在這裡設定即可讓 app.py 進入共用快照模式
+SNAPSHOT_PATH = os.environ.setdefault('SHARED_SNAPSHOT_PATH', os.path.join(DATA_FOLDER, 'shared.billsnap'))
+REBUILD_INTERVAL = float(os.environ.get('DATA_WATCH_INTERVAL', 5))
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+
+
+def data_folder_signature():
+    """資料夾中所有 JSON 檔案的 (檔名, mtime, 大小)"""
+    try:
+        with os.scandir(DATA_FOLDER) as entries:
+            return sorted(
+                (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries if entry.name.endswith('.json')
+            )
+    except OSError:
+        return None
+
+
+def build_snapshot():
+    """在子行程中建立快照 (master 本身不載入 app，避免 fork 出的 worker 繼承資料)"""
+    env = dict(os.environ, DATA_WATCH_INTERVAL='0')
+    result = subprocess.run(
+        [sys.executable, os.path.join(BASE_DIR, 'app.py'), '--build-snapshot', SNAPSHOT_PATH],
+        cwd=BASE_DIR, env=env,
+    )
+    return result.returncode == 0
+
+
+def watch_data_folder(server):
+    signature = data_folder_signature()
+    while True:
+        threading.Event().wait(REBUILD_INTERVAL)
+        current = data_folder_signature()
+        if current == signature:
+            continue
+        server.log.info("資料夾有變動，重新建立共用資料快照")
+        if build_snapshot():
+            signature = current
+
+
+def on_starting(server):
+    if not build_snapshot():
+        server.log.warning("建立共用資料快照失敗，worker 將改為各自讀取資料夾")
+
+
+def when_ready(server):
+    if REBUILD_INTERVAL > 0:
+        threading.Thread(target=watch_data_folder, args=(server,), name='snapshot-rebuilder', daemon=True).start()
+
+
+def post_worker_init(worker):
+    # worker 載入 app 之後才啟動背景監看 (master 不載入 app)
+    import app
+    app.start_background_services()
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+月份資料匯入工具 (ingest)
+
+新的月份以原始的 `ai_enriched_data_YYYY_MM.json` 放進資料夾後，執行一次匯入：
+
+1. 依 BILL_SCHEMA 驗證檔案內容，格式錯誤時列出有問題的法案與欄位，不寫入任何檔案
+   (不必等到 API 回傳 500 才發現)。
+2. 正規化內容：去除姓名中的全形空白，並將分類對應到 CATEGORY_DEFINITIONS 的短格式
+   (例如 `罰 (刑罰、處罰)` -> `罰`、`國防` -> `防`，無法對應的分類歸入 `其他`)，
+   有變動時寫回來源檔案。
+3. 產生附屬索引檔 (`ai_enriched_data_YYYY_MM` + app.py 的 INGEST_SIDECAR_SUFFIX，
+   即 `.v<INGEST_SIDECAR_VERSION>.billidx`)：分類統計、進度索引、
+   立委活動索引、條號列表與政黨參與索引，app.py 載入月份時直接使用，不必再由法案內容建立。
+
+附屬索引檔記錄來源檔案與 legislators.json 的內容雜湊，只有內容變動的月份才會重新處理，
+新增一個月份的成本只與該月份的大小有關。檔案只是被 touch (簽章改變但內容相同) 時，
+只更新附屬索引檔記錄的簽章。
+
+用法 (處理資料夾下所有月份，或指定檔案)：
+
+    python ingest.py
+    python ingest.py storage/ai_output/ai_enriched_data_2025_08.json
+    python ingest.py --check    # 只驗證並列出會有的變動，不寫入檔案
+    python ingest.py --force    # 忽略雜湊，全部重新處理
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+from app import (
+    CATEGORY_DEFINITIONS, DATA_FOLDER, INGEST_SIDECAR_VERSION, MONTH_FILE_PATTERN, MonthData,
+    build_article_titles, build_legislator_index, build_month_aggregates, build_progress_index,
+    get_party_index, load_legislators_file, read_month_sidecar, sidecar_path_for,
+)
+from billpack import convert_json_file, msgpack, pack_path_for
+
+# 法案欄位定義：欄位 -> (允許的型別, 是否必要)；陣列欄位另以 BILL_LIST_ITEM_TYPES 檢查元素型別
+BILL_SCHEMA = {
+    'bill_no': (str, True),
+    'proposers': (list, True),
+    'cosigners': (list, True),
+    'categories': (list, True),
+    'progress': (str, True),
+    'bill_name': ((str, type(None)), False),
+    'source_file': (str, False),
+    'proposal_no': (str, False),
+    'reason': (str, False),
+    'ai_analysis': (str, False),
+    'comparison_table': (list, False),
+}
+BILL_LIST_ITEM_TYPES = {
+    'proposers': str,
+    'cosigners': str,
+    'categories': str,
+    'comparison_table': dict,
+}
+COMPARISON_ROW_FIELDS = ('modified_text', 'current_text', 'explanation')
+TYPE_NAMES = {str: '字串', list: '陣列', dict: '物件', type(None): 'null'}
+# 錯誤過多時只列出前幾筆
+MAX_REPORTED_ERRORS = 20
+
+
+def type_description(expected):
+    types = expected if isinstance(expected, tuple) else (expected,)
+    return ' 或 '.join(TYPE_NAMES[t] for t in types)
+
+
+def validate_bills(bills):
+    """依 BILL_SCHEMA 驗證月份檔案內容，回傳錯誤訊息列表 (沒有錯誤時為空列表)"""
+    if not isinstance(bills, list):
+        return ['檔案內容應為法案物件的陣列']
+    errors = []
+    seen_bill_nos = set()
+    for position, bill in enumerate(bills):
+        if not isinstance(bill, dict):
+            errors.append(f"第 {position + 1} 筆: 應為物件")
+            continue
+        label = f"第 {position + 1} 筆 ({bill.get('bill_no')})"
+        for field, (expected, required) in BILL_SCHEMA.items():
+            if field not in bill:
+                if required:
+                    errors.append(f"{label}: 缺少欄位 {field}")
+                continue
+            value = bill[field]
+            if not isinstance(value, expected):
+                errors.append(f"{label}: 欄位 {field} 應為{type_description(expected)}")
+                continue
+            item_type = BILL_LIST_ITEM_TYPES.get(field)
+            if item_type is not None and not all(isinstance(item, item_type) for item in value):
+                errors.append(f"{label}: 欄位 {field} 的元素應為{type_description(item_type)}")
+        for row in bill.get('comparison_table') or []:
+            if isinstance(row, dict) and not all(isinstance(row.get(key, ''), str) for key in COMPARISON_ROW_FIELDS):
+                errors.append(f"{label}: comparison_table 的 {'/'.join(COMPARISON_ROW_FIELDS)} 應為字串")
+                break
+        bill_no = bill.get('bill_no')
+        if isinstance(bill_no, str):
+            if not bill_no.strip():
+                errors.append(f"{label}: bill_no 不可為空")
+            elif bill_no in seen_bill_nos:
+                errors.append(f"{label}: bill_no 重複")
+            seen_bill_nos.add(bill_no)
+    return errors
+
+
+def build_category_aliases():
+    """分類別名 -> 短格式：短格式本身、長格式，以及長格式括號中的各個項目 (例如 `國防` -> `防`)"""
+    aliases = {}
+    for key, label in CATEGORY_DEFINITIONS.items():
+        aliases[key] = key
+        aliases[label] = key
+        match = re.search(r'\((.*)\)', label)
+        for term in (match.group(1).split('/') if match else []):
+            aliases.setdefault(term, key)
+    aliases.setdefault('其他重要議題', '其他')
+    return aliases
+
+CATEGORY_ALIASES = build_category_aliases()
+
+
+def canonicalize_category(category):
+    """將分類對應到 CATEGORY_DEFINITIONS 的短格式，例如 `罰 (刑罰、處罰)` -> `罰`；無法對應時回傳 None"""
+    text = re.sub(r'\s', '', category).replace('（', '(').replace('）', ')')
+    if text in CATEGORY_ALIASES:
+        return CATEGORY_ALIASES[text]
+    prefix = text.split('(', 1)[0]
+    if prefix in CATEGORY_DEFINITIONS:
+        return prefix
+    return None
+
+
+def normalize_participant_name(name):
+    """去除姓名中的全形空白與前後空白，例如 `黃　捷` -> `黃捷` (原住民族姓名中的半形空白保留)"""
+    return name.replace('　', '').strip()
+
+
+def normalize_bills(bills):
+    """
+    就地正規化已通過驗證的法案列表 (姓名與分類)，回傳變動統計：
+    {'names': 修改的姓名數, 'categories': 修改的分類數, 'unknown_categories': Counter}
+    """
+    stats = {'names': 0, 'categories': 0, 'unknown_categories': Counter()}
+    for bill in bills:
+        for field in ('proposers', 'cosigners'):
+            names = []
+            for name in bill[field]:
+                normalized = normalize_participant_name(name)
+                if normalized != name:
+                    stats['names'] += 1
+                # 只有空白的姓名直接移除
+                if normalized:
+                    names.append(normalized)
+            bill[field] = names
+
+        categories = []
+        for category in bill['categories']:
+            canonical = canonicalize_category(category)
+            if canonical is None:
+                stats['unknown_categories'][category] += 1
+                canonical = '其他'
+            if canonical not in categories:
+                categories.append(canonical)
+        if categories != bill['categories']:
+            stats['categories'] += 1
+        bill['categories'] = categories
+    return stats
+
+
+def file_sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_atomic(path, data):
+    """先寫入暫存檔再取代，避免伺服器讀到寫到一半的檔案"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def build_sidecar_indexes(month_data, legislators):
+    """建立要寫入附屬索引檔的衍生索引 (與 app.py 的 builder 相同，確保結果一致)"""
+    return {
+        'aggregates': build_month_aggregates(month_data),
+        'progress_index': build_progress_index(month_data),
+        'legislator_index': build_legislator_index(month_data),
+        'article_titles': build_article_titles(month_data),
+        'party_index': get_party_index(month_data, legislators) if legislators is not None else None,
+    }
+
+
+def write_sidecar(sidecar_path, header, indexes):
+    encoded = (
+        json.dumps(header, ensure_ascii=False) + '\n'
+        + json.dumps(indexes, ensure_ascii=False, separators=(',', ':')) + '\n'
+    ).encode('utf-8')
+    write_atomic(sidecar_path, encoded)
+    return len(encoded)
+
+
+class LegislatorsSource:
+    """資料夾中的 legislators.json：解析後的 LegislatorData 與內容雜湊 (不存在時皆為 None)"""
+
+    def __init__(self, data_folder):
+        self.legislators = None
+        self.sha256 = None
+        self.signature = None
+        file_path = os.path.join(data_folder, 'legislators.json')
+        try:
+            stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                self.sha256 = file_sha256(f.read())
+        except OSError:
+            return
+        self.signature = [stat.st_mtime_ns, stat.st_size]
+        self.legislators = load_legislators_file(file_path, tuple(self.signature))
+        if self.legislators is None:
+            self.sha256 = self.signature = None
+
+
+def ingest_month(json_path, legislators_source, force=False, check=False):
+    """匯入單一月份檔案，回傳是否成功 (驗證失敗時為 False)"""
+    match = MONTH_FILE_PATTERN.match(os.path.basename(json_path))
+    if match is None:
+        print(f"{json_path}: 檔名應為 ai_enriched_data_YYYY_MM.json")
+        return False
+    year, month = int(match.group(1)), int(match.group(2))
+    label = f"{year}-{month:02d}"
+    sidecar_path = sidecar_path_for(json_path)
+
+    try:
+        stat = os.stat(json_path)
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        print(f"{label}: 無法讀取 {json_path}: {e}")
+        return False
+    signature = [stat.st_mtime_ns, stat.st_size]
+    existing = None if force else read_month_sidecar(sidecar_path, with_indexes=False)
+    existing_header = existing[0] if existing is not None else None
+    if (existing_header is not None and existing_header.get('legislators_sha256') == legislators_source.sha256
+            and existing_header.get('source_signature') == signature
+            and existing_header.get('legislators_signature') == legislators_source.signature):
+        print(f"{label}: 未變動，略過")
+        return True
+
+    source_sha256 = file_sha256(raw)
+    if (existing_header is not None and existing_header.get('source_sha256') == source_sha256
+            and existing_header.get('legislators_sha256') == legislators_source.sha256):
+        # 內容相同，只是檔案被 touch 或複製過：更新簽章即可，不必重建索引
+        if not check:
+            existing = read_month_sidecar(sidecar_path)
+            if existing is not None:
+                write_sidecar(sidecar_path, dict(
+                    existing[0], source_signature=signature, legislators_signature=legislators_source.signature,
+                ), existing[1])
+        print(f"{label}: 內容未變動，更新附屬索引的檔案簽章")
+        return True
+
+    try:
+        bills = json.loads(raw)
+    except ValueError as e:
+        print(f"{label}: JSON 解析失敗: {e}")
+        return False
+    errors = validate_bills(bills)
+    if errors:
+        print(f"{label}: 驗證失敗，共 {len(errors)} 個錯誤")
+        for error in errors[:MAX_REPORTED_ERRORS]:
+            print(f"  {error}")
+        if len(errors) > MAX_REPORTED_ERRORS:
+            print(f"  ... 其餘 {len(errors) - MAX_REPORTED_ERRORS} 個錯誤省略")
+        return False
+
+    stats = normalize_bills(bills)
+    for category, count in stats['unknown_categories'].most_common():
+        print(f"  {label}: 無法對應的分類 `{category}` ({count} 筆) 歸入「其他」")
+    source_changed = stats['names'] > 0 or stats['categories'] > 0
+    summary = f"{len(bills)} 筆法案，正規化姓名 {stats['names']} 個、分類 {stats['categories']} 筆"
+    if check:
+        print(f"{label}: 驗證通過，{summary}{' (需要寫回來源檔案)' if source_changed else ''}")
+        return True
+
+    if source_changed:
+        # 與原始檔案相同的格式 (縮排 2、保留中文字元)
+        raw = json.dumps(bills, ensure_ascii=False, indent=2).encode('utf-8')
+        write_atomic(json_path, raw)
+        stat = os.stat(json_path)
+        signature = [stat.st_mtime_ns, stat.st_size]
+        source_sha256 = file_sha256(raw)
+        # 舊的 billpack 已與來源不符，重新轉換
+        if msgpack is not None and os.path.exists(pack_path_for(json_path)):
+            convert_json_file(json_path)
+
+    month_data = MonthData(year, month, bills, *signature)
+    header = {
+        'version': INGEST_SIDECAR_VERSION,
+        'source_signature': signature,
+        'source_sha256': source_sha256,
+        'legislators_signature': legislators_source.signature,
+        'legislators_sha256': legislators_source.sha256,
+        'bill_count': len(bills),
+    }
+    sidecar_size = write_sidecar(sidecar_path, header, build_sidecar_indexes(month_data, legislators_source.legislators))
+    print(f"{label}: 已處理 {summary}{' (已寫回來源檔案)' if source_changed else ''}，"
+          f"附屬索引 {os.path.basename(sidecar_path)} ({sidecar_size:,} bytes)")
+    return True
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='驗證、正規化月份資料並產生附屬索引檔')
+    parser.add_argument('paths', nargs='*', help='要匯入的月份 JSON 檔案 (預設為資料夾中所有月份)')
+    parser.add_argument('--check', action='store_true', help='只驗證並列出會有的變動，不寫入檔案')
+    parser.add_argument('--force', action='store_true', help='忽略內容雜湊，全部重新處理')
+    args = parser.parse_args(argv)
+
+    json_paths = args.paths or sorted(
+        path for path in glob.glob(os.path.join(DATA_FOLDER, 'ai_enriched_data_*.json'))
+        if MONTH_FILE_PATTERN.match(os.path.basename(path))
+    )
+    legislators_by_folder = {}
+    failed = 0
+    for json_path in json_paths:
+        folder = os.path.dirname(os.path.abspath(json_path))
+        if folder not in legislators_by_folder:
+            legislators_by_folder[folder] = LegislatorsSource(folder)
+        if not ingest_month(json_path, legislators_by_folder[folder], force=args.force, check=args.check):
+            failed += 1
+    if failed:
+        print(f"{failed} 個月份匯入失敗")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
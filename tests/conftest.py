@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+測試共用的合成資料：在暫存資料夾中產生月份檔案與 legislators.json，
+並讓 app 的資料夾、BillStore 與各種快取改用這份資料。
+"""
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+LEGISLATORS = [
+    {'name': '王小明', 'party': '民主進步黨'},
+    {'name': '李　華', 'party': '中國國民黨'},
+    {'name': '陳大同', 'party': '台灣民眾黨'},
+    {'name': '林美玲', 'party': '民主進步黨'},
+    {'name': '張志強', 'party': '中國國民黨'},
+    {'name': '黃‧安', 'party': '無黨籍'},
+]
+LAW_NAMES = ['國家安全法', '勞動基準法', '食品安全衛生管理法', '道路交通管理處罰條例', '所得稅法']
+PROGRESS_TEXTS = ['一讀(委員會待審)', '委員會審議中', '二讀(廣泛討論)', '三讀', '撤回']
+ARTICLE_NUMBERS = ['一', '二', '三', '九', '十', '十一']
+
+
+def make_bill(rng, year, month, index):
+    """產生一筆格式與 ai_enriched_data 相同的合成法案"""
+    law = rng.choice(LAW_NAMES)
+    article = rng.choice(ARTICLE_NUMBERS)
+    names = [legislator['name'] for legislator in LEGISLATORS]
+    proposers = rng.sample(names, rng.randint(1, 2))
+    cosigners = rng.sample([name for name in names if name not in proposers], rng.randint(0, 3))
+    return {
+        'bill_no': f"2021{year % 100:02d}{month:02d}{index:05d}0000",
+        'bill_name': f"{law}第{article}條條文修正草案",
+        'reason': f"為強化{law}之執行，第{index}案爰擬具修正草案。",
+        'proposers': proposers,
+        'cosigners': cosigners,
+        'progress': f"{year - 1911}{month:02d}{rng.randint(1, 28):02d} {rng.choice(PROGRESS_TEXTS)}",
+        'categories': rng.sample(list(app.CATEGORY_DEFINITIONS), rng.randint(1, 3)),
+        'comparison_table': [{
+            'modified_text': f"第{article}條　修正後之{law}條文內容{index}。",
+            'current_text': rng.choice([f"第{article}條　現行{law}條文內容。", '無']),
+            'explanation': f"說明{index}",
+        }],
+        'ai_analysis': f"&&法案分類&&：\n{law}修正分析{index}",
+    }
+
+
+def make_month_bills(year, month, count=30):
+    rng = random.Random(year * 100 + month)
+    return [make_bill(rng, year, month, index) for index in range(count)]
+
+
+def write_data_folder(folder, months=((2025, 5), (2025, 6), (2025, 7)), count=30):
+    """寫入月份檔案與 legislators.json，回傳 {(年, 月): 法案列表}"""
+    bills_by_month = {}
+    for year, month in months:
+        bills = make_month_bills(year, month, count)
+        with open(os.path.join(folder, f"ai_enriched_data_{year}_{month:02d}.json"), 'w', encoding='utf-8') as f:
+            json.dump(bills, f, ensure_ascii=False)
+        bills_by_month[(year, month)] = bills
+    with open(os.path.join(folder, 'legislators.json'), 'w', encoding='utf-8') as f:
+        json.dump({'jsonList': LEGISLATORS}, f, ensure_ascii=False)
+    return bills_by_month
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    """以合成資料取代 app 的資料夾 (背景監看停用，月份經由新的 BillStore 按需載入)"""
+    bills_by_month = write_data_folder(str(tmp_path))
+    monkeypatch.setattr(app, 'DATA_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app, 'bill_store', app.BillStore(str(tmp_path)))
+    monkeypatch.setattr(app, '_legislators_cache', None)
+    monkeypatch.setattr(app, 'compressed_response_cache', app.CompressedResponseCache())
+    monkeypatch.setattr(app.data_watcher, 'snapshot', None)
+    return bills_by_month
+
+
+@pytest.fixture
+def client(data_folder):
+    return app.app.test_client()
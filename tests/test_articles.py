@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""條文索引：條號依數字排序 (第十條在第九條之後、第十條之一在第十條之後)"""
+import json
+import os
+from urllib.parse import quote
+
+import pytest
+
+import app
+
+LAW = '測試條例'
+
+
+@pytest.mark.parametrize('numeral, expected', [
+    ('一', 1), ('九', 9), ('十', 10), ('十一', 11), ('二十', 20), ('二十二', 22),
+    ('一百', 100), ('一百零五', 105), ('一百十', 110), ('一千零一', 1001),
+])
+def test_chinese_numeral_to_int(numeral, expected):
+    assert app.chinese_numeral_to_int(numeral) == expected
+
+
+def test_article_sort_key_order():
+    titles = ['第十條之一', '第二章', '第一百條', '第九條', '第十條', '第二十條', '第十一條', '第十條之十', '第一章', '第十條之二']
+    assert sorted(titles, key=app.article_sort_key) == [
+        '第一章', '第二章', '第九條', '第十條', '第十條之一', '第十條之二', '第十條之十', '第十一條', '第二十條', '第一百條',
+    ]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('第十條', (10, 0)), ('第十條之一', (10, 1)), ('第二十二條之十六', (22, 16)),
+    ('22-16', (22, 16)), ('22之16', (22, 16)), ('9', (9, 0)), ('第二章', None), ('abc', None),
+])
+def test_parse_article_number(text, expected):
+    assert app.parse_article_number(text) == expected
+
+
+def make_article_bill(bill_no, titles):
+    return {
+        'bill_no': bill_no,
+        'bill_name': f"{LAW}部分條文修正草案",
+        'proposers': ['王小明'],
+        'cosigners': [],
+        'progress': '1140801 一讀(委員會待審)',
+        'categories': ['政'],
+        'comparison_table': [
+            {'modified_text': f"{title}　修正條文{bill_no}。", 'current_text': '無', 'explanation': ''}
+            for title in titles
+        ],
+    }
+
+
+@pytest.fixture
+def article_month(data_folder):
+    bills = [
+        make_article_bill('202110080010000', ['第十條', '第九條']),
+        make_article_bill('202110080020000', ['第十條之一', '第二章', '第一百條']),
+        make_article_bill('202110080030000', ['第二十條', '第十條', '第十一條']),
+    ]
+    with open(os.path.join(app.DATA_FOLDER, 'ai_enriched_data_2025_08.json'), 'w', encoding='utf-8') as f:
+        json.dump(bills, f, ensure_ascii=False)
+    return bills
+
+
+def test_law_articles_are_sorted_by_number(client, article_month):
+    response = client.get(f'/api/articles/{quote(LAW)}?start=2025-08&end=2025-08')
+    assert response.status_code == 200
+    articles = response.get_json()['articles']
+    assert [item['article'] for item in articles] == [
+        '第九條', '第十條', '第十條之一', '第十一條', '第二十條', '第一百條',
+    ]
+    assert [item['number'] for item in articles] == [[9, 0], [10, 0], [10, 1], [11, 0], [20, 0], [100, 0]]
+    counts = {item['article']: item['bill_count'] for item in articles}
+    assert counts['第十條'] == 2 and counts['第十條之一'] == 1
+
+
+def test_law_article_lookup(client, article_month):
+    for article in ('第十條', '10'):
+        response = client.get(f'/api/articles/{quote(LAW)}/{quote(article)}?start=2025-08&end=2025-08')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['article'] == '第十條'
+        assert {item['bill']['bill_no'] for item in data['bills']} == {'202110080010000', '202110080030000'}
+        assert all(item['rows'][0]['modified_text'].startswith('第十條　') for item in data['bills'])
+
+    response = client.get(f'/api/articles/{quote(LAW)}/{quote("第十條之一")}?start=2025-08&end=2025-08')
+    assert [item['bill']['bill_no'] for item in response.get_json()['bills']] == ['202110080020000']
+    assert client.get(f'/api/articles/{quote(LAW)}/abc?start=2025-08&end=2025-08').status_code == 400
+    assert client.get(f'/api/articles/{quote(LAW)}/99?start=2025-08&end=2025-08').status_code == 404
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""完整法案列表的串流輸出：不論月份由 JSON、billpack 或共用資料快照載入，都與直接編碼 JSON 相同"""
+import glob
+import json
+import os
+from urllib.parse import quote
+
+import pytest
+
+import app
+import billpack
+
+
+def encode_bills(bills):
+    return json.dumps(bills, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+@pytest.fixture(params=['json', 'billpack', 'shared'])
+def source(request, data_folder, tmp_path, monkeypatch):
+    """月份資料的來源：原始 JSON、billpack (重欄位延遲載入)，或共用資料快照 (預先編碼的 JSON)"""
+    if request.param != 'json' and billpack.msgpack is None:
+        pytest.skip("需要 msgpack")
+    if request.param == 'billpack':
+        for json_path in glob.glob(os.path.join(app.DATA_FOLDER, 'ai_enriched_data_*.json')):
+            billpack.convert_json_file(json_path)
+    elif request.param == 'shared':
+        snapshot_path = str(tmp_path / 'shared.billsnap')
+        app.build_shared_snapshot(snapshot_path)
+        monkeypatch.setattr(app.data_watcher, 'snapshot', app.DataSnapshot.from_shared(billpack.open_snapshot(snapshot_path)))
+    return request.param
+
+
+def test_month_stream_matches_json(client, data_folder, source):
+    bills = data_folder[(2025, 6)]
+    for url in ('/api/bills/2025/6', '/api/bills/all/2025/6'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == encode_bills(bills)
+
+
+def test_range_stream_matches_json(client, data_folder, source):
+    months = [(2025, 5), (2025, 6), (2025, 7)]
+    expected = [bill for key in months for bill in data_folder[key]]
+    response = client.get('/api/bills/all-range?start=2025-05&end=2025-07')
+    assert response.get_data() == encode_bills(expected)
+
+    category = '政'
+    filtered = [bill for bill in expected if category in bill['categories']]
+    assert filtered
+    response = client.get('/api/bills-range?start=2025-05&end=2025-07&category=' + quote(category))
+    assert response.get_data() == encode_bills(filtered)
+    response = client.get('/api/bills/2025/6?category=' + quote(category))
+    assert response.get_data() == encode_bills([bill for bill in data_folder[(2025, 6)] if category in bill['categories']])
+
+
+def test_stream_is_chunked(client, data_folder, source, monkeypatch):
+    monkeypatch.setattr(app, 'ENCODED_CHUNK_BYTES', 1024)
+    months = [(2025, 5), (2025, 6), (2025, 7)]
+    response = client.get('/api/bills/all-range?start=2025-05&end=2025-07', buffered=False)
+    chunks = list(response.response)
+    fragments = [chunk for chunk in chunks if chunk not in (b'[', b',', b']')]
+    if source == 'shared':
+        # 快照中每個月份整段預先編碼，直接輸出
+        assert len(fragments) == len(months)
+    else:
+        assert len(fragments) > len(months)
+        # 累積超過 ENCODED_CHUNK_BYTES 就輸出，每段最多再多出一筆法案
+        largest_bill = max(len(app.encode_bill(bill)) for key in months for bill in data_folder[key])
+        assert all(len(fragment) <= 1024 + largest_bill for fragment in fragments)
+    assert b''.join(chunks) == encode_bills([bill for key in months for bill in data_folder[key]])
+
+
+def test_empty_category_stream(client, source):
+    response = client.get('/api/bills/2025/6?category=' + quote('不存在'))
+    assert response.status_code == 200
+    assert response.get_data() == b'[]'
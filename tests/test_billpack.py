@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""billpack：轉換後的法案與原始 JSON 相同，來源變動時不使用過期的 billpack"""
+import json
+import os
+
+import pytest
+
+import app
+import billpack
+from conftest import make_month_bills
+
+pytestmark = pytest.mark.skipif(billpack.msgpack is None, reason="需要 msgpack")
+
+
+@pytest.fixture
+def month_json(tmp_path):
+    bills = make_month_bills(2025, 6)
+    json_path = str(tmp_path / 'ai_enriched_data_2025_06.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(bills, f, ensure_ascii=False)
+    return json_path, bills
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def test_round_trip_matches_json(month_json):
+    json_path, bills = month_json
+    billpack.convert_json_file(json_path)
+    reader = billpack.load_bill_pack(json_path, file_signature(json_path))
+    assert reader is not None
+    assert len(reader.bills) == len(bills)
+    for lazy_bill, bill in zip(reader.bills, bills):
+        assert lazy_bill.to_dict() == bill
+        # 欄位順序與原始 JSON 相同，JSON 輸出才會一致
+        assert list(lazy_bill) == list(bill)
+        assert all(field in lazy_bill for field in billpack.HEAVY_FIELDS)
+        assert lazy_bill.get('missing') is None
+
+
+def test_stale_pack_is_ignored(month_json):
+    json_path, bills = month_json
+    billpack.convert_json_file(json_path)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(bills[:5], f, ensure_ascii=False)
+    assert billpack.load_bill_pack(json_path, file_signature(json_path)) is None
+
+    month_data = app.load_month_file(2025, 6, json_path, file_signature(json_path))
+    assert month_data.bills == bills[:5]
+
+
+def test_load_month_file_uses_pack(month_json):
+    json_path, bills = month_json
+    billpack.convert_json_file(json_path)
+    month_data = app.load_month_file(2025, 6, json_path, file_signature(json_path))
+    assert isinstance(month_data.bills[0], billpack.LazyBill)
+    assert [bill.to_dict() for bill in month_data.bills] == bills
+
+
+def test_packed_postings_match_dict():
+    postings = {'法案': [0, 3, 7], '法律': [2], '安全': [1, 3], '安': [5], 'z': [4, 6]}
+    packed = billpack.PackedPostings(billpack.pack_postings(postings))
+    assert len(packed) == len(postings)
+    for gram, positions in postings.items():
+        assert packed.get(gram) == positions
+    assert packed.get('不存在') is None
+    assert packed.get_prefix('法') == {0, 2, 3, 7}
+    assert packed.get_prefix('安') == {1, 3, 5}
+    assert packed.get_prefix('無') == set()
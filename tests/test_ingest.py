@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""匯入工具：格式錯誤的月份不寫入任何檔案，未變動的月份略過，附屬索引與 app 重建的結果相同"""
+import json
+import os
+
+import pytest
+
+import app
+import ingest
+
+
+@pytest.fixture
+def month_path(data_folder):
+    return os.path.join(app.DATA_FOLDER, 'ai_enriched_data_2025_06.json')
+
+
+def ingest_once(path, capsys, **options):
+    ok = ingest.ingest_month(path, ingest.LegislatorsSource(os.path.dirname(path)), **options)
+    return ok, capsys.readouterr().out
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_validate_bills_reports_errors(data_folder):
+    bills = [dict(bill) for bill in data_folder[(2025, 6)][:4]]
+    assert ingest.validate_bills(bills) == []
+    del bills[0]['progress']
+    bills[1]['proposers'] = '王小明'
+    bills[2]['categories'] = ['政', 3]
+    bills[3]['bill_no'] = bills[1]['bill_no']
+    errors = ingest.validate_bills(bills)
+    assert len(errors) == 4
+    assert '缺少欄位 progress' in errors[0]
+    assert '欄位 proposers 應為陣列' in errors[1]
+    assert '欄位 categories 的元素應為字串' in errors[2]
+    assert 'bill_no 重複' in errors[3]
+    assert ingest.validate_bills({'bills': []}) == ['檔案內容應為法案物件的陣列']
+
+
+def test_invalid_month_is_rejected_without_writing(month_path, capsys):
+    with open(month_path, encoding='utf-8') as f:
+        bills = json.load(f)
+    bills[5]['cosigners'] = None
+    with open(month_path, 'w', encoding='utf-8') as f:
+        json.dump(bills, f, ensure_ascii=False)
+    before = read_bytes(month_path)
+
+    ok, out = ingest_once(month_path, capsys)
+    assert not ok
+    assert '驗證失敗' in out and '第 6 筆' in out
+    assert read_bytes(month_path) == before
+    assert not os.path.exists(app.sidecar_path_for(month_path))
+
+
+def test_normalizes_and_writes_sidecar(month_path, capsys):
+    with open(month_path, encoding='utf-8') as f:
+        bills = json.load(f)
+    bills[0]['categories'] = ['國防', '罰 (刑罰、處罰)', '不存在的分類']
+    bills[0]['proposers'] = ['李　華']
+    with open(month_path, 'w', encoding='utf-8') as f:
+        json.dump(bills, f, ensure_ascii=False)
+
+    ok, out = ingest_once(month_path, capsys)
+    assert ok and '已寫回來源檔案' in out
+    with open(month_path, encoding='utf-8') as f:
+        normalized = json.load(f)
+    assert normalized[0]['categories'] == ['防', '罰', '其他']
+    assert normalized[0]['proposers'] == ['李華']
+
+    # app 載入月份時直接使用附屬索引，結果與重新建立的索引相同
+    month_data = app.bill_store.get_month(2025, 6)
+    assert 'aggregates' in month_data.derived
+    rebuilt = app.MonthData(2025, 6, normalized, *month_data.signature)
+    assert month_data.derive('aggregates', app.build_month_aggregates) == app.build_month_aggregates(rebuilt)
+    assert month_data.derive('progress_index', app.build_progress_index) == app.build_progress_index(rebuilt)
+
+
+def test_unchanged_month_is_skipped(month_path, capsys):
+    ok, out = ingest_once(month_path, capsys)
+    assert ok and '已處理' in out
+    sidecar_path = app.sidecar_path_for(month_path)
+    sidecar = read_bytes(sidecar_path)
+
+    ok, out = ingest_once(month_path, capsys)
+    assert ok and '未變動，略過' in out
+    assert read_bytes(sidecar_path) == sidecar
+
+    # 只有簽章改變 (內容相同) 時只更新簽章，不重建索引
+    stat = os.stat(month_path)
+    os.utime(month_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ok, out = ingest_once(month_path, capsys)
+    assert ok and '更新附屬索引的檔案簽章' in out
+    ok, out = ingest_once(month_path, capsys)
+    assert ok and '未變動，略過' in out
+
+    ok, out = ingest_once(month_path, capsys, force=True)
+    assert ok and '已處理' in out
+
+
+def test_check_mode_does_not_write(month_path, capsys):
+    before = read_bytes(month_path)
+    ok, out = ingest_once(month_path, capsys, check=True)
+    assert ok and '驗證通過' in out
+    assert read_bytes(month_path) == before
+    assert not os.path.exists(app.sidecar_path_for(month_path))
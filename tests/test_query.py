@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""多面向查詢：位元集合算出的結果與各面向數量，與逐筆比對法案的結果相同"""
+from urllib.parse import urlencode
+
+import pytest
+
+import app
+from conftest import LEGISLATORS
+
+pytest.importorskip('numpy')
+
+NAME_TO_PARTY = {app.normalize_legislator_name(item['name']): item['party'] for item in LEGISLATORS}
+OFFICIAL_NAMES = {app.normalize_legislator_name(item['name']): item['name'] for item in LEGISLATORS}
+
+
+def bill_facet_values(bill):
+    participants = {
+        app.normalize_legislator_name(name) for name in bill['proposers'] + bill['cosigners']
+    }
+    return {
+        'category': set(bill['categories']),
+        'party': set(app.party_labels_for_mask(app.compute_party_mask(bill, NAME_TO_PARTY))),
+        'stage': {app.classify_progress_stage(bill['progress'])},
+        'legislator': participants,
+    }
+
+
+def brute_force_query(bills_by_month, months, selected):
+    """逐筆比對：同一面向內為 OR，不同面向間為 AND；各面向的數量只套用其他面向的篩選"""
+    bill_nos = []
+    facet_counts = {facet: {} for facet in app.QUERY_FACETS}
+    month_counts = {}
+    for key in months:
+        matched_in_month = 0
+        for bill in bills_by_month[key]:
+            values = bill_facet_values(bill)
+            matches = {facet: bool(values[facet] & set(wanted)) for facet, wanted in selected.items()}
+            if all(matches.values()):
+                bill_nos.append(bill['bill_no'])
+                matched_in_month += 1
+            for facet in app.QUERY_FACETS:
+                if all(matched for other, matched in matches.items() if other != facet):
+                    for value in values[facet]:
+                        facet_counts[facet][value] = facet_counts[facet].get(value, 0) + 1
+        month_counts[f"{key[0]}-{key[1]:02d}"] = matched_in_month
+    return bill_nos, facet_counts, month_counts
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'category': '政'},
+    {'category': '政,商', 'stage': '三讀'},
+    {'party': '民主進步黨'},
+    {'party': '中國國民黨+民主進步黨,無黨籍', 'category': '科,罰,防'},
+    {'legislator': '李華'},
+    {'legislator': '李　華,王小明', 'stage': '一讀,委員會審議'},
+    {'category': '不存在'},
+    {'start': '2025-05', 'end': '2025-06', 'category': '工', 'party': '台灣民眾黨'},
+])
+def test_query_matches_brute_force(client, data_folder, params):
+    response = client.get('/api/query?' + urlencode(params))
+    assert response.status_code == 200
+    data = response.get_json()
+
+    if 'start' in params:
+        months = [(2025, 5), (2025, 6)]
+    else:
+        months = sorted(data_folder, reverse=True)
+    assert data['months'] == [f"{year}-{month:02d}" for year, month in months]
+    selected = {
+        facet: [app.normalize_legislator_name(value) if facet == 'legislator' else value
+                for value in params[facet].split(',')]
+        for facet in app.QUERY_FACETS if facet in params
+    }
+    bill_nos, facet_counts, month_counts = brute_force_query(data_folder, months, selected)
+
+    assert data['total'] == len(bill_nos)
+    assert data['bill_nos'] == bill_nos
+    facets = data['facets']
+    assert facets['month'] == month_counts
+    assert {key: count for key, count in facets['category'].items() if count} == facet_counts['category']
+    assert set(facets['category']) >= set(app.CATEGORY_DEFINITIONS)
+    assert facets['party'] == {label: facet_counts['party'].get(label, 0) for label in app.PARTY_COMBINATIONS}
+    assert facets['stage'] == {stage: facet_counts['stage'].get(stage, 0) for stage in app.PROGRESS_STAGES}
+    assert {item['name']: item['count'] for item in facets['legislator']} == {
+        OFFICIAL_NAMES[name]: count for name, count in facet_counts['legislator'].items()
+    }
+    counts = [item['count'] for item in facets['legislator']]
+    assert counts == sorted(counts, reverse=True)
+
+
+@pytest.mark.parametrize('query', [
+    'stage=四讀', 'party=國民黨', 'start=2025-05', 'end=2025-06', 'start=2025-13&end=2025-06',
+])
+def test_query_rejects_invalid_parameters(client, query):
+    assert client.get('/api/query?' + query).status_code == 400
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""全文檢索：倒排索引的結果與逐筆比對完整字串相同 (含單一字元與跨 bigram 的片語)"""
+from urllib.parse import quote
+
+import pytest
+
+import app
+
+
+def brute_force_search(bills, normalized_query, scope=None):
+    results = []
+    for position, bill in enumerate(bills):
+        score = 0
+        matched_fields = []
+        for field, text in app.get_bill_search_fields(bill).items():
+            if scope is not None and field not in scope:
+                continue
+            occurrences = app.normalize_search_text(text).count(normalized_query)
+            if occurrences:
+                score += app.SEARCH_FIELD_WEIGHTS[field] * occurrences
+                matched_fields.append(field)
+        if score:
+            results.append((position, score, matched_fields))
+    return results
+
+
+@pytest.mark.parametrize('query', [
+    '安全', '國家安全法', '條文修正草案', '王小明', '李華', '李　華', '第十一條', '修正分析',
+    '法', '十', '明', '。', '無', 'zz', '法第十', '安全法第九條條文',
+])
+def test_search_month_matches_brute_force(data_folder, query):
+    normalized = app.normalize_search_text(query)
+    for key, bills in data_folder.items():
+        month_data = app.bill_store.get_month(*key)
+        assert app.search_month(month_data, normalized) == brute_force_search(bills, normalized)
+
+
+def test_phrase_requires_contiguous_match():
+    # 「甲乙」與「乙丙」的 bigram 都在索引中，但沒有任何欄位包含完整的「甲乙丙」
+    bills = [
+        {'bill_no': '1', 'bill_name': '甲乙', 'reason': '乙丙', 'proposers': [], 'cosigners': []},
+        {'bill_no': '2', 'bill_name': '甲乙丙', 'reason': '', 'proposers': [], 'cosigners': []},
+        {'bill_no': '3', 'bill_name': '丙', 'reason': '甲', 'proposers': [], 'cosigners': []},
+    ]
+    month_data = app.MonthData(2025, 1, bills, 0, 0)
+    assert [position for position, _, _ in app.search_month(month_data, '甲乙丙')] == [1]
+    # 單一字元：出現在欄位結尾的字元也能找到
+    assert [position for position, _, _ in app.search_month(month_data, '丙')] == [0, 1, 2]
+    assert [position for position, _, _ in app.search_month(month_data, '甲')] == [0, 1, 2]
+
+
+def test_scope_limits_fields(data_folder):
+    scope = {'bill_name', 'reason'}
+    for key, bills in data_folder.items():
+        month_data = app.bill_store.get_month(*key)
+        for query in ('王小明', '安全', '法'):
+            assert app.search_month(month_data, query, scope) == brute_force_search(bills, query, scope)
+    month_data = app.bill_store.get_month(2025, 6)
+    assert app.search_month(month_data, '王小明', scope) == []
+
+
+def test_search_api_pagination(client, data_folder):
+    response = client.get('/api/search?q=' + quote('法') + '&start=2025-05&end=2025-07&page_size=7')
+    assert response.status_code == 200
+    first = response.get_json()
+    expected_total = sum(len(brute_force_search(bills, '法')) for bills in data_folder.values())
+    assert first['total'] == expected_total
+    pages = [first['results']]
+    for page in range(2, -(-expected_total // 7) + 1):
+        url = '/api/search?q=' + quote('法') + f'&start=2025-05&end=2025-07&page_size=7&page={page}'
+        pages.append(client.get(url).get_json()['results'])
+    results = [result for page in pages for result in page]
+    assert len({result['bill_no'] for result in results}) == expected_total
+    keys = [(result['score'], result['bill_no']) for result in results]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_search_api_rejects_bad_parameters(client):
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=' + quote('法') + '&scope=title').status_code == 400
+    assert client.get('/api/search?q=' + quote('法') + '&page=x').status_code == 400
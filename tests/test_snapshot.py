@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""共用資料快照：由快照提供的法案、索引與 API 回應，與直接讀取資料夾時相同"""
+from urllib.parse import quote
+
+import pytest
+
+import app
+import billpack
+
+pytestmark = pytest.mark.skipif(billpack.msgpack is None, reason="需要 msgpack")
+
+
+@pytest.fixture
+def shared_snapshot(data_folder, tmp_path):
+    snapshot_path = str(tmp_path / 'shared.billsnap')
+    assert app.build_shared_snapshot(snapshot_path) == len(data_folder)
+    reader = billpack.open_snapshot(snapshot_path)
+    assert reader is not None
+    return app.DataSnapshot.from_shared(reader)
+
+
+def test_snapshot_bills_round_trip(data_folder, shared_snapshot):
+    assert shared_snapshot.months == tuple(sorted(data_folder, reverse=True))
+    for key, bills in data_folder.items():
+        month_data = shared_snapshot.entries[key]
+        assert len(month_data.bills) == len(bills)
+        assert [bill.to_dict() for bill in month_data.bills] == bills
+        assert month_data.bills[-1].to_dict() == bills[-1]
+        assert [bill['bill_no'] for bill in month_data.bills[2:4]] == [bill['bill_no'] for bill in bills[2:4]]
+    assert shared_snapshot.legislators.name_to_party == {
+        legislator['name']: legislator['party'] for legislator in app.get_legislators().data['jsonList']
+    }
+
+
+def test_shared_indexes_match_rebuilt_indexes(data_folder, shared_snapshot):
+    legislators = app.get_legislators()
+    for key in data_folder:
+        shared = shared_snapshot.entries[key]
+        local = app.bill_store.get_month(*key)
+        assert shared.derive('aggregates', app.build_month_aggregates) == \
+            local.derive('aggregates', app.build_month_aggregates)
+        assert shared.derive('bill_no_index', app.build_bill_no_index) == \
+            local.derive('bill_no_index', app.build_bill_no_index)
+        assert app.get_party_index(shared, legislators) == app.get_party_index(local, legislators)
+        # 快照中的索引直接由 mmap 讀取，不必重建
+        assert 'search_index' in shared.shared_indexes
+
+
+def test_api_responses_match_local_mode(data_folder, shared_snapshot, monkeypatch):
+    bills = data_folder[(2025, 7)]
+    bill_no = bills[3]['bill_no']
+    urls = [
+        '/api/bills/2025/7',
+        '/api/bills/2025/7?fields=card&limit=10',
+        '/api/bills/all-range?start=2025-05&end=2025-07',
+        '/api/bills/summary-range?start=2025-05&end=2025-07',
+        '/api/search?q=' + quote('安全'),
+        '/api/search?q=' + quote('法'),
+        '/api/bill/' + bill_no,
+        '/api/party-stats',
+        '/api/progress/summary',
+        '/api/query?category=' + quote('政,商'),
+        '/api/venn-data?start=2025-05&end=2025-07',
+        '/api/batch?r=%2Fapi%2Fcategories&r=%2Fapi%2Favailable-months',
+    ]
+    client = app.app.test_client()
+    local = {url: (response.status_code, response.get_data()) for url in urls for response in [client.get(url)]}
+
+    monkeypatch.setattr(app.data_watcher, 'snapshot', shared_snapshot)
+    for url in urls:
+        response = client.get(url)
+        assert (response.status_code, response.get_data()) == local[url], url
+        assert response.status_code == 200, url
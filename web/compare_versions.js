@@ -2,7 +2,6 @@
 
 document.addEventListener('DOMContentLoaded', () => {
     // --- 全域變數 ---
-    let allBillsData = [];
     let legislatorPartyMap = new Map();
 
     // --- DOM 元素 ---
@@ -21,15 +20,11 @@ document.addEventListener('DOMContentLoaded', () => {
     async function initializePage() {
         showLoading('正在載入核心資料...');
         try {
-            const [legResponse, billsResponse] = await Promise.all([
-                fetch('/api/legislators.json'),
-                fetch('/api/bills/all-range')
-            ]);
+            // 法案搜尋與版本分組改由伺服器端 /api/search、/api/compare 處理，啟動時只需立委資料
+            const legResponse = await fetch('/api/legislators.json');
             if (!legResponse.ok) throw new Error('無法載入立委資料');
             const legislatorData = await legResponse.json();
             legislatorData.jsonList.forEach(leg => legislatorPartyMap.set(normalizeName(leg.name), leg.party));
-            if (!billsResponse.ok) throw new Error('無法載入法案資料');
-            allBillsData = await billsResponse.json();
             showSearchPrompt();
         } catch (error) {
             console.error('初始化失敗:', error);
@@ -49,14 +44,21 @@ document.addEventListener('DOMContentLoaded', () => {
         resultsPanel.style.display = 'none';
         comparisonInterface.style.display = 'none';
     }
-    function performSearch() {
-        const query = searchInput.value.toLowerCase().trim();
+    async function performSearch() {
+        const query = searchInput.value.trim();
         if (!query) return;
-        const filteredBills = allBillsData.filter(bill => {
-            const billTitle = getBillTitle(bill).toLowerCase();
-            const reason = (bill.reason || '').toLowerCase();
-            return billTitle.includes(query) || reason.includes(query);
-        });
+        showLoading('搜尋中...');
+        let filteredBills = [];
+        try {
+            // 與原本的前端篩選相同，只比對法案標題與提案理由
+            const response = await fetch(`/api/search?q=${encodeURIComponent(query)}&scope=bill_name,reason&page_size=100`);
+            if (!response.ok) throw new Error('搜尋失敗');
+            filteredBills = (await response.json()).results;
+        } catch (error) {
+            console.error('搜尋時發生錯誤:', error);
+            showError('搜尋時發生錯誤，請稍後再試。');
+            return;
+        }
         resultsPanel.style.display = 'block';
         comparisonInterface.style.display = 'none';
         resultsTitle.textContent = `搜尋 "${searchInput.value}" 的結果 (${filteredBills.length} 筆)`;
@@ -74,64 +76,27 @@ document.addEventListener('DOMContentLoaded', () => {
             setTimeout(() => card.classList.add('slide-in'), 50 + (index * 50));
         });
     }
-    function selectBaseBill(baseBill) {
+    async function selectBaseBill(baseBill) {
         resultsPanel.style.display = 'none';
         comparisonInterface.style.display = 'block';
         versionContainer.innerHTML = '<p class="loading-text">正在分析同名法案...</p>';
         contentBody.innerHTML = '<p class="loading-text">請從左側選擇一個或多個版本進行查看</p>';
-        const baseTitle = normalizeBillTitle(baseBill);
-        const sameNameBills = allBillsData.filter(bill => normalizeBillTitle(bill) === baseTitle);
-        const billsByProposer = groupBillsByProposer(sameNameBills);
-        const finalVersions = getLatestVersionPerProposer(billsByProposer);
-        renderVersionList(finalVersions, baseTitle);
-    }
-    function groupBillsByProposer(bills) {
-        const proposerGroups = { '行政院': [], '司法院': [], '中國國民黨': [], '民主進步黨': [], '台灣民眾黨': [] };
-        bills.forEach(bill => {
-            const proposers = bill.proposers || [];
-            if (proposers.length === 0) return;
-            let mainProposer = null;
-            const firstProposer = proposers[0].trim();
-            if (proposerGroups.hasOwnProperty(firstProposer)) {
-                mainProposer = firstProposer;
-            } else {
-                for (const proposer of proposers) {
-                    const party = legislatorPartyMap.get(normalizeName(proposer));
-                    if (party && party !== '無黨籍') {
-                        mainProposer = party;
-                        break;
-                    }
-                }
-            }
-            if (mainProposer && proposerGroups[mainProposer]) {
-                proposerGroups[mainProposer].push(bill);
-            }
-        });
-        return proposerGroups;
-    }
-    function getLatestVersionPerProposer(proposerGroups) {
-        const latestVersions = {};
-        for (const proposer in proposerGroups) {
-            const bills = proposerGroups[proposer];
-            if (bills.length > 0) {
-                bills.sort((a, b) => {
-                    const dateA = a.source_file.split('_')[0];
-                    const dateB = b.source_file.split('_')[0];
-                    if (dateA !== dateB) return dateB.localeCompare(dateA);
-                    const billNoA = parseInt(a.bill_no, 10) || 0;
-                    const billNoB = parseInt(b.bill_no, 10) || 0;
-                    return billNoB - billNoA;
-                });
-                latestVersions[proposer] = bills[0];
-            }
+        try {
+            // 伺服器端依正規化標題分組，只回傳各提案來源的最新版本
+            const response = await fetch(`/api/compare?bill_no=${encodeURIComponent(baseBill.bill_no)}`);
+            if (!response.ok) throw new Error('無法載入同名法案');
+            const comparison = await response.json();
+            renderVersionList(comparison.versions, comparison.order, comparison.title);
+        } catch (error) {
+            console.error('載入同名法案時發生錯誤:', error);
+            versionContainer.innerHTML = '<p class="error-text">載入同名法案時發生錯誤。</p>';
         }
-        return latestVersions;
     }
-    function renderVersionList(versions, baseTitle) {
+    function renderVersionList(versions, order, baseTitle) {
         versionContainer.innerHTML = '';
         contentTitle.textContent = `比較｜${baseTitle}`;
-        const displayOrder = ['行政院', '司法院', '民主進步黨', '中國國民黨', '台灣民眾黨'];
-        displayOrder.forEach(proposer => {
+        // 顯示順序由伺服器 (/api/compare 的 order) 決定
+        order.forEach(proposer => {
             if (versions[proposer]) {
                 const bill = versions[proposer];
                 const item = document.createElement('div');
@@ -178,115 +143,84 @@ document.addEventListener('DOMContentLoaded', () => {
         contentBody.innerHTML = html;
     }
 
-    function displayComparisonTable(bills) {
-        const billArticleMaps = bills.map(bill => {
-            const map = new Map();
-            (bill.comparison_table || []).forEach(article => {
-                const title = extractArticleTitle(article.modified_text) || extractArticleTitle(article.current_text);
-                if (title) map.set(title, article);
-            });
-            return map;
-        });
-        const allTitles = new Set();
-        billArticleMaps.forEach(map => map.forEach((_, title) => allTitles.add(title)));
-        if (allTitles.size === 0) {
+    async function displayComparisonTable(bills) {
+        contentBody.innerHTML = '<p class="loading-text">正在比較條文差異...</p>';
+        let articles;
+        try {
+            // 條文對齊與逐字差異由伺服器端 /api/diff 計算並快取
+            const billNos = bills.map(bill => encodeURIComponent(bill.bill_no)).join(',');
+            const response = await fetch(`/api/diff?bills=${billNos}`);
+            if (!response.ok) throw new Error('無法載入條文差異');
+            articles = (await response.json()).articles;
+        } catch (error) {
+            console.error('載入條文差異時發生錯誤:', error);
+            contentBody.innerHTML = '<p class="error-text">載入條文差異時發生錯誤。</p>';
+            return;
+        }
+        if (articles.length === 0) {
             contentBody.innerHTML = '<p class="error-text">選定的版本中沒有可供比較的條文內容。</p>';
             return;
         }
-        const sortedTitles = sortArticleTitles(Array.from(allTitles));
         
         let accordionHTML = '<div class="comparison-accordion-container">';
-        sortedTitles.forEach(title => {
+        articles.forEach(article => {
             let tableContentHTML;
             if (window.matchMedia('(max-width: 768px)').matches) {
-                tableContentHTML = createMobileComparisonTable(bills, title, billArticleMaps);
+                tableContentHTML = createMobileComparisonTable(bills, article);
             } else {
-                tableContentHTML = createDesktopComparisonTable(bills, title, billArticleMaps);
+                tableContentHTML = createDesktopComparisonTable(bills, article);
             }
             
-            const hasDiff = tableContentHTML.includes('class="diff-added"');
-            const headerClass = `accordion-header ${hasDiff ? 'has-difference' : ''}`;
+            const headerClass = `accordion-header ${article.has_difference ? 'has-difference' : ''}`;
 
-            accordionHTML += `<div class="accordion-item"><button class="${headerClass}">${title}</button><div class="accordion-panel"><div class="accordion-content">${tableContentHTML}</div></div></div>`;
+            accordionHTML += `<div class="accordion-item"><button class="${headerClass}">${article.title}</button><div class="accordion-panel"><div class="accordion-content">${tableContentHTML}</div></div></div>`;
         });
         accordionHTML += '</div>';
         contentBody.innerHTML = accordionHTML;
         setupComparisonAccordion();
     }
 
-    function createDesktopComparisonTable(bills, articleTitle, billArticleMaps) {
+    function getVersionHeaderTitle(bill) {
+        const proposerName = (bill.proposers && bill.proposers.length > 0) ? bill.proposers[0] : '';
+        return ['行政院', '司法院'].includes(proposerName) ? proposerName : (legislatorPartyMap.get(normalizeName(proposerName)) || '未知黨派');
+    }
+
+    function createDesktopComparisonTable(bills, article) {
         let tableHTML = '<table class="comparison-view-table">';
         tableHTML += '<thead><tr><th>項目</th><th>現行版本</th>';
         bills.forEach(bill => {
-            const proposerName = (bill.proposers && bill.proposers.length > 0) ? bill.proposers[0] : '';
-            const headerTitle = ['行政院', '司法院'].includes(proposerName) ? proposerName : (legislatorPartyMap.get(normalizeName(proposerName)) || '未知黨派');
-            tableHTML += `<th>${headerTitle} 版本</th>`;
+            tableHTML += `<th>${getVersionHeaderTitle(bill)} 版本</th>`;
         });
         tableHTML += '</tr></thead><tbody>';
-        const currentTextArticle = bills.map((b, i) => billArticleMaps[i].get(articleTitle)).find(art => art?.current_text);
-        const currentText = currentTextArticle ? currentTextArticle.current_text : '無';
-        const firstBillArticle = billArticleMaps[0].get(articleTitle);
-        const firstBillText = firstBillArticle ? (firstBillArticle.modified_text || '') : '';
+        const currentText = article.current_text || '無';
         tableHTML += `<tr><td><strong>條文內容</strong></td><td>${String(currentText).replace(/\n/g, '<br>')}</td>`;
-        bills.forEach((bill, index) => {
-            const article = billArticleMaps[index].get(articleTitle);
-            const proposedText = article ? (article.modified_text || '') : '此版本無相關條文';
-            const diffHTML = currentText !== '無' ? generateDiffHTML(currentText, proposedText) : generateDiffHTML(firstBillText, proposedText);
-            tableHTML += `<td>${diffHTML}</td>`;
+        article.versions.forEach(version => {
+            tableHTML += `<td>${renderDiffHunks(version.text_diff)}</td>`;
         });
         tableHTML += '</tr>';
 
-        // --- 【修改】說明欄位鏈式比對 ---
+        // --- 說明欄位鏈式比對 (第一個版本直接顯示，後續版本與前一個版本比對) ---
         tableHTML += '<tr><td><strong>說明</strong></td><td>--</td>';
-        bills.forEach((bill, index) => {
-            const currentArticle = billArticleMaps[index].get(articleTitle);
-            const currentExplanation = currentArticle ? (currentArticle.explanation || '無') : '--';
-            
-            let diffExplanationHTML;
-            if (index === 0) {
-                // 第一個版本直接顯示，不做比對
-                diffExplanationHTML = String(currentExplanation).replace(/\n/g, '<br>');
-            } else {
-                // 後續版本與前一個版本進行比對
-                const previousArticle = billArticleMaps[index - 1].get(articleTitle);
-                const previousExplanation = previousArticle ? (previousArticle.explanation || '') : '';
-                diffExplanationHTML = generateDiffHTML(previousExplanation, currentExplanation);
-            }
-            tableHTML += `<td>${diffExplanationHTML}</td>`;
+        article.versions.forEach(version => {
+            tableHTML += `<td>${renderDiffHunks(version.explanation_diff)}</td>`;
         });
         tableHTML += '</tr></tbody></table>';
         return tableHTML;
     }
 
-    function createMobileComparisonTable(bills, articleTitle, billArticleMaps) {
+    function createMobileComparisonTable(bills, article) {
         let tableHTML = '<table class="comparison-view-table">';
         tableHTML += '<thead><tr><th>提案版本</th><th>條文內容</th><th>說明</th></tr></thead>';
         tableHTML += '<tbody>';
         
-        const currentTextArticle = bills.map((b, i) => billArticleMaps[i].get(articleTitle)).find(art => art?.current_text);
-        const currentText = currentTextArticle ? currentTextArticle.current_text : '無';
+        const currentText = article.current_text || '無';
         tableHTML += `<tr><td><strong>現行版本</strong></td><td>${String(currentText).replace(/\n/g, '<br>')}</td><td>--</td></tr>`;
 
         bills.forEach((bill, index) => {
-            const proposerName = (bill.proposers && bill.proposers.length > 0) ? bill.proposers[0] : '';
-            const headerTitle = ['行政院', '司法院'].includes(proposerName) ? proposerName : (legislatorPartyMap.get(normalizeName(proposerName)) || '未知黨派');
-            const article = billArticleMaps[index].get(articleTitle);
-            const proposedText = article ? (article.modified_text || '') : '此版本無相關條文';
-            
-            const diffContentHTML = generateDiffHTML(currentText, proposedText);
-            
-            // --- 【修改】說明欄位鏈式比對 ---
-            const currentExplanation = article ? (article.explanation || '無') : '--';
-            let diffExplanationHTML;
-            if (index === 0) {
-                diffExplanationHTML = String(currentExplanation).replace(/\n/g, '<br>');
-            } else {
-                const previousArticle = billArticleMaps[index - 1].get(articleTitle);
-                const previousExplanation = previousArticle ? (previousArticle.explanation || '') : '';
-                diffExplanationHTML = generateDiffHTML(previousExplanation, currentExplanation);
-            }
-
-            tableHTML += `<tr><td><strong>${headerTitle} 版本</strong></td><td>${diffContentHTML}</td><td>${diffExplanationHTML}</td></tr>`;
+            const version = article.versions[index];
+            // 手機版沒有現行條文時直接顯示條文內容，不與第一個版本比對
+            const textHTML = article.current_text ? renderDiffHunks(version.text_diff) : renderHunksText(version.text_diff);
+            tableHTML += `<tr><td><strong>${getVersionHeaderTitle(bill)} 版本</strong></td><td>${textHTML}</td><td>${renderDiffHunks(version.explanation_diff)}</td></tr>`;
         });
         tableHTML += '</tbody></table>';
         return tableHTML;
@@ -317,86 +251,30 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
-    // --- 核心輔助函式 (此區塊無變更) ---
-    function generateDiffHTML(baseText, newText) {
-        try {
-            if (baseText === newText || !newText) return String(newText || '').replace(/\n/g, '<br>');
-            if (!baseText || baseText === '無') return String(newText).replace(/\n/g, '<br>');
-            if (typeof Diff === 'undefined' || !Diff.diffChars) {
-                console.error('jsdiff (Diff.diffChars) not loaded!');
-                return String(newText).replace(/\n/g, '<br>');
-            }
-            const diff = Diff.diffChars(baseText, newText);
-            let result = '';
-            diff.forEach(part => {
-                if (part.added) {
-                    result += `<span class="diff-added">${part.value.replace(/\n/g, '<br>')}</span>`;
-                } else if (!part.removed) {
-                    result += part.value.replace(/\n/g, '<br>');
-                }
-            });
-            return result;
-        } catch (error) {
-            console.error("Error in generateDiffHTML:", error);
-            return String(newText || '').replace(/\n/g, '<br>');
-        }
+    // --- 核心輔助函式 ---
+    function renderDiffHunks(hunks) {
+        // hunks 為伺服器回傳的 [op, text]：'=' 相同、'+' 新增、'-' 刪除 (刪除部分不顯示)
+        return hunks.map(([op, text]) => {
+            const html = String(text).replace(/\n/g, '<br>');
+            if (op === '+') return `<span class="diff-added">${html}</span>`;
+            return op === '=' ? html : '';
+        }).join('');
+    }
+    function renderHunksText(hunks) {
+        // 只還原新版本的文字 (相同 + 新增部分)，不標示差異
+        return hunks.filter(([op]) => op !== '-').map(([, text]) => String(text).replace(/\n/g, '<br>')).join('');
     }
     function getBillTitle(bill) {
         return (bill && bill.source_file) ? bill.source_file.split('_').slice(2).join('_').replace('.docx', '') : '未知法案';
     }
-    function normalizeBillTitle(bill) {
-        const title = getBillTitle(bill);
-        return title.replace(/修正|增訂|廢止|制定|部分條文|草案/g, '').trim();
-    }
     function normalizeName(name) {
         return name ? name.replace(/[\s‧.-]/g, '') : '';
     }
     function extractArticleTitle(text) {
         if (!text) return null;
-        const match = text.match(/^(第[一二三四五六七八九十百零]+(章|條(之[一二三四五六七八九十百零]+)?))/);
+        const match = text.match(/^(第[一二三四五六七八九十百千零]+(章|條(之[一二三四五六七八九十百千零]+)?))/);
         return match ? match[0] : null;
     }
-    function chineseToArabic(chineseNum) {
-        const map = { '零': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9 };
-        const unitMap = { '十': 10, '百': 100, '千': 1000, '萬': 10000 };
-        let result = 0;
-        let section = 0;
-        let number = 0;
-        for (const char of chineseNum) {
-            if (map.hasOwnProperty(char)) {
-                number = map[char];
-            } else {
-                const unit = unitMap[char];
-                if (unit === 10 && number === 0) number = 1;
-                section += number * unit;
-                number = 0;
-                if (unit >= 10000) {
-                    result += section;
-                    section = 0;
-                }
-            }
-        }
-        result += section + number;
-        return result;
-    }
-    function sortArticleTitles(titles) {
-        return titles.sort((a, b) => {
-            const parseTitle = (title) => {
-                const mainMatch = title.match(/第([一二三四五六七八九十百零]+)(章|條)/);
-                const subMatch = title.match(/之([一二三四五六七八九十百零]+)/);
-                return {
-                    mainNum: mainMatch ? chineseToArabic(mainMatch[1]) : 0,
-                    subNum: subMatch ? chineseToArabic(subMatch[1]) : 0,
-                    isChapter: title.includes('章')
-                };
-            };
-            const parsedA = parseTitle(a);
-            const parsedB = parseTitle(b);
-            if (parsedA.isChapter !== parsedB.isChapter) return parsedB.isChapter - parsedA.isChapter;
-            if (parsedA.mainNum !== parsedB.mainNum) return parsedA.mainNum - parsedB.mainNum;
-            return parsedA.subNum - parsedB.subNum;
-        });
-    }
     function clearAll() {
         searchInput.value = '';
         resultsPanel.style.display = 'none';
@@ -20,8 +20,7 @@ function convertCustomMarkdownToHTML(text) {
 document.addEventListener('DOMContentLoaded', () => {
     // --- 全域變數 ---
     let categoryDefinitions = {};
-    let allBillsData = []; // 儲存所有法案資料
-    let filteredBillsData = []; // 當前篩選後的法案資料
+    let filteredBillsData = []; // 當前篩選後的法案資料 (只含卡片欄位)
     let currentProgressFilter = ''; // 當前選擇的進度
     let currentCategoryFilter = ''; // 當前選擇的種類
     let legislatorPartyMap = new Map();
@@ -51,49 +50,31 @@ document.addEventListener('DOMContentLoaded', () => {
     // 進度統計卡片
     const progressStatCards = document.querySelectorAll('.progress-stat-card');
 
-    // --- 進度分類函式 ---
-    function classifyProgress(progressText) {
-        if (!progressText) return '其他';
-        
-        const text = progressText.toLowerCase();
-        
-        if (text.includes('一讀')) {
-            return '一讀';
-        } else if (text.includes('委員會審議')) {
-            return '委員會審議';
-        } else if (text.includes('二讀')) {
-            return '二讀';
-        } else if (text.includes('三讀')) {
-            return '三讀';
-        } else {
-            return '其他';
-        }
-    }
-
     // --- 初始化函式 ---
     async function initializePage() {
         try {
-            // 載入分類定義
-            const categoriesResponse = await fetch('/api/categories');
-            if (categoriesResponse.ok) {
-                categoryDefinitions = await categoriesResponse.json();
-                populateCategoryFilter();
+            // 以單一批次請求載入分類定義、立委資料、可用月份與最新3個月的進度統計
+            const [categories, legislatorData, months, summary] = await fetchBatch([
+                '/api/categories',
+                '/api/legislators.json',
+                '/api/available-months',
+                '/api/progress/summary'
+            ]);
+
+            // 分類篩選選項由 showLatestThreeMonths 依進度統計中的分類填入
+            if (categories) {
+                categoryDefinitions = categories;
             }
-
-            // 載入立委資料
-            const legResponse = await fetch('/api/legislators.json');
-            if (legResponse.ok) {
-                const legislatorData = await legResponse.json();
+            if (legislatorData) {
                 legislatorData.jsonList.forEach(leg => {
                     legislatorPartyMap.set(normalizeName(leg.name), leg.party);
                 });
             }
 
-            // 載入可用月份
-            await loadAvailableMonths();
+            availableMonths = months || [];
+            populateMonthSelects();
 
-            // 預設載入最新3個月的資料
-            await loadLatestThreeMonths();
+            showLatestThreeMonths(summary);
 
         } catch (error) {
             console.error('初始化頁面時發生錯誤:', error);
@@ -101,21 +82,16 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // --- 時間範圍相關函式 ---
-    async function loadAvailableMonths() {
-        try {
-            const response = await fetch('/api/available-months');
-            if (!response.ok) throw new Error('無法載入可用月份');
-            
-            availableMonths = await response.json();
-            populateMonthSelects();
-        } catch (error) {
-            console.error('載入可用月份時發生錯誤:', error);
-            startMonthSelect.innerHTML = '<option value="">載入失敗</option>';
-            endMonthSelect.innerHTML = '<option value="">載入失敗</option>';
-        }
+    // 以 /api/batch 一次取得多個 API 的結果 (依請求順序回傳，失敗的項目為 null)
+    async function fetchBatch(paths) {
+        const query = paths.map(path => `r=${encodeURIComponent(path)}`).join('&');
+        const response = await fetch(`/api/batch?${query}`);
+        if (!response.ok) throw new Error('無法載入批次資料');
+        const data = await response.json();
+        return data.responses.map(item => (item.status === 200 ? item.body : null));
     }
 
+    // --- 時間範圍相關函式 ---
     function populateMonthSelects() {
         if (availableMonths.length === 0) {
             startMonthSelect.innerHTML = '<option value="">無可用資料</option>';
@@ -146,27 +122,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
     async function loadLatestThreeMonths() {
         try {
-            // 載入所有法案資料
-            const allBillsResponse = await fetch('/api/bills/all-range');
-            if (allBillsResponse.ok) {
-                allBillsData = await allBillsResponse.json();
-                updateProgressStats();
-                populateCategoryFilter();
-            }
-
-            // 更新當前時間範圍顯示
-            if (availableMonths.length >= 3) {
-                const latest3 = availableMonths.slice(0, 3);
-                const rangeText = `${latest3[2].label} 至 ${latest3[0].label}`;
-                currentTimeRangeDisplay.textContent = `目前顯示：${rangeText}`;
-                currentTimeRange = {
-                    start: `${latest3[2].year}-${latest3[2].month.toString().padStart(2, '0')}`,
-                    end: `${latest3[0].year}-${latest3[0].month.toString().padStart(2, '0')}`
-                };
-            } else {
-                currentTimeRangeDisplay.textContent = '目前顯示：所有可用資料';
-                currentTimeRange = null;
-            }
+            // 進度統計由伺服器端預先計算，不需下載完整法案資料
+            const summaryResponse = await fetch('/api/progress/summary');
+            showLatestThreeMonths(summaryResponse.ok ? await summaryResponse.json() : null);
 
         } catch (error) {
             console.error('載入最新3個月資料時發生錯誤:', error);
@@ -174,6 +132,27 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    function showLatestThreeMonths(summary) {
+        if (summary) {
+            updateProgressStats(summary.counts);
+            populateCategoryFilter(summary.categories);
+        }
+
+        // 更新當前時間範圍顯示
+        if (availableMonths.length >= 3) {
+            const latest3 = availableMonths.slice(0, 3);
+            const rangeText = `${latest3[2].label} 至 ${latest3[0].label}`;
+            currentTimeRangeDisplay.textContent = `目前顯示：${rangeText}`;
+            currentTimeRange = {
+                start: `${latest3[2].year}-${latest3[2].month.toString().padStart(2, '0')}`,
+                end: `${latest3[0].year}-${latest3[0].month.toString().padStart(2, '0')}`
+            };
+        } else {
+            currentTimeRangeDisplay.textContent = '目前顯示：所有可用資料';
+            currentTimeRange = null;
+        }
+    }
+
     async function applyTimeRange() {
         const startMonth = startMonthSelect.value;
         const endMonth = endMonthSelect.value;
@@ -189,12 +168,13 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         try {
-            // 載入指定範圍的所有法案資料
-            const allBillsResponse = await fetch(`/api/bills/all-range?start=${startMonth}&end=${endMonth}`);
-            if (allBillsResponse.ok) {
-                allBillsData = await allBillsResponse.json();
-                updateProgressStats();
-                populateCategoryFilter();
+            // 載入指定範圍的進度統計
+            const summaryResponse = await fetch(`/api/progress/summary?start=${startMonth}&end=${endMonth}`);
+            if (summaryResponse.ok) {
+                const summary = await summaryResponse.json();
+                updateProgressStats(summary.counts);
+                populateCategoryFilter(summary.categories);
+                currentTimeRange = { start: startMonth, end: endMonth };
                 
                 // 如果有選擇進度，重新篩選
                 if (currentProgressFilter) {
@@ -223,20 +203,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- 進度統計更新函式 ---
-    function updateProgressStats() {
-        const progressCounts = {
-            '一讀': 0,
-            '委員會審議': 0,
-            '二讀': 0,
-            '三讀': 0,
-            '其他': 0
-        };
-
-        allBillsData.forEach(bill => {
-            const progress = classifyProgress(bill.progress);
-            progressCounts[progress]++;
-        });
-
+    function updateProgressStats(progressCounts) {
         // 更新統計數字
         Object.keys(progressCounts).forEach(progress => {
             const countElement = document.getElementById(`count-${progress}`);
@@ -247,26 +214,20 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- 種類篩選器填充函式 ---
-    function populateCategoryFilter() {
-        const categories = new Set();
-        
-        allBillsData.forEach(bill => {
-            if (bill.categories && Array.isArray(bill.categories)) {
-                bill.categories.forEach(cat => categories.add(cat));
-            }
-        });
-
-        const sortedCategories = Array.from(categories).sort();
-        
+    function populateCategoryFilter(sortedCategories) {
+        const selectedCategory = categoryFilterSelect.value;
         categoryFilterSelect.innerHTML = '<option value="">全部種類</option>';
         sortedCategories.forEach(category => {
             const fullName = categoryDefinitions[category] || category;
             categoryFilterSelect.innerHTML += `<option value="${category}">${fullName}</option>`;
         });
+        if (sortedCategories.includes(selectedCategory)) {
+            categoryFilterSelect.value = selectedCategory;
+        }
     }
 
     // --- 篩選函式 ---
-    function filterByProgress(progress) {
+    async function filterByProgress(progress) {
         currentProgressFilter = progress;
         
         // 更新進度卡片的active狀態
@@ -278,19 +239,23 @@ document.addEventListener('DOMContentLoaded', () => {
             }
         });
 
-        // 篩選法案
-        filteredBillsData = allBillsData.filter(bill => {
-            const billProgress = classifyProgress(bill.progress);
-            let progressMatch = billProgress === progress;
-            
-            // 如果有種類篩選，也要符合種類條件
-            if (currentCategoryFilter) {
-                const categoryMatch = bill.categories && bill.categories.includes(currentCategoryFilter);
-                return progressMatch && categoryMatch;
-            }
-            
-            return progressMatch;
-        });
+        // 由伺服器端依進度階段 (與種類) 篩選，只取回卡片需要的欄位
+        let billsApiUrl = `/api/progress/bills?stage=${encodeURIComponent(progress)}&fields=card`;
+        if (currentCategoryFilter) {
+            billsApiUrl += `&category=${encodeURIComponent(currentCategoryFilter)}`;
+        }
+        if (currentTimeRange) {
+            billsApiUrl += `&start=${currentTimeRange.start}&end=${currentTimeRange.end}`;
+        }
+        try {
+            const response = await fetch(billsApiUrl);
+            if (!response.ok) throw new Error('載入法案資料失敗');
+            filteredBillsData = await response.json();
+        } catch (error) {
+            console.error('載入法案資料時發生錯誤:', error);
+            billContainer.innerHTML = '<p class="error-text">載入法案資料時發生錯誤。</p>';
+            return;
+        }
 
         // 更新標題和顯示
         billListTitle.textContent = `📋 ${progress} 法案列表`;
@@ -356,7 +321,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 <p class="bill-progress"><strong>進度：</strong> ${bill.progress || '未提供'}</p>
             `;
 
-            card.addEventListener('click', () => showModal(bill));
+            card.addEventListener('click', () => openBillModal(bill));
             
             billContainer.appendChild(card);
 
@@ -486,6 +451,17 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- Modal 相關函式 ---
+    // 列表只載入卡片欄位，點擊時才向 /api/bill/<bill_no> 取得完整資料
+    async function openBillModal(bill) {
+        try {
+            const response = await fetch(`/api/bill/${encodeURIComponent(bill.bill_no)}`);
+            if (!response.ok) throw new Error('無法載入法案詳細資料');
+            showModal(await response.json());
+        } catch (error) {
+            console.error('載入法案詳細資料時發生錯誤:', error);
+        }
+    }
+
     function showModal(bill) {
         if (!modalOverlay || !modalBody) return;
         
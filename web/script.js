@@ -52,26 +52,36 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- 初始化函式 ---
     async function initializePage() {
         try {
-            // 載入分類定義
-            const categoriesResponse = await fetch('/api/categories');
-            if (categoriesResponse.ok) {
-                categoryDefinitions = await categoriesResponse.json();
+            // 以單一批次請求載入分類定義、立委資料、可用月份、最新3個月的統計與完整法案列表
+            const [categories, legislatorData, months, summaryData, allBills] = await fetchBatch([
+                '/api/categories',
+                '/api/legislators.json',
+                '/api/available-months',
+                '/api/bills/summary-range',
+                '/api/bills/all-range'
+            ]);
+
+            if (categories) {
+                categoryDefinitions = categories;
             }
-
-            // 載入立委資料
-            const legResponse = await fetch('/api/legislators.json');
-            if (legResponse.ok) {
-                const legislatorData = await legResponse.json();
+            if (legislatorData) {
                 legislatorData.jsonList.forEach(leg => {
                     legislatorPartyMap.set(normalizeName(leg.name), leg.party);
                 });
             }
 
-            // 載入可用月份
-            await loadAvailableMonths();
+            if (months) {
+                availableMonths = months;
+                populateMonthSelects();
+            } else {
+                console.error('載入可用月份時發生錯誤');
+                startMonthSelect.innerHTML = '<option value="">載入失敗</option>';
+                endMonthSelect.innerHTML = '<option value="">載入失敗</option>';
+            }
 
-            // 預設載入最新3個月的資料
-            await loadLatestThreeMonths();
+            if (!summaryData) throw new Error('無法載入統計資料');
+            allBillsData = allBills || [];
+            showLatestThreeMonths(summaryData);
 
         } catch (error) {
             console.error('初始化頁面時發生錯誤:', error);
@@ -79,21 +89,16 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // --- 時間範圍相關函式 ---
-    async function loadAvailableMonths() {
-        try {
-            const response = await fetch('/api/available-months');
-            if (!response.ok) throw new Error('無法載入可用月份');
-            
-            availableMonths = await response.json();
-            populateMonthSelects();
-        } catch (error) {
-            console.error('載入可用月份時發生錯誤:', error);
-            startMonthSelect.innerHTML = '<option value="">載入失敗</option>';
-            endMonthSelect.innerHTML = '<option value="">載入失敗</option>';
-        }
+    // 以 /api/batch 一次取得多個 API 的結果 (依請求順序回傳，失敗的項目為 null)
+    async function fetchBatch(paths) {
+        const query = paths.map(path => `r=${encodeURIComponent(path)}`).join('&');
+        const response = await fetch(`/api/batch?${query}`);
+        if (!response.ok) throw new Error('無法載入批次資料');
+        const data = await response.json();
+        return data.responses.map(item => (item.status === 200 ? item.body : null));
     }
 
+    // --- 時間範圍相關函式 ---
     function populateMonthSelects() {
         if (availableMonths.length === 0) {
             startMonthSelect.innerHTML = '<option value="">無可用資料</option>';
@@ -136,23 +141,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 allBillsData = await allBillsResponse.json();
             }
 
-            // 更新顯示
-            renderVisualization(summaryData, categoryDefinitions);
-            renderBillRanking(generateBillRanking(allBillsData));
-            
-            // 更新當前時間範圍顯示
-            if (availableMonths.length >= 3) {
-                const latest3 = availableMonths.slice(0, 3);
-                const rangeText = `${latest3[2].label} 至 ${latest3[0].label}`;
-                currentTimeRangeDisplay.textContent = `目前顯示：${rangeText}`;
-                currentTimeRange = {
-                    start: `${latest3[2].year}-${latest3[2].month.toString().padStart(2, '0')}`,
-                    end: `${latest3[0].year}-${latest3[0].month.toString().padStart(2, '0')}`
-                };
-            } else {
-                currentTimeRangeDisplay.textContent = '目前顯示：所有可用資料';
-                currentTimeRange = null;
-            }
+            showLatestThreeMonths(summaryData);
 
         } catch (error) {
             console.error('載入最新3個月資料時發生錯誤:', error);
@@ -160,6 +149,26 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    function showLatestThreeMonths(summaryData) {
+        // 更新顯示
+        renderVisualization(summaryData, categoryDefinitions);
+        renderBillRanking(generateBillRanking(allBillsData));
+
+        // 更新當前時間範圍顯示
+        if (availableMonths.length >= 3) {
+            const latest3 = availableMonths.slice(0, 3);
+            const rangeText = `${latest3[2].label} 至 ${latest3[0].label}`;
+            currentTimeRangeDisplay.textContent = `目前顯示：${rangeText}`;
+            currentTimeRange = {
+                start: `${latest3[2].year}-${latest3[2].month.toString().padStart(2, '0')}`,
+                end: `${latest3[0].year}-${latest3[0].month.toString().padStart(2, '0')}`
+            };
+        } else {
+            currentTimeRangeDisplay.textContent = '目前顯示：所有可用資料';
+            currentTimeRange = null;
+        }
+    }
+
     async function applyTimeRange() {
         const startMonth = startMonthSelect.value;
         const endMonth = endMonthSelect.value;
@@ -391,7 +400,7 @@ document.addEventListener('DOMContentLoaded', () => {
             `;
             // --- ✨ 修改結束 ---
 
-            card.addEventListener('click', () => showModal(bill));
+            card.addEventListener('click', () => openBillModal(bill));
             
             billContainer.appendChild(card);
 
@@ -429,10 +438,10 @@ document.addEventListener('DOMContentLoaded', () => {
             let billsApiUrl;
             if (currentTimeRange) {
                 // 使用時間範圍API
-                billsApiUrl = `/api/bills-range?start=${currentTimeRange.start}&end=${currentTimeRange.end}&category=${encodeURIComponent(categoryKey)}`;
+                billsApiUrl = `/api/bills-range?start=${currentTimeRange.start}&end=${currentTimeRange.end}&category=${encodeURIComponent(categoryKey)}&fields=card`;
             } else {
                 // 使用預設API（最新3個月）
-                billsApiUrl = `/api/bills-range?category=${encodeURIComponent(categoryKey)}`;
+                billsApiUrl = `/api/bills-range?category=${encodeURIComponent(categoryKey)}&fields=card`;
             }
             
             const response = await fetch(billsApiUrl);
@@ -560,6 +569,22 @@ document.addEventListener('DOMContentLoaded', () => {
         return coloredNames.join('、');
     }
 
+    // 分類列表只載入卡片欄位 (fields=card)，點擊時才向 /api/bill/<bill_no> 取得完整資料
+    async function openBillModal(bill) {
+        if (bill.comparison_table !== undefined) {
+            showModal(bill);
+            return;
+        }
+        try {
+            const response = await fetch(`/api/bill/${encodeURIComponent(bill.bill_no)}`);
+            if (!response.ok) throw new Error('無法載入法案詳細資料');
+            showModal(await response.json());
+        } catch (error) {
+            console.error('載入法案詳細資料時發生錯誤:', error);
+            showModal(bill);
+        }
+    }
+
     function showModal(bill) {
         if (!modalBody || !modalOverlay) return;
 